@@ -1,53 +1,144 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Body, Header
-from sqlalchemy.orm import Session
-from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, Body, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, AsyncIterator, List, Optional, Sequence, Tuple
+from datetime import datetime
 import logging
 import uuid
 
-from app.core.database import get_db
-from app.core.auth import validate_api_key
-from app.schemas.publisher import Publisher, PublisherCreate, PublisherUpdate, PublisherConfigurationUpdate
+from app.core import database
+from app.core.auth import authenticate_publisher, is_internal_service, lookup_api_key, async_lookup_api_key, require_internal_service, AuthenticatedPublisher
+from app.schemas.publisher import Publisher, PublisherCreate, PublisherUpdate, PublisherConfigurationUpdate, PublisherPage, PublisherSearchPage, PublisherSearchResult, PublisherSummary, PublisherToken
 from app.crud import publisher as publisher_crud
+from app.crud import statistics as statistics_crud
 from app.models.publisher import Publisher as PublisherModel
-from app.schemas.task import Task, TaskListResponse, TaskStatusUpdate
 from app.core.config import settings
+from app.core.etag import expected_versions, format_etag, precondition_failed
+from app.core.exceptions import DuplicateResource, VersionConflict
+from app.core.security import create_access_token
+from app.services import live_statistics, publisher_export, publisher_import, quality_aggregates, statistics
+from app.services.integration import build_integration_code
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/publishers", tags=["publishers"])
 
+
+class PublisherStore:
+    """Publisher reads and writes through a blocking Session, off the event loop."""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def _run(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.db, *args, **kwargs)
+
+    async def create(self, publisher: PublisherCreate) -> PublisherModel:
+        return await self._run(publisher_crud.create_publisher, publisher)
+
+    async def get(self, publisher_id: uuid.UUID) -> Optional[PublisherModel]:
+        return await self._run(publisher_crud.get_publisher, str(publisher_id))
+
+    async def lookup_api_key(self, api_key: str) -> Optional[AuthenticatedPublisher]:
+        return await self._run(lookup_api_key, api_key)
+
+    async def list(self, **filters) -> Tuple[List[PublisherModel], Optional[str]]:
+        return await self._run(publisher_crud.list_publishers, **filters)
+
+    async def search(self, **params) -> Tuple[List[Tuple[PublisherModel, float]], Optional[str]]:
+        return await self._run(publisher_crud.search_publishers, **params)
+
+    async def update(self, publisher_id: uuid.UUID, publisher_update: PublisherUpdate, versions: Optional[List[int]]):
+        return await self._run(publisher_crud.update_publisher, publisher_id, publisher_update, versions)
+
+    async def update_configuration(
+        self, publisher_id: uuid.UUID, config_update: PublisherConfigurationUpdate, versions: Optional[List[int]]
+    ):
+        return await self._run(publisher_crud.update_publisher_configuration, publisher_id, config_update, versions)
+
+    async def get_rollups(self, publisher_id: uuid.UUID, ranges: Sequence[statistics_crud.BucketRange]):
+        return await self._run(statistics_crud.get_rollups, publisher_id, ranges)
+
+    def export(self, export_format: str, fields: List[str], compress: bool, is_active: Optional[bool]):
+        return publisher_export.export_publishers(export_format, fields, compress, is_active)
+
+
+class AsyncPublisherStore(PublisherStore):
+    """The same operations on an AsyncSession, used when DATABASE_MODE=async."""
+
+    async def _run(self, fn, *args, **kwargs):
+        return await fn(self.db, *args, **kwargs)
+
+    async def create(self, publisher: PublisherCreate) -> PublisherModel:
+        return await self._run(publisher_crud.async_create_publisher, publisher)
+
+    async def get(self, publisher_id: uuid.UUID) -> Optional[PublisherModel]:
+        return await self._run(publisher_crud.async_get_publisher, publisher_id)
+
+    async def lookup_api_key(self, api_key: str) -> Optional[AuthenticatedPublisher]:
+        return await self._run(async_lookup_api_key, api_key)
+
+    async def list(self, **filters) -> Tuple[List[PublisherModel], Optional[str]]:
+        return await self._run(publisher_crud.async_list_publishers, **filters)
+
+    async def search(self, **params) -> Tuple[List[Tuple[PublisherModel, float]], Optional[str]]:
+        return await self._run(publisher_crud.async_search_publishers, **params)
+
+    async def update(self, publisher_id: uuid.UUID, publisher_update: PublisherUpdate, versions: Optional[List[int]]):
+        return await self._run(publisher_crud.async_update_publisher, publisher_id, publisher_update, versions)
+
+    async def update_configuration(
+        self, publisher_id: uuid.UUID, config_update: PublisherConfigurationUpdate, versions: Optional[List[int]]
+    ):
+        return await self._run(publisher_crud.async_update_publisher_configuration, publisher_id, config_update, versions)
+
+    async def get_rollups(self, publisher_id: uuid.UUID, ranges: Sequence[statistics_crud.BucketRange]):
+        return await self._run(statistics_crud.async_get_rollups, publisher_id, ranges)
+
+    def export(self, export_format: str, fields: List[str], compress: bool, is_active: Optional[bool]) -> AsyncIterator[bytes]:
+        return publisher_export.async_export_publishers(export_format, fields, compress, is_active)
+
+
+async def get_publisher_store():
+    """Dependency: a store on a fresh session for whichever DATABASE_MODE is active."""
+    if settings.ASYNC_DATABASE:
+        async with database.AsyncSessionLocal() as db:
+            yield AsyncPublisherStore(db)
+        return
+
+    db = database.SessionLocal()
+    try:
+        yield PublisherStore(db)
+    finally:
+        await run_in_threadpool(db.close)
+
+
+def _parse_publisher_id(publisher_id: str) -> uuid.UUID:
+    try:
+        return uuid.UUID(publisher_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid publisher ID format"
+        )
+
 @router.get("/health", tags=["health"])
 def health_check():
     """Health check endpoint that doesn't require authentication."""
     return {"status": "healthy", "service": settings.SERVICE_NAME}
 
 @router.post("", response_model=Publisher, status_code=status.HTTP_201_CREATED)
-def register_publisher(
+async def register_publisher(
     publisher_in: PublisherCreate,
-    db: Session = Depends(get_db)
+    store: PublisherStore = Depends(get_publisher_store)
 ):
-    # Check if publisher with this email already exists
-    db_publisher = publisher_crud.get_publisher_by_email(db, email=publisher_in.email)
-    if db_publisher:
+    try:
+        return await store.create(publisher_in)
+    except DuplicateResource:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Publisher with this email already exists"
         )
-    
-    try:
-        # Create new publisher using the synchronous version
-        new_publisher = publisher_crud.create_publisher(db=db, publisher=publisher_in)
-        
-        # Validate that all required fields are present
-        if not all(hasattr(new_publisher, field) for field in 
-                ['name', 'email', 'website', 'description', 'id', 'api_key', 'is_active', 'created_at']):
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to create publisher with all required fields"
-            )
-        
-        return new_publisher
     except Exception as e:
         logger.error(f"Error creating publisher: {str(e)}")
         raise HTTPException(
@@ -55,210 +146,210 @@ def register_publisher(
             detail=f"Error creating publisher: {str(e)}"
         )
 
+@router.get("", response_model=PublisherPage, dependencies=[Depends(require_internal_service)])
+async def list_publishers(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    is_active: Optional[bool] = Query(None),
+    name_prefix: Optional[str] = Query(None, min_length=1),
+    website_domain: Optional[str] = Query(None, min_length=1, description="e.g. example.com; matches with or without www."),
+    store: PublisherStore = Depends(get_publisher_store)
+):
+    """List publishers, newest first, for internal services and admin tooling."""
+    try:
+        items, next_cursor = await store.list(
+            limit=limit,
+            cursor=cursor,
+            is_active=is_active,
+            name_prefix=name_prefix,
+            website_domain=website_domain
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return PublisherPage(items=items, next_cursor=next_cursor)
+
+@router.get("/search", response_model=PublisherSearchPage, dependencies=[Depends(require_internal_service)])
+async def search_publishers(
+    q: str = Query(..., min_length=1, max_length=200, description="Words, or part of a name or website"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    store: PublisherStore = Depends(get_publisher_store)
+):
+    """Search publishers by name, description or website, best match first."""
+    try:
+        results, next_cursor = await store.search(
+            query=q.strip(),
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    items = [
+        PublisherSearchResult(**PublisherSummary.from_orm(publisher).dict(), rank=rank)
+        for publisher, rank in results
+    ]
+    return PublisherSearchPage(items=items, next_cursor=next_cursor)
+
+@router.post("/import", response_model=Dict[str, Any], dependencies=[Depends(require_internal_service)])
+async def import_publishers(
+    request: Request,
+    format: str = Query("ndjson", regex="^(ndjson|csv)$")
+):
+    """
+    Register publishers in bulk from an NDJSON or CSV request body.
+    
+    The body is read as a stream; the response reports every row as created
+    (with its API key), conflicting or invalid.
+    """
+    report = await publisher_import.import_publishers(request.stream(), format)
+    return report.as_dict()
+
+@router.get("/export", dependencies=[Depends(require_internal_service)])
+async def export_publishers(
+    format: str = Query("ndjson", regex="^(ndjson|csv)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns, default all"),
+    is_active: Optional[bool] = Query(None),
+    accept_encoding: Optional[str] = Header(None),
+    store: PublisherStore = Depends(get_publisher_store)
+):
+    """Stream every publisher as NDJSON or CSV, gzipped when the client accepts it."""
+    try:
+        columns = publisher_export.resolve_fields(fields)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    compress = "gzip" in (accept_encoding or "").lower()
+    headers = {"Content-Disposition": f'attachment; filename="publishers.{format}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    # The export opens its own streaming connection rather than the store's session
+    return StreamingResponse(
+        store.export(format, columns, compress, is_active),
+        media_type=publisher_export.MEDIA_TYPES[format],
+        headers=headers
+    )
+
 @router.get("/{publisher_id}", response_model=Publisher)
-def get_publisher(
+async def get_publisher(
     publisher_id: str,
     request: Request,
+    response: Response,
     api_key: str = Header(..., alias="X-API-Key"),
-    db: Session = Depends(get_db)
+    store: PublisherStore = Depends(get_publisher_store)
 ):
     """Get publisher by ID with direct API key handling."""
-    logger.info(f"Received request to get publisher with ID: {publisher_id}")
+    publisher_uuid = _parse_publisher_id(publisher_id)
     
-    try:
-        # Log request details for debugging
-        logger.info(f"API Key: {api_key[:8]}...")
-        logger.info(f"Request headers: {dict(request.headers)}")
-        
-        # Validate publisher ID format
-        try:
-            publisher_uuid = str(uuid.UUID(publisher_id))
-            logger.info(f"Validated publisher_id as UUID: {publisher_uuid}")
-        except ValueError as e:
-            logger.error(f"Invalid publisher ID format: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid publisher ID format"
-            )
-        
-        # Get publisher by API key first
-        db_authenticated_publisher = db.query(PublisherModel).filter(PublisherModel.api_key == api_key).first()
-        
-        if not db_authenticated_publisher:
-            logger.warning(f"No publisher found with provided API key")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid API key"
-            )
-            
-        logger.info(f"Authenticated publisher: {db_authenticated_publisher.id}")
-        
-        # Get the requested publisher
-        db_publisher = publisher_crud.get_publisher(db, publisher_id=publisher_uuid)
-        if not db_publisher:
-            logger.error(f"Publisher not found with ID: {publisher_uuid}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Publisher not found"
-            )
-        
-        # Ensure publisher can only access their own data, unless it's an internal service request
-        is_internal_service = request.headers.get("X-Internal-Service") == "true"
-        logger.info(f"Is internal service request: {is_internal_service}")
-        
-        if not is_internal_service and str(db_publisher.id) != str(db_authenticated_publisher.id):
-            logger.warning(f"Publisher {db_authenticated_publisher.id} attempted to access data for publisher {publisher_id}")
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to access this publisher"
-            )
-        
-        logger.info(f"Successfully returning publisher {publisher_id}")
-        return db_publisher
-        
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except Exception as e:
-        # Catch any other unexpected errors
-        logger.error(f"Unexpected error in get_publisher: {str(e)}", exc_info=True)
+    authenticated_publisher = await store.lookup_api_key(api_key)
+    if not authenticated_publisher:
+        logger.warning("No publisher found with provided API key")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Unexpected error: {str(e)}"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key"
+        )
+    
+    db_publisher = await store.get(publisher_uuid)
+    if not db_publisher:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Publisher not found"
+        )
+    
+    # Ensure publisher can only access their own data, unless it's an internal service request
+    if db_publisher.id != authenticated_publisher.id and not is_internal_service(request):
+        logger.warning(f"Publisher {authenticated_publisher.id} attempted to access data for publisher {publisher_id}")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this publisher"
         )
+    
+    response.headers["ETag"] = format_etag(db_publisher.version)
+    return db_publisher
 
 @router.get("/{publisher_id}/integration-code", response_model=Dict[str, Any])
-def generate_integration_code(
+async def generate_integration_code(
     publisher_id: str,
-    publisher: PublisherModel = Depends(validate_api_key),
-    db: Session = Depends(get_db)
+    publisher: AuthenticatedPublisher = Depends(authenticate_publisher),
+    store: PublisherStore = Depends(get_publisher_store)
 ):
     """Generate integration code for embedding the publisher's widget."""
-    logger.info(f"Generating integration code for publisher {publisher_id}")
+    publisher_uuid = _parse_publisher_id(publisher_id)
     
-    try:
-        # Validate and normalize the publisher_id
-        publisher_uuid = str(uuid.UUID(publisher_id))
-    except ValueError:
-        logger.error(f"Invalid publisher ID format: {publisher_id}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid publisher ID format"
-        )
-        
     # Ensure publisher can only access their own integration code
-    if str(publisher.id) != publisher_uuid:
+    if publisher.id != publisher_uuid:
         logger.warning(f"Publisher {publisher.id} attempted to access integration code for publisher {publisher_id}")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this publisher's integration code"
         )
     
-    logger.info(f"Access authorized, generating integration code for publisher {publisher_id}")
-    
-    # Generate integration code
-    header_code = f'<script src="https://cdn.hotlabel.io/sdk/v1/hotlabel.js"></script>'
-    
-    body_code = f'''<div id="hotlabel-container"></div>
-<script>
-HotLabel.init({{
-    containerId: 'hotlabel-container',
-    publisherId: '{publisher_id}',
-    apiKey: '{publisher.api_key}'
-}});
-</script>'''
+    # The authenticated record does not carry the key itself, so load it
+    db_publisher = await store.get(publisher_uuid)
+    if not db_publisher:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Publisher not found"
+        )
     
-    return {
-        "code_snippets": {
-            "header": header_code,
-            "body": body_code
-        },
-        "installation_steps": [
-            "Add the HotLabel script to your website's header",
-            "Add the container div and initialization code where you want the widget to appear"
-        ]
-    }
-
-@router.get("/{publisher_id}/tasks", response_model=List[Dict[str, Any]])
-def get_publisher_tasks(
+    return build_integration_code(str(publisher_uuid), db_publisher.api_key)
+
+@router.post("/{publisher_id}/token", response_model=PublisherToken)
+async def issue_session_token(
     publisher_id: str,
-    task_status: Optional[str] = Query(None),
-    limit: int = Query(10, gt=0, le=100),
-    publisher: PublisherModel = Depends(validate_api_key),
-    db: Session = Depends(get_db)
+    api_key: str = Header(..., alias="X-API-Key"),
+    store: PublisherStore = Depends(get_publisher_store)
 ):
-    """Get available tasks for a publisher."""
-    try:
-        publisher_uuid = str(uuid.UUID(publisher_id))
-    except ValueError:
+    """Exchange an API key for a short-lived signed session token."""
+    publisher_uuid = _parse_publisher_id(publisher_id)
+    
+    publisher = await store.lookup_api_key(api_key)
+    if not publisher:
+        logger.warning("Token requested with an invalid API key")
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid publisher ID format"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key",
+            headers={"WWW-Authenticate": "ApiKey"},
         )
     
-    # Ensure publisher can only access their own tasks
-    if str(publisher.id) != publisher_uuid:
-        logger.warning(f"Publisher {publisher.id} attempted to access tasks for publisher {publisher_id}")
+    if publisher.id != publisher_uuid:
+        logger.warning(f"Publisher {publisher.id} attempted to obtain a token for publisher {publisher_id}")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this publisher's tasks"
+            detail="Not authorized to obtain a token for this publisher"
         )
     
-    try:
-        # The get_available_tasks function only accepts publisher_id and db
-        # Note: This is a synchronous endpoint calling an async function, which might be causing issues
-        # In a production environment, this would need to be fixed properly
-        # For now, we'll try to call it synchronously and return empty list on error
-        import asyncio
-        try:
-            # Get the current running event loop if it exists, or create a new one
-            try:
-                loop = asyncio.get_event_loop()
-            except RuntimeError:
-                # If we're not in an event loop context, create a new one
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
-            # Run the async function in the event loop
-            tasks = loop.run_until_complete(
-                publisher_crud.get_available_tasks(publisher_id=publisher_uuid, db=db)
-            )
-            
-            logger.info(f"Retrieved {len(tasks)} tasks for publisher {publisher_id}")
-            
-            # If there are no tasks, log this specifically
-            if not tasks:
-                logger.warning(f"No tasks found for publisher {publisher_id}")
-                
-            return tasks
-        except Exception as e:
-            logger.error(f"Error getting tasks: {str(e)}")
-            # Return an empty list as a fallback
-            return []
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
+    if not publisher.is_active:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Publisher account is not active"
         )
+    
+    return create_access_token(
+        publisher_id=publisher.id,
+        is_active=publisher.is_active,
+        generation=publisher.token_generation
+    )
 
 @router.patch("/{publisher_id}", response_model=Publisher)
-def update_publisher_details(
+async def update_publisher_details(
     publisher_id: str,
+    response: Response,
     publisher_update: PublisherUpdate = Body(...),
-    publisher: PublisherModel = Depends(validate_api_key),
-    db: Session = Depends(get_db)
+    if_match: Optional[str] = Header(None),
+    publisher: AuthenticatedPublisher = Depends(authenticate_publisher),
+    store: PublisherStore = Depends(get_publisher_store)
 ):
     """Update publisher details."""
-    try:
-        publisher_uuid = uuid.UUID(publisher_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid publisher ID format"
-        )
+    publisher_uuid = _parse_publisher_id(publisher_id)
     
     # Ensure publisher can only update their own data
     if publisher.id != publisher_uuid:
@@ -267,12 +358,11 @@ def update_publisher_details(
             detail="Not authorized to update this publisher"
         )
     
-    # Update publisher
-    updated_publisher = publisher_crud.update_publisher(
-        db=db,
-        publisher_id=publisher_uuid,
-        publisher_update=publisher_update
-    )
+    versions = expected_versions(if_match)
+    try:
+        updated_publisher = await store.update(publisher_uuid, publisher_update, versions)
+    except VersionConflict as e:
+        raise precondition_failed(e)
     
     if not updated_publisher:
         raise HTTPException(
@@ -280,23 +370,20 @@ def update_publisher_details(
             detail="Publisher not found"
         )
     
+    response.headers["ETag"] = format_etag(updated_publisher.version)
     return updated_publisher
 
 @router.patch("/{publisher_id}/configuration", response_model=Publisher)
-def update_publisher_configuration(
+async def update_publisher_configuration(
     publisher_id: str,
+    response: Response,
     config_update: PublisherConfigurationUpdate = Body(...),
-    publisher: PublisherModel = Depends(validate_api_key),
-    db: Session = Depends(get_db)
+    if_match: Optional[str] = Header(None),
+    publisher: AuthenticatedPublisher = Depends(authenticate_publisher),
+    store: PublisherStore = Depends(get_publisher_store)
 ):
     """Update publisher configuration."""
-    try:
-        publisher_uuid = uuid.UUID(publisher_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid publisher ID format"
-        )
+    publisher_uuid = _parse_publisher_id(publisher_id)
     
     # Ensure publisher can only update their own configuration
     if publisher.id != publisher_uuid:
@@ -305,12 +392,11 @@ def update_publisher_configuration(
             detail="Not authorized to update this publisher's configuration"
         )
     
-    # Update configuration
-    updated_publisher = publisher_crud.update_publisher_configuration(
-        db=db,
-        publisher_id=publisher_uuid,
-        config_update=config_update
-    )
+    versions = expected_versions(if_match)
+    try:
+        updated_publisher = await store.update_configuration(publisher_uuid, config_update, versions)
+    except VersionConflict as e:
+        raise precondition_failed(e)
     
     if not updated_publisher:
         raise HTTPException(
@@ -318,25 +404,69 @@ def update_publisher_configuration(
             detail="Publisher not found"
         )
     
+    response.headers["ETag"] = format_etag(updated_publisher.version)
     return updated_publisher
 
 @router.get("/{publisher_id}/statistics", response_model=Dict[str, Any])
-def get_publisher_statistics(
+async def get_publisher_statistics(
     publisher_id: str,
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
-    publisher: PublisherModel = Depends(validate_api_key),
-    db: Session = Depends(get_db)
+    publisher: AuthenticatedPublisher = Depends(authenticate_publisher),
+    store: PublisherStore = Depends(get_publisher_store)
 ):
-    """Get publisher statistics."""
+    """
+    Get publisher statistics.
+    
+    Task counts and quality / completion time distributions come from the
+    minute, hour and day rollups. "uniques" holds HyperLogLog estimates of
+    distinct visitors and labellers over whole UTC days (standard error
+    0.81%), or null when Redis is unavailable.
+    """
+    publisher_uuid = _parse_publisher_id(publisher_id)
+    
+    # Ensure publisher can only access their own statistics
+    if publisher.id != publisher_uuid:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this publisher's statistics"
+        )
+    
     try:
-        publisher_uuid = uuid.UUID(publisher_id)
-    except ValueError:
+        query = statistics.StatisticsQuery(start_date, end_date)
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid publisher ID format"
+            detail=str(e)
         )
     
+    # Pre-aggregated buckets: reads scale with the number of buckets, not tasks
+    try:
+        rows = await store.get_rollups(publisher_uuid, query.ranges)
+        uniques = await statistics.count_uniques(publisher_uuid, query.start, query.end)
+        return query.summarize(publisher_uuid, rows, uniques)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/{publisher_id}/statistics/live", response_model=Dict[str, Any])
+async def get_live_publisher_statistics(
+    publisher_id: str,
+    window: int = Query(settings.STATISTICS_LIVE_WINDOW_SECONDS, gt=0, le=settings.STATISTICS_LIVE_WINDOW_SECONDS),
+    series: bool = Query(False),
+    publisher: AuthenticatedPublisher = Depends(authenticate_publisher)
+):
+    """
+    Task and widget activity over the last `window` seconds, for dashboards.
+    
+    Per-second counters from every worker, merged in Redis; the read costs
+    O(window) whatever the traffic. With series=true the per-second counts
+    are returned too, oldest first.
+    """
+    publisher_uuid = _parse_publisher_id(publisher_id)
+    
     # Ensure publisher can only access their own statistics
     if publisher.id != publisher_uuid:
         raise HTTPException(
@@ -344,48 +474,41 @@ def get_publisher_statistics(
             detail="Not authorized to access this publisher's statistics"
         )
     
-    # Get statistics
     try:
-        return {"message": "Statistics endpoint not implemented yet"}
+        return await live_statistics.read_live(publisher_uuid, window, series)
     except Exception as e:
+        logger.error(f"Failed to read live statistics for publisher {publisher_id}: {str(e)}")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Live statistics are unavailable"
         )
 
-@router.post("/{publisher_id}/tasks/{task_id}/status", response_model=Dict[str, Any])
-def update_task_status(
+@router.get("/{publisher_id}/statistics/quality", response_model=Dict[str, Any])
+async def get_publisher_quality_statistics(
     publisher_id: str,
-    task_id: str,
-    status_update: TaskStatusUpdate,
-    publisher: PublisherModel = Depends(validate_api_key),
-    db: Session = Depends(get_db)
+    publisher: AuthenticatedPublisher = Depends(authenticate_publisher)
 ):
     """
-    Update the status of a task assigned to a publisher.
+    All-time quality-score aggregates and rejection reasons.
+    
+    Maintained incrementally from every accepted task status update: count,
+    mean and variance (Welford), an EWMA weighting recent scores, a fixed
+    bucket histogram and rejection counts by reason.
     """
-    # Ensure publisher can only update their own tasks
-    if publisher.id != publisher_id:
+    publisher_uuid = _parse_publisher_id(publisher_id)
+    
+    # Ensure publisher can only access their own statistics
+    if publisher.id != publisher_uuid:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this publisher's tasks"
+            detail="Not authorized to access this publisher's statistics"
         )
     
     try:
-        # Update task status using the tasks service
-        updated_task = publisher_crud.update_task_status(
-            db=db,
-            task_id=task_id,
-            status=status_update.status,
-            result=status_update.result,
-            quality_score=status_update.quality_score,
-            rejection_reason=status_update.rejection_reason
-        )
-        return updated_task
-    except HTTPException as e:
-        raise e
+        return await quality_aggregates.read_quality(publisher_uuid)
     except Exception as e:
+        logger.error(f"Failed to read quality aggregates for publisher {publisher_id}: {str(e)}")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Quality statistics are unavailable"
         )
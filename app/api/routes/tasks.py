@@ -0,0 +1,299 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Dict, Any, List, Optional
+import json
+import logging
+import uuid
+
+import httpx
+
+from app.core.auth import authenticate_publisher, authenticate_stream_publisher, AuthenticatedPublisher
+from app.core.config import settings
+from app.core.json_stream import JSONArrayExtractor
+from app.crud import publisher as publisher_crud
+from app.schemas.task import TaskStatusUpdate, TaskStatusBatchUpdate, TaskStatusBatchResponse
+from app.services import event_ingest, quality_aggregates, statistics, status_queue, task_notify, task_prefetch, task_ranking
+
+logger = logging.getLogger(__name__)
+
+# Widget-facing task routes. They never need a database session of their own,
+# so the same coroutines serve both DATABASE_MODE settings.
+router = APIRouter(prefix="/publishers", tags=["tasks"])
+
+
+def _authorize(publisher: AuthenticatedPublisher, publisher_id: str, action: str) -> uuid.UUID:
+    try:
+        publisher_uuid = uuid.UUID(publisher_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid publisher ID format"
+        )
+    
+    # Ensure publisher can only work with their own tasks
+    if publisher.id != publisher_uuid:
+        logger.warning(f"Publisher {publisher.id} attempted to {action} tasks for publisher {publisher_id}")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not authorized to {action} this publisher's tasks"
+        )
+    return publisher_uuid
+
+async def _stream_tasks(
+    publisher_id: str,
+    task_status: Optional[str],
+    limit: int,
+    cursor: Optional[str]
+):
+    upstream = await publisher_crud.open_available_tasks_stream(
+        publisher_id, task_status=task_status, limit=limit, cursor=cursor
+    )
+    if upstream is None:
+        return JSONResponse(content=[])
+    
+    headers = {}
+    next_cursor = upstream.headers.get("X-Next-Cursor")
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    
+    # Copy the upstream items array through without decoding it
+    extractor = JSONArrayExtractor("items", limit=limit)
+    
+    async def body():
+        try:
+            async for chunk in upstream.aiter_bytes():
+                data = extractor.feed(chunk)
+                if data:
+                    yield data
+                if extractor.done:
+                    break
+            yield extractor.close()
+            statistics.record_served(publisher_id, extractor.count)
+            logger.debug(f"Streamed {extractor.count} tasks for publisher {publisher_id}")
+        except (ValueError, httpx.HTTPError) as e:
+            # Headers are already sent; all we can do is cut the body short
+            logger.error(f"Tasks stream for publisher {publisher_id} broke off: {str(e)}")
+        finally:
+            await upstream.aclose()
+    
+    return StreamingResponse(body(), media_type="application/json", headers=headers)
+
+@router.get("/{publisher_id}/tasks", response_model=List[Dict[str, Any]])
+async def get_publisher_tasks(
+    publisher_id: str,
+    task_status: Optional[str] = Query(None),
+    limit: int = Query(10, gt=0, le=100),
+    cursor: Optional[str] = Query(None),
+    publisher: AuthenticatedPublisher = Depends(authenticate_publisher)
+):
+    """
+    Get available tasks for a publisher.
+    
+    With TASK_RANKING_ENABLED and no filters, the best matches for the
+    publisher's task preferences are returned. Otherwise task_status, limit
+    and cursor are passed on to the tasks service, and the next page's
+    cursor, when it provides one, is returned in the X-Next-Cursor header.
+    """
+    publisher_uuid = _authorize(publisher, publisher_id, "access")
+    
+    if settings.TASK_RANKING_ENABLED and task_status is None and cursor is None:
+        tasks = await task_ranking.ranked_tasks(publisher, limit)
+    elif settings.TASK_PREFETCH_ENABLED and task_status is None and cursor is None:
+        tasks = await task_prefetch.get_tasks(str(publisher_uuid), limit)
+    elif settings.TASKS_STREAM_PASSTHROUGH:
+        return await _stream_tasks(str(publisher_uuid), task_status, limit, cursor)
+    else:
+        tasks = await publisher_crud.get_available_tasks(
+            publisher_id=str(publisher_uuid),
+            db=None,
+            task_status=task_status,
+            limit=limit,
+            cursor=cursor
+        )
+    
+    statistics.record_served(str(publisher_uuid), len(tasks))
+    logger.debug(f"Retrieved {len(tasks)} tasks for publisher {publisher_id}")
+    return tasks
+
+@router.get("/{publisher_id}/tasks/events")
+async def stream_task_events(
+    publisher_id: str,
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    publisher: AuthenticatedPublisher = Depends(authenticate_stream_publisher)
+):
+    """
+    Server-Sent Events announcing new available tasks.
+    
+    Each event carries a version id; on reconnect the browser sends it back
+    in Last-Event-ID and only newer events are delivered. Widgets fetch the
+    tasks themselves when an event arrives.
+    """
+    publisher_uuid = _authorize(publisher, publisher_id, "watch")
+    
+    try:
+        since = int(last_event_id) if last_event_id else 0
+    except ValueError:
+        since = 0
+    
+    return StreamingResponse(
+        task_notify.event_stream(str(publisher_uuid), since, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/{publisher_id}/tasks/wait", response_model=Dict[str, Any])
+async def wait_for_tasks(
+    publisher_id: str,
+    since: int = Query(0, ge=0),
+    timeout: float = Query(settings.TASK_EVENTS_LONG_POLL_SECONDS, gt=0, le=60),
+    publisher: AuthenticatedPublisher = Depends(authenticate_stream_publisher)
+):
+    """
+    Long-poll fallback for clients without EventSource.
+    
+    Answers as soon as an event newer than `since` exists, or after
+    `timeout` seconds with changed=false.
+    """
+    publisher_uuid = _authorize(publisher, publisher_id, "watch")
+    
+    event = await task_notify.wait_for_event(str(publisher_uuid), since, timeout)
+    if event is None:
+        return {"changed": False, "version": since}
+    return {"changed": True, **event}
+
+@router.post("/{publisher_id}/tasks/status", response_model=TaskStatusBatchResponse)
+async def update_task_statuses(
+    publisher_id: str,
+    batch: TaskStatusBatchUpdate,
+    publisher: AuthenticatedPublisher = Depends(authenticate_publisher)
+):
+    """
+    Update the status of several tasks in one call.
+    
+    Each update is forwarded independently, so one failing task does not
+    fail the batch; check the per-item status_code in the results.
+    """
+    publisher_uuid = _authorize(publisher, publisher_id, "update")
+    
+    results = await publisher_crud.update_task_statuses(batch.updates)
+    accepted = [
+        update.dict() for update, item in zip(batch.updates, results)
+        if item["status_code"] == status.HTTP_200_OK
+    ]
+    for update in accepted:
+        statistics.record_task_status(str(publisher_uuid), update)
+    await quality_aggregates.record_task_statuses(str(publisher_uuid), accepted)
+    succeeded = len(accepted)
+    return {
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results
+    }
+
+@router.post("/{publisher_id}/tasks/{task_id}/status", response_model=Dict[str, Any])
+async def update_task_status(
+    publisher_id: str,
+    task_id: str,
+    status_update: TaskStatusUpdate,
+    publisher: AuthenticatedPublisher = Depends(authenticate_publisher)
+):
+    """
+    Update the status of a task assigned to a publisher.
+    
+    With TASK_STATUS_WRITE_BEHIND enabled the update is queued for delivery
+    and the call answers 202 Accepted with the queue message id.
+    """
+    publisher_uuid = _authorize(publisher, publisher_id, "update")
+    
+    if settings.TASK_STATUS_WRITE_BEHIND:
+        try:
+            message_id = await status_queue.enqueue(
+                str(publisher_uuid), task_id, status_update.dict()
+            )
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content={"task_id": task_id, "status": "queued", "message_id": message_id}
+            )
+        except Exception as e:
+            # Fall through to synchronous delivery rather than losing the update
+            logger.error(f"Failed to queue status update for task {task_id}: {str(e)}")
+    
+    task = await publisher_crud.update_task_status(
+        task_id=task_id,
+        task_status=status_update.status,
+        result=status_update.result,
+        quality_score=status_update.quality_score,
+        rejection_reason=status_update.rejection_reason
+    )
+    statistics.record_task_status(str(publisher_uuid), status_update.dict())
+    await quality_aggregates.record_task_status(str(publisher_uuid), status_update.dict())
+    return task
+
+async def _read_body(request: Request, max_bytes: int) -> bytes:
+    """The request body, refused with 413 as soon as it grows past max_bytes."""
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Request body exceeds {max_bytes} bytes"
+    )
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise too_large
+    
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+@router.post("/{publisher_id}/events", status_code=status.HTTP_202_ACCEPTED, response_model=Dict[str, Any])
+async def ingest_events(
+    publisher_id: str,
+    request: Request,
+    publisher: AuthenticatedPublisher = Depends(authenticate_publisher)
+):
+    """
+    Record widget events: impressions, task views, completions and skips.
+    
+    The body is one event or {"events": [...]}. Valid events are queued and
+    written in bulk in the background; invalid ones are listed by index in
+    "rejected". When the queue is full the whole call is refused with 429
+    and should be retried after Retry-After seconds.
+    """
+    publisher_uuid = _authorize(publisher, publisher_id, "report")
+    
+    # Parsed by hand: a pydantic model per event costs more than the write
+    body = await _read_body(request, settings.EVENT_MAX_BODY_BYTES)
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Request body must be JSON"
+        )
+    
+    events = payload["events"] if isinstance(payload, dict) and "events" in payload else [payload]
+    if not isinstance(events, list) or not 0 < len(events) <= settings.EVENT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"events must be a list of 1 to {settings.EVENT_BATCH_MAX_ITEMS} events"
+        )
+    
+    rows, rejected = event_ingest.parse_events(publisher_uuid, events)
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": "No valid events", "rejected": rejected}
+        )
+    if not event_ingest.enqueue(rows):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Event queue is full",
+            headers={"Retry-After": str(max(1, -(-settings.EVENT_FLUSH_INTERVAL_MS // 1000)))}
+        )
+    
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"accepted": len(rows), "rejected": rejected}
+    )
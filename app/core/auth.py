@@ -1,39 +1,364 @@
-from fastapi import Depends, HTTPException, status, Request
-from fastapi.security import APIKeyHeader
+from fastapi import Depends, HTTPException, status, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import APIKeyHeader, HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
 from sqlalchemy.orm import Session
+from typing import Any, Dict, NamedTuple, Optional, Set, Tuple
 import logging
 import asyncio
+import secrets
+import uuid
 
-from app.core.database import get_db
+from app.core.cache import TTLCache
+from app.core import database
+from app.core.database import get_db, get_async_db
 from app.core.config import settings
+from app.core.redis import get_redis_pool
+from app.core.security import decode_access_token
 
 logger = logging.getLogger(__name__)
 
-API_KEY_HEADER = APIKeyHeader(name="X-API-Key", auto_error=True)
+API_KEY_HEADER = APIKeyHeader(name="X-API-Key", auto_error=False)
+INTERNAL_SERVICE_HEADER = "X-Internal-Service"
+BEARER_TOKEN = HTTPBearer(auto_error=False)
+
+
+class AuthenticatedPublisher(NamedTuple):
+    """Immutable snapshot of the publisher fields needed to authorize a request."""
+    id: uuid.UUID
+    is_active: bool
+    version: int
+    token_generation: int = 0
+
+    @classmethod
+    def from_model(cls, publisher) -> "AuthenticatedPublisher":
+        return cls(
+            id=publisher.id,
+            is_active=bool(publisher.is_active),
+            version=publisher.version or 0,
+            token_generation=publisher.token_generation or 0,
+        )
+
+
+# Per-worker cache of API key -> publisher record. Entries are dropped as soon
+# as the CRUD layer changes the row, in this worker directly and in every
+# other worker through the invalidation channel below.
+api_key_cache = TTLCache(
+    max_size=settings.API_KEY_CACHE_MAX_SIZE,
+    ttl_seconds=settings.API_KEY_CACHE_TTL_SECONDS,
+)
+
+
+# Per-worker cache of publisher id -> publisher record for session tokens.
+# Tokens are checked against the stored token_generation, so a key rotation
+# or deactivation revokes them as soon as the entry is evicted.
+session_publisher_cache = TTLCache(
+    max_size=settings.API_KEY_CACHE_MAX_SIZE,
+    ttl_seconds=settings.SESSION_PUBLISHER_CACHE_TTL_SECONDS,
+)
+
+
+# Credential changes are broadcast over Redis pub/sub and every worker evicts
+# the publisher's entries when the message arrives. The caches are only
+# trusted while this worker's subscription is up: a worker that is not
+# subscribed (Redis unreachable, listener not started) could miss a message,
+# so it resolves every credential from the database until it resubscribes,
+# and clears both caches when it does.
+INVALIDATION_CHANNEL = "auth:credentials:invalidate"
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_invalidation_listener: Optional[asyncio.Task] = None
+_invalidations_subscribed = False
+_broadcasts: Set[asyncio.Task] = set()
+
+
+def _cached_api_key(api_key: str) -> Optional[AuthenticatedPublisher]:
+    return api_key_cache.get(api_key) if _invalidations_subscribed else None
+
+
+def _cached_session_publisher(publisher_id: uuid.UUID) -> Optional[AuthenticatedPublisher]:
+    return session_publisher_cache.get(str(publisher_id)) if _invalidations_subscribed else None
+
+
+def _evict_publisher(publisher_id: str) -> int:
+    session_publisher_cache.invalidate(publisher_id)
+    evicted = api_key_cache.invalidate_where(lambda record: str(record.id) == publisher_id)
+    if evicted:
+        logger.info(f"Evicted {evicted} cached API key entries for publisher {publisher_id}")
+    return evicted
+
+
+async def _publish_invalidation(publisher_id: str) -> None:
+    try:
+        redis = await get_redis_pool()
+        await redis.publish(INVALIDATION_CHANNEL, publisher_id)
+    except Exception as e:
+        logger.error(f"Failed to broadcast credential change for publisher {publisher_id}: {str(e)}")
+
+
+def _schedule_broadcast(publisher_id: str) -> None:
+    task = asyncio.ensure_future(_publish_invalidation(publisher_id))
+    _broadcasts.add(task)
+    task.add_done_callback(_broadcasts.discard)
+
+
+def invalidate_publisher_credentials(publisher_id) -> int:
+    """
+    Evict every cached API key and session entry belonging to publisher_id,
+    here and, through the invalidation channel, in every other worker.
+
+    Safe to call from the event loop or from a threadpool thread.
+    """
+    publisher_id = str(publisher_id)
+    evicted = _evict_publisher(publisher_id)
+    loop = _loop
+    if loop is not None and not loop.is_closed():
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            _schedule_broadcast(publisher_id)
+        else:
+            loop.call_soon_threadsafe(_schedule_broadcast, publisher_id)
+    return evicted
+
+
+async def _listen_for_invalidations() -> None:
+    global _invalidations_subscribed
+    while True:
+        pubsub = None
+        try:
+            redis = await get_redis_pool()
+            pubsub = redis.pubsub()
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            # Anything published while we were not subscribed was missed
+            api_key_cache.clear()
+            session_publisher_cache.clear()
+            _invalidations_subscribed = True
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is not None and message.get("type") == "message":
+                    _evict_publisher(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Credential invalidation listener failed: {str(e)}")
+            await asyncio.sleep(1.0)
+        finally:
+            _invalidations_subscribed = False
+            if pubsub is not None:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+
+def start_credential_invalidation() -> None:
+    """Broadcast and receive credential changes on the running loop."""
+    global _loop, _invalidation_listener
+    _loop = asyncio.get_running_loop()
+    if _invalidation_listener is None:
+        _invalidation_listener = asyncio.ensure_future(_listen_for_invalidations())
+        logger.info("Credential invalidation listener started")
+
+
+def credential_invalidation_stats() -> Dict[str, Any]:
+    return {
+        "subscribed": _invalidations_subscribed,
+        "session_publisher_cache": session_publisher_cache.stats(),
+    }
+
+
+async def stop_credential_invalidation() -> None:
+    global _loop, _invalidation_listener
+    if _invalidation_listener is not None:
+        _invalidation_listener.cancel()
+        await asyncio.gather(_invalidation_listener, return_exceptions=True)
+        _invalidation_listener = None
+    if _broadcasts:
+        await asyncio.gather(*_broadcasts, return_exceptions=True)
+    _loop = None
+
+
+def _load_api_key(db: Session, api_key: str) -> Optional[AuthenticatedPublisher]:
+    # Lazy import to avoid circular dependency
+    from app.models.publisher import Publisher
+
+    publisher = db.query(Publisher).filter(Publisher.api_key == api_key).first()
+    if publisher is None:
+        return None
+
+    record = AuthenticatedPublisher.from_model(publisher)
+    api_key_cache.set(api_key, record)
+    return record
+
+
+def _load_publisher(db: Session, publisher_id: uuid.UUID) -> Optional[AuthenticatedPublisher]:
+    # Lazy import to avoid circular dependency
+    from app.models.publisher import Publisher
+
+    publisher = db.query(Publisher).filter(Publisher.id == publisher_id).first()
+    if publisher is None:
+        return None
+
+    record = AuthenticatedPublisher.from_model(publisher)
+    session_publisher_cache.set(str(publisher_id), record)
+    return record
+
+
+async def _async_load_publisher(db: AsyncSession, publisher_id: uuid.UUID) -> Optional[AuthenticatedPublisher]:
+    # Lazy import to avoid circular dependency
+    from app.models.publisher import Publisher
+
+    result = await db.execute(select(Publisher).filter(Publisher.id == publisher_id))
+    publisher = result.scalar_one_or_none()
+    if publisher is None:
+        return None
+
+    record = AuthenticatedPublisher.from_model(publisher)
+    session_publisher_cache.set(str(publisher_id), record)
+    return record
+
+
+async def _async_load_api_key(db: AsyncSession, api_key: str) -> Optional[AuthenticatedPublisher]:
+    # Lazy import to avoid circular dependency
+    from app.models.publisher import Publisher
+
+    result = await db.execute(select(Publisher).filter(Publisher.api_key == api_key))
+    publisher = result.scalar_one_or_none()
+    if publisher is None:
+        return None
+
+    record = AuthenticatedPublisher.from_model(publisher)
+    api_key_cache.set(api_key, record)
+    return record
+
+
+def lookup_api_key(db: Session, api_key: str) -> Optional[AuthenticatedPublisher]:
+    """Resolve an API key to a publisher record, consulting the cache first."""
+    record = _cached_api_key(api_key)
+    if record is not None:
+        return record
+    return _load_api_key(db, api_key)
+
+
+async def async_lookup_api_key(db: AsyncSession, api_key: str) -> Optional[AuthenticatedPublisher]:
+    """Resolve an API key to a publisher record - async version."""
+    record = _cached_api_key(api_key)
+    if record is not None:
+        return record
+    return await _async_load_api_key(db, api_key)
+
+
+def _session_token_claims(token: str) -> Tuple[uuid.UUID, int]:
+    """Verify a session token's signature and return its publisher id and generation."""
+    claims = decode_access_token(token)
+    if claims is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired session token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return uuid.UUID(claims["sub"]), int(claims.get("gen", 0))
+
+
+def _check_session_publisher(
+    publisher_id: uuid.UUID,
+    generation: int,
+    publisher: Optional[AuthenticatedPublisher]
+) -> AuthenticatedPublisher:
+    """Reject tokens older than the publisher's stored generation."""
+    if publisher is None or generation < publisher.token_generation:
+        logger.warning(f"Rejected revoked session token for publisher {publisher_id}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired session token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not publisher.is_active:
+        logger.warning(f"Publisher {publisher.id} is not active")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Publisher account is not active"
+        )
+    return publisher
+
+
+def authenticate_session_token(db: Session, token: str) -> AuthenticatedPublisher:
+    """Verify a signed session token and return the publisher record it names."""
+    publisher_id, generation = _session_token_claims(token)
+    publisher = _cached_session_publisher(publisher_id)
+    if publisher is None:
+        publisher = _load_publisher(db, publisher_id)
+    return _check_session_publisher(publisher_id, generation, publisher)
+
+
+async def async_authenticate_session_token(db: AsyncSession, token: str) -> AuthenticatedPublisher:
+    """Verify a signed session token - async version."""
+    publisher_id, generation = _session_token_claims(token)
+    publisher = _cached_session_publisher(publisher_id)
+    if publisher is None:
+        publisher = await _async_load_publisher(db, publisher_id)
+    return _check_session_publisher(publisher_id, generation, publisher)
+
+
+async def resolve_session_token(token: str) -> AuthenticatedPublisher:
+    """
+    Verify a signed session token outside a request-scoped session.
+
+    A cached publisher record answers without leaving the loop; a miss
+    reads the publisher with whichever database mode is active.
+    """
+    publisher_id, generation = _session_token_claims(token)
+    publisher = _cached_session_publisher(publisher_id)
+    if publisher is None:
+        try:
+            publisher = await _resolve_publisher(publisher_id=publisher_id)
+        except Exception as e:
+            raise _lookup_failed("resolve_session_token", e)
+    return _check_session_publisher(publisher_id, generation, publisher)
 
 def is_internal_service(request: Request) -> bool:
-    """Check if the request is coming from an internal service."""
-    client_host = request.client.host if request.client else None
-    logger.debug(f"Checking if request from {client_host} is an internal service")
+    """
+    Check if the request is coming from an internal service.
     
-    # Check if request is coming from Kong (internal network)
-    is_internal = client_host in ["tasks", "localhost", "172.19.0.3"]
+    Internal callers (Kong, the tasks service, admin tooling) prove it by
+    sending the shared INTERNAL_SERVICE_SECRET as the X-Internal-Service
+    header. While no secret is configured, no request is internal.
+    """
+    secret = settings.INTERNAL_SERVICE_SECRET
+    supplied = request.headers.get(INTERNAL_SERVICE_HEADER)
+    if not secret or supplied is None:
+        return False
     
-    # Also check for X-Internal-Service header that Kong can set
-    internal_header = request.headers.get("X-Internal-Service")
-    if internal_header:
-        logger.debug(f"Found X-Internal-Service header: {internal_header}")
-        is_internal = True
-    
-    logger.info(f"Request from {client_host} is{' ' if is_internal else ' not '}an internal service")
+    is_internal = secrets.compare_digest(supplied.encode(), secret.encode())
+    if not is_internal:
+        client_host = request.client.host if request.client else None
+        logger.warning(f"Request from {client_host} sent an invalid {INTERNAL_SERVICE_HEADER} header")
     return is_internal
 
+def require_internal_service(request: Request) -> None:
+    """Dependency for endpoints that only internal services and admin tooling may call."""
+    if not is_internal_service(request):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="This endpoint is restricted to internal services"
+        )
+
 def validate_api_key(
     request: Request,
-    api_key: str = Depends(API_KEY_HEADER),
+    api_key: Optional[str] = Depends(API_KEY_HEADER),
+    bearer: Optional[HTTPAuthorizationCredentials] = Depends(BEARER_TOKEN),
     db: Session = Depends(get_db)
 ):
-    """Validate API key and return the associated publisher."""
+    """
+    Validate the caller's credentials and return the associated publisher record.
+    
+    A signed session token sent as a bearer credential is checked against
+    the cached publisher record; otherwise the X-API-Key header is resolved.
+    """
     logger.info("Starting API key validation")
     logger.debug(f"Request headers: {dict(request.headers)}")
     
@@ -52,7 +377,7 @@ def validate_api_key(
                 publisher = db.query(Publisher).filter(Publisher.id == publisher_id).first()
                 if publisher:
                     logger.info(f"Found publisher {publisher_id} for internal service request")
-                    return publisher
+                    return AuthenticatedPublisher.from_model(publisher)
                 else:
                     logger.error(f"Publisher {publisher_id} not found for internal service request")
                     raise HTTPException(
@@ -60,12 +385,24 @@ def validate_api_key(
                         detail="Publisher not found"
                     )
         
-        # Lazy import to avoid circular dependency
-        from app.models.publisher import Publisher
+        # Session tokens are verified with CPU only while the publisher is cached
+        if bearer is not None:
+            logger.info("Verifying bearer session token")
+            publisher = authenticate_session_token(db, bearer.credentials)
+            logger.info(f"Successfully validated session token for publisher {publisher.id}")
+            return publisher
+        
+        if not api_key:
+            logger.warning("Request carried neither an API key nor a session token")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "ApiKey"},
+            )
         
         # Verify the key
         logger.info("Looking up publisher by API key")
-        publisher = db.query(Publisher).filter(Publisher.api_key == api_key).first()
+        publisher = lookup_api_key(db, api_key)
         if not publisher:
             logger.warning("No publisher found with provided API key")
             raise HTTPException(
@@ -92,3 +429,192 @@ def validate_api_key(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"API key validation error: {str(e)}"
         )
+
+
+async def async_validate_api_key(
+    request: Request,
+    api_key: Optional[str] = Depends(API_KEY_HEADER),
+    bearer: Optional[HTTPAuthorizationCredentials] = Depends(BEARER_TOKEN),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Validate the caller's credentials - async version of validate_api_key."""
+    try:
+        # Allow internal service calls without API key
+        if is_internal_service(request):
+            publisher_id = request.path_params.get("publisher_id")
+            if publisher_id:
+                # Lazy import to avoid circular dependency
+                from app.models.publisher import Publisher
+                try:
+                    publisher_uuid = uuid.UUID(publisher_id)
+                except ValueError:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Invalid publisher ID format"
+                    )
+                result = await db.execute(select(Publisher).filter(Publisher.id == publisher_uuid))
+                publisher = result.scalar_one_or_none()
+                if publisher:
+                    logger.info(f"Found publisher {publisher_id} for internal service request")
+                    return AuthenticatedPublisher.from_model(publisher)
+                logger.error(f"Publisher {publisher_id} not found for internal service request")
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Publisher not found"
+                )
+        
+        # Session tokens are verified with CPU only while the publisher is cached
+        if bearer is not None:
+            return await async_authenticate_session_token(db, bearer.credentials)
+        
+        if not api_key:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "ApiKey"},
+            )
+        
+        publisher = await async_lookup_api_key(db, api_key)
+        if not publisher:
+            logger.warning("No publisher found with provided API key")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid API key",
+                headers={"WWW-Authenticate": "ApiKey"},
+            )
+        
+        if not publisher.is_active:
+            logger.warning(f"Publisher {publisher.id} is not active")
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Publisher account is not active"
+            )
+        
+        return publisher
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in async_validate_api_key: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"API key validation error: {str(e)}"
+        )
+
+
+def _sync_resolve(api_key: Optional[str], publisher_id: Optional[uuid.UUID]) -> Optional[AuthenticatedPublisher]:
+    db = database.SessionLocal()
+    try:
+        if api_key is not None:
+            return _load_api_key(db, api_key)
+        return _load_publisher(db, publisher_id)
+    finally:
+        db.close()
+
+
+def _lookup_failed(where: str, error: Exception) -> HTTPException:
+    """The response for a credential lookup that could not reach the database."""
+    logger.error(f"Unexpected error in {where}: {str(error)}", exc_info=True)
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Credential lookup is temporarily unavailable"
+    )
+
+
+async def _resolve_publisher(
+    api_key: Optional[str] = None,
+    publisher_id: Optional[uuid.UUID] = None
+) -> Optional[AuthenticatedPublisher]:
+    """Load a publisher by API key or ID with whichever database mode is active."""
+    if not settings.ASYNC_DATABASE:
+        return await run_in_threadpool(_sync_resolve, api_key, publisher_id)
+
+    async with database.AsyncSessionLocal() as db:
+        if api_key is not None:
+            return await _async_load_api_key(db, api_key)
+        return await _async_load_publisher(db, publisher_id)
+
+
+async def authenticate_publisher(
+    request: Request,
+    api_key: Optional[str] = Depends(API_KEY_HEADER),
+    bearer: Optional[HTTPAuthorizationCredentials] = Depends(BEARER_TOKEN)
+) -> AuthenticatedPublisher:
+    """
+    Event-loop native authentication for hot-path routes.
+    
+    Session tokens and cached API keys are resolved without leaving the
+    loop or opening a database session. Only a cache miss reaches the
+    database, through asyncpg or the threadpool depending on DATABASE_MODE.
+    """
+    # Allow internal service calls without API key
+    if is_internal_service(request):
+        publisher_id = request.path_params.get("publisher_id")
+        if publisher_id:
+            try:
+                publisher_uuid = uuid.UUID(publisher_id)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid publisher ID format"
+                )
+            publisher = await _resolve_publisher(publisher_id=publisher_uuid)
+            if publisher is None:
+                logger.error(f"Publisher {publisher_id} not found for internal service request")
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Publisher not found"
+                )
+            return publisher
+    
+    # Session tokens are verified with CPU only while the publisher is cached
+    if bearer is not None:
+        return await resolve_session_token(bearer.credentials)
+    
+    if not api_key:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "ApiKey"},
+        )
+    
+    publisher = _cached_api_key(api_key)
+    if publisher is None:
+        try:
+            publisher = await _resolve_publisher(api_key=api_key)
+        except Exception as e:
+            raise _lookup_failed("authenticate_publisher", e)
+    
+    if publisher is None:
+        logger.warning("No publisher found with provided API key")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key",
+            headers={"WWW-Authenticate": "ApiKey"},
+        )
+    
+    if not publisher.is_active:
+        logger.warning(f"Publisher {publisher.id} is not active")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Publisher account is not active"
+        )
+    
+    return publisher
+
+
+async def authenticate_stream_publisher(
+    request: Request,
+    access_token: Optional[str] = Query(None),
+    api_key: Optional[str] = Depends(API_KEY_HEADER),
+    bearer: Optional[HTTPAuthorizationCredentials] = Depends(BEARER_TOKEN)
+) -> AuthenticatedPublisher:
+    """
+    Authentication for long-lived event streams.
+    
+    Browsers' EventSource cannot set headers, so a session token may also be
+    passed as the access_token query parameter. API keys are never accepted
+    in the URL.
+    """
+    if access_token:
+        return await resolve_session_token(access_token)
+    return await authenticate_publisher(request, api_key=api_key, bearer=bearer)
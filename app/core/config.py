@@ -1,18 +1,124 @@
-from pydantic import BaseSettings, AnyHttpUrl
+from pydantic import BaseSettings, AnyHttpUrl, validator
 from typing import List, Optional, Union
-import secrets
 import os
 
 
 class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
-    SECRET_KEY: str = secrets.token_urlsafe(32)
+    # Signs session tokens; must be the same for every worker and survive restarts
+    SECRET_KEY: str
     PROJECT_NAME: str = "HotLabel Publisher Management"
     SERVICE_NAME: str = "publishers-service"
     
     # Service URLs
+    PUBLIC_API_URL: str = os.getenv("PUBLIC_API_URL", "https://api.hotlabel.io")
     TASKS_SERVICE_URL: str = os.getenv("TASKS_INTERNAL_URL", "http://kong:8000/internal/api/v1/tasks")
     
+    # Tasks service HTTP client (one keep-alive pool per worker)
+    TASKS_HTTP_MAX_CONNECTIONS: int = 100
+    TASKS_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    TASKS_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    TASKS_HTTP_CONNECT_TIMEOUT: float = 2.0
+    TASKS_HTTP_READ_TIMEOUT: float = 5.0
+    TASKS_HTTP_WRITE_TIMEOUT: float = 5.0
+    TASKS_HTTP_POOL_TIMEOUT: float = 1.0
+    TASKS_HTTP2: bool = False
+    # Tasks service resilience
+    TASKS_REQUEST_DEADLINE_SECONDS: float = 3.0
+    TASKS_RETRY_MAX_ATTEMPTS: int = 3
+    TASKS_BREAKER_FAILURE_THRESHOLD: int = 5
+    TASKS_BREAKER_RECOVERY_SECONDS: float = 10.0
+    TASKS_BREAKER_HALF_OPEN_MAX_CALLS: int = 1
+    TASKS_HEDGE_ENABLED: bool = False
+    TASKS_HEDGE_PERCENTILE: float = 95.0
+    TASKS_HEDGE_MIN_DELAY_MS: float = 10.0
+    # Batch task status updates
+    TASK_STATUS_BATCH_MAX_ITEMS: int = 100
+    TASK_STATUS_BATCH_CONCURRENCY: int = 10
+    TASKS_SERVICE_BATCH_STATUS: bool = False
+    # Replay a finished available-tasks fetch to identical callers for this long (0 = off)
+    TASKS_COALESCE_WINDOW_MS: int = 0
+    # Stream the upstream items array to widgets instead of decoding it. Streamed
+    # fetches are not coalesced, so leave this off when TASKS_COALESCE_WINDOW_MS is set
+    TASKS_STREAM_PASSTHROUGH: bool = False
+    
+    # Per-publisher task prefetch buffers in Redis
+    TASK_PREFETCH_ENABLED: bool = False
+    TASK_PREFETCH_DEPTH: int = 100
+    TASK_PREFETCH_LOW_WATER: int = 20
+    TASK_PREFETCH_IDLE_SECONDS: int = 600
+    TASK_PREFETCH_SEEN_TTL_SECONDS: float = 300.0
+    TASK_PREFETCH_SWEEP_INTERVAL_SECONDS: float = 15.0
+    TASK_PREFETCH_REFILL_LOCK_SECONDS: float = 10.0
+    
+    # Preference-aware ranking of available tasks
+    TASK_RANKING_ENABLED: bool = False
+    TASK_RANKING_POOL_SIZE: int = 1000
+    TASK_RANKING_POOL_TTL_SECONDS: float = 1.0
+    
+    # Task availability events (SSE / long-poll)
+    TASK_EVENTS_POLL_INTERVAL_SECONDS: float = 2.0
+    TASK_EVENTS_WATCH_LEASE_SECONDS: float = 10.0
+    TASK_EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    TASK_EVENTS_MAX_STREAM_SECONDS: float = 300.0
+    TASK_EVENTS_LONG_POLL_SECONDS: float = 25.0
+    TASK_EVENTS_RETRY_MS: int = 3000
+    TASK_EVENTS_STATE_TTL_SECONDS: int = 3600
+    TASK_EVENTS_MAX_IDS: int = 20
+    
+    # Write-behind delivery of task status updates through Redis Streams
+    TASK_STATUS_WRITE_BEHIND: bool = False
+    TASK_STATUS_STREAM_SHARDS: int = 8
+    TASK_STATUS_WORKERS: int = 8
+    TASK_STATUS_READ_BATCH: int = 50
+    TASK_STATUS_MAX_ATTEMPTS: int = 5
+    TASK_STATUS_RETRY_BASE_SECONDS: float = 0.5
+    TASK_STATUS_RETRY_MAX_SECONDS: float = 30.0
+    TASK_STATUS_SHARD_LEASE_SECONDS: float = 15.0
+    
+    # Streaming publisher export
+    PUBLISHER_EXPORT_CHUNK_ROWS: int = 1000
+    PUBLISHER_EXPORT_GZIP_LEVEL: int = 6
+    
+    # Bulk publisher import
+    PUBLISHER_IMPORT_BATCH_ROWS: int = 5000
+    PUBLISHER_IMPORT_MAX_REPORTED_ERRORS: int = 1000
+    
+    # Publisher search: matches ranked per query, so broad terms stay cheap
+    PUBLISHER_SEARCH_MAX_CANDIDATES: int = 1000
+    
+    # Publisher statistics rollups (minute / hour / day buckets in Postgres)
+    STATISTICS_ENABLED: bool = True
+    STATISTICS_FLUSH_INTERVAL_SECONDS: float = 5.0
+    STATISTICS_RETENTION_SWEEP_SECONDS: float = 3600.0
+    STATISTICS_MINUTE_RETENTION_HOURS: int = 48
+    STATISTICS_HOUR_RETENTION_DAYS: int = 90
+    STATISTICS_DEFAULT_RANGE_DAYS: int = 30
+    STATISTICS_QUALITY_SCORE_MAX: float = 1.0
+    STATISTICS_UNIQUES_RETENTION_DAYS: int = 400
+    
+    # Incremental quality-score aggregates (Redis, updated on every status update)
+    STATISTICS_QUALITY_ENABLED: bool = True
+    STATISTICS_QUALITY_EWMA_ALPHA: float = 0.05
+    STATISTICS_QUALITY_MAX_REJECTION_REASONS: int = 100
+    
+    # Live per-second counters (worker-local rings merged into Redis)
+    STATISTICS_LIVE_ENABLED: bool = True
+    STATISTICS_LIVE_WINDOW_SECONDS: int = 300
+    STATISTICS_LIVE_PUSH_SECONDS: float = 1.0
+    STATISTICS_LIVE_LOCAL_SECONDS: int = 10
+    STATISTICS_LIVE_MAX_PUBLISHERS: int = 100000
+    
+    # Widget event ingestion (in-process queue, bulk COPY into widget_events)
+    EVENT_QUEUE_MAX_EVENTS: int = 100000
+    EVENT_FLUSH_MAX_EVENTS: int = 5000
+    EVENT_FLUSH_INTERVAL_MS: int = 250
+    EVENT_BATCH_MAX_ITEMS: int = 500
+    EVENT_MAX_BODY_BYTES: int = 1048576
+    EVENT_MAX_METADATA_BYTES: int = 2048
+    EVENT_MAX_AGE_SECONDS: int = 86400
+    EVENT_MAX_CLOCK_SKEW_SECONDS: int = 300
+    
     # Logging
     LOG_LEVEL: str = "INFO"
     
@@ -26,14 +132,33 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "hotlabel_publishers"
     DATABASE_URI: Optional[str] = None
+    # "sync" serves routes from the threadpool, "async" uses asyncpg on the event loop
+    DATABASE_MODE: str = os.getenv("DATABASE_MODE", "sync")
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
     
     # Redis
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://redis:6379/0")
     
     # Security
+    # Shared with Kong and other internal callers, who send it as the
+    # X-Internal-Service header; unset means no caller is trusted as internal
+    INTERNAL_SERVICE_SECRET: Optional[str] = None
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # API key cache
+    API_KEY_CACHE_MAX_SIZE: int = 10000
+    API_KEY_CACHE_TTL_SECONDS: float = 60.0
+    # How long a worker trusts its copy of a publisher's token generation
+    SESSION_PUBLISHER_CACHE_TTL_SECONDS: float = 5.0
+    
+    @validator("SECRET_KEY")
+    def secret_key_not_empty(cls, value: str) -> str:
+        if not value.strip():
+            raise ValueError("SECRET_KEY must be set")
+        return value
+    
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
         if self.DATABASE_URL:
@@ -42,6 +167,18 @@ class Settings(BaseSettings):
             return self.DATABASE_URI
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
     
+    @property
+    def ASYNC_SQLALCHEMY_DATABASE_URI(self) -> str:
+        uri = self.SQLALCHEMY_DATABASE_URI
+        for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+            if uri.startswith(prefix):
+                return "postgresql+asyncpg://" + uri[len(prefix):]
+        return uri
+    
+    @property
+    def ASYNC_DATABASE(self) -> bool:
+        return self.DATABASE_MODE.lower() == "async"
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
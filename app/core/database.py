@@ -1,11 +1,35 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+)
+# Writes return their row via RETURNING, so nothing needs reloading after commit
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# The asyncpg engine is only built in async mode so the driver stays optional
+async_engine = None
+AsyncSessionLocal = None
+if settings.ASYNC_DATABASE:
+    async_engine = create_async_engine(
+        settings.ASYNC_SQLALCHEMY_DATABASE_URI,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+    )
+    AsyncSessionLocal = sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
 
 Base = declarative_base()
 
@@ -16,3 +40,16 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Async dependency
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database access requires DATABASE_MODE=async")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def dispose_engines():
+    """Release pooled connections on shutdown."""
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
@@ -0,0 +1,56 @@
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.exceptions import VersionConflict
+
+
+def format_etag(version: int) -> str:
+    """Strong entity tag for a publisher row version."""
+    return f'"v{version}"'
+
+
+def parse_if_match(header: Optional[str]) -> Optional[List[int]]:
+    """
+    Versions an If-Match header accepts.
+
+    Returns None when the header is absent or "*" (any current version).
+    Raises ValueError for a tag this service could not have issued, which can
+    never match and should be answered with 412.
+    """
+    if header is None or header.strip() == "*":
+        return None
+
+    versions = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            # If-Match uses strong comparison; a weak tag never matches
+            raise ValueError(f"weak entity tag {tag} in If-Match")
+        if len(tag) < 4 or not (tag.startswith('"v') and tag.endswith('"')):
+            raise ValueError(f"unrecognised entity tag {tag}")
+        try:
+            versions.append(int(tag[2:-1]))
+        except ValueError:
+            raise ValueError(f"unrecognised entity tag {tag}")
+    return versions
+
+
+def expected_versions(if_match: Optional[str]) -> Optional[List[int]]:
+    """parse_if_match for route handlers: an unmatchable tag becomes a 412."""
+    try:
+        return parse_if_match(if_match)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=str(e)
+        )
+
+
+def precondition_failed(conflict: VersionConflict) -> HTTPException:
+    """412 carrying the current ETag so the client can re-read and retry."""
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail=conflict.message,
+        headers={"ETag": format_etag(conflict.details["current_version"])}
+    )
@@ -26,4 +26,22 @@ class DuplicateResource(ServiceException):
             message=message,
             code="duplicate_resource",
             status_code=409
-        ) 
\ No newline at end of file
+        ) 
+
+class UpstreamUnavailable(ServiceException):
+    def __init__(self, service: str, reason: str):
+        super().__init__(
+            message=f"{service} is unavailable: {reason}",
+            code="upstream_unavailable",
+            status_code=503,
+            details={"service": service}
+        )
+
+class VersionConflict(ServiceException):
+    def __init__(self, resource_type: str, resource_id: str, current_version: int):
+        super().__init__(
+            message=f"{resource_type} with id {resource_id} was modified (now at version {current_version})",
+            code="precondition_failed",
+            status_code=412,
+            details={"current_version": current_version}
+        )
@@ -0,0 +1,111 @@
+import httpx
+import logging
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_tasks_client: Optional[httpx.AsyncClient] = None
+_in_flight = 0
+_peak_in_flight = 0
+_requests_sent = 0
+
+
+def _build_tasks_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.TASKS_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.TASKS_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.TASKS_HTTP_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(
+        connect=settings.TASKS_HTTP_CONNECT_TIMEOUT,
+        read=settings.TASKS_HTTP_READ_TIMEOUT,
+        write=settings.TASKS_HTTP_WRITE_TIMEOUT,
+        pool=settings.TASKS_HTTP_POOL_TIMEOUT,
+    )
+    return httpx.AsyncClient(
+        base_url=settings.TASKS_SERVICE_URL,
+        limits=limits,
+        timeout=timeout,
+        http2=settings.TASKS_HTTP2,
+    )
+
+
+async def init_tasks_client() -> httpx.AsyncClient:
+    """Create the worker's pooled tasks-service client."""
+    global _tasks_client
+
+    if _tasks_client is None:
+        logger.info(f"Opening pooled tasks-service client for {settings.TASKS_SERVICE_URL}")
+        _tasks_client = _build_tasks_client()
+
+    return _tasks_client
+
+
+def get_tasks_client() -> httpx.AsyncClient:
+    """Return the shared tasks-service client, creating it on first use."""
+    global _tasks_client
+
+    if _tasks_client is None:
+        _tasks_client = _build_tasks_client()
+
+    return _tasks_client
+
+
+async def close_tasks_client():
+    """Close the pooled tasks-service client."""
+    global _tasks_client
+
+    if _tasks_client is not None:
+        await _tasks_client.aclose()
+        _tasks_client = None
+        logger.info("Tasks-service client closed")
+
+
+async def tasks_request(method: str, path: str, stream: bool = False, **kwargs: Any) -> httpx.Response:
+    """
+    Send a request to the tasks service over the shared connection pool.
+
+    With stream=True the response is returned as soon as the headers arrive;
+    the caller reads the body and must aclose() the response.
+    """
+    global _in_flight, _peak_in_flight, _requests_sent
+
+    client = get_tasks_client()
+    _in_flight += 1
+    _requests_sent += 1
+    _peak_in_flight = max(_peak_in_flight, _in_flight)
+    try:
+        if stream:
+            return await client.send(client.build_request(method, path, **kwargs), stream=True)
+        return await client.request(method, path, **kwargs)
+    finally:
+        _in_flight -= 1
+
+
+def tasks_client_stats() -> Dict[str, Any]:
+    """Report connection pool utilisation for the tasks-service client."""
+    stats: Dict[str, Any] = {
+        "open": _tasks_client is not None,
+        "http2": settings.TASKS_HTTP2,
+        "max_connections": settings.TASKS_HTTP_MAX_CONNECTIONS,
+        "max_keepalive_connections": settings.TASKS_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        "requests_sent": _requests_sent,
+        "in_flight": _in_flight,
+        "peak_in_flight": _peak_in_flight,
+    }
+
+    # httpcore exposes the pooled connections on the transport's pool
+    pool = getattr(getattr(_tasks_client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", None)
+    if connections is not None:
+        idle = sum(1 for connection in connections if connection.is_idle())
+        stats["connections"] = len(connections)
+        stats["idle_connections"] = idle
+        stats["active_connections"] = len(connections) - idle
+        stats["utilisation"] = round(
+            (len(connections) - idle) / settings.TASKS_HTTP_MAX_CONNECTIONS, 4
+        ) if settings.TASKS_HTTP_MAX_CONNECTIONS else 0.0
+
+    return stats
@@ -0,0 +1,155 @@
+import json
+import re
+from typing import List, Optional
+
+# Bytes that can change the parser state outside and inside JSON strings
+_STRUCTURAL = re.compile(rb'["\[\]{},:]')
+_STRING_SPECIAL = re.compile(rb'["\\]')
+
+_QUOTE = ord('"')
+_BACKSLASH = ord("\\")
+_OPEN = (ord("{"), ord("["))
+_CLOSE = (ord("}"), ord("]"))
+_LBRACE = ord("{")
+_LBRACKET = ord("[")
+_COMMA = ord(",")
+_COLON = ord(":")
+
+# Keys at the top level are short; anything longer cannot be the one we want
+_MAX_KEY_BYTES = 256
+
+
+class JSONArrayExtractor:
+    """
+    Copy one array out of a JSON document as it streams past.
+
+    Feed the document chunk by chunk; each call returns the bytes of the
+    array seen so far, untouched. Only structural characters are inspected,
+    so no element is ever decoded and memory stays constant whatever the
+    array length. The array is the value of `key` in the top-level object,
+    or the document itself when it is a bare array. With a limit, the copy
+    is cut after that many elements and upstream reading can stop early.
+    """
+
+    def __init__(self, key: str = "items", limit: Optional[int] = None):
+        self.limit = limit
+        self.done = False
+        self._key = json.dumps(key).encode()
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expecting_key = False
+        self._key_buf: Optional[bytearray] = None
+        self._last_key: Optional[bytes] = None
+        self._array_depth: Optional[int] = None
+        self._separators = 0
+        self._has_content = False
+
+    @property
+    def count(self) -> int:
+        """Number of array elements emitted so far (completed or in progress)."""
+        return self._separators + (1 if self._has_content else 0)
+
+    def feed(self, chunk: bytes) -> bytes:
+        if self.done:
+            return b""
+
+        out: List[bytes] = []
+        emit_from = 0 if self._array_depth is not None else None
+        pos, end = 0, len(chunk)
+
+        while pos < end:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    pos += 1
+                    continue
+                match = _STRING_SPECIAL.search(chunk, pos)
+                stop = match.start() if match else end
+                if self._key_buf is not None:
+                    self._key_buf += chunk[pos:stop + 1]
+                    if len(self._key_buf) > _MAX_KEY_BYTES:
+                        self._key_buf = None
+                if match is None:
+                    break
+                if chunk[stop] == _BACKSLASH:
+                    self._escape = True
+                else:
+                    self._in_string = False
+                    if self._key_buf is not None:
+                        self._last_key = bytes(self._key_buf)
+                        self._key_buf = None
+                pos = stop + 1
+                continue
+
+            match = _STRUCTURAL.search(chunk, pos)
+            if match is None:
+                if self._array_depth is not None and chunk[pos:].strip():
+                    self._has_content = True
+                break
+            index = match.start()
+            char = chunk[index]
+            if self._array_depth is not None and self._depth == self._array_depth and chunk[pos:index].strip():
+                self._has_content = True
+            pos = index + 1
+
+            if char == _QUOTE:
+                self._in_string = True
+                if self._array_depth is not None:
+                    self._has_content = True
+                elif self._depth == 1 and self._expecting_key:
+                    self._key_buf = bytearray(b'"')
+            elif char in _OPEN:
+                if self._array_depth is None and char == _LBRACKET and self._at_target():
+                    if self.limit is not None and self.limit <= 0:
+                        self.done = True
+                        return b"[]"
+                    self._array_depth = self._depth + 1
+                    emit_from = index
+                elif self._array_depth is not None:
+                    self._has_content = True
+                self._depth += 1
+                if self._depth == 1:
+                    self._expecting_key = char == _LBRACE
+            elif char in _CLOSE:
+                self._depth -= 1
+                if self._array_depth is not None and self._depth < self._array_depth:
+                    out.append(chunk[emit_from:index + 1])
+                    self.done = True
+                    return b"".join(out)
+            elif char == _COMMA:
+                if self._array_depth is not None and self._depth == self._array_depth:
+                    self._separators += 1
+                    if self.limit is not None and self._separators >= self.limit:
+                        self._separators -= 1
+                        out.append(chunk[emit_from:index])
+                        out.append(b"]")
+                        self.done = True
+                        return b"".join(out)
+                elif self._depth == 1:
+                    self._expecting_key = True
+            elif char == _COLON and self._depth == 1:
+                self._expecting_key = False
+
+        if emit_from is not None:
+            out.append(chunk[emit_from:])
+        return b"".join(out)
+
+    def _at_target(self) -> bool:
+        if self._depth == 0:
+            return True
+        return self._depth == 1 and not self._expecting_key and self._last_key == self._key
+
+    def close(self) -> bytes:
+        """
+        Finish the copy once the upstream body has ended.
+
+        Returns "[]" when the document had no such array. Raises ValueError
+        when the body ended part-way through the array.
+        """
+        if self.done:
+            return b""
+        if self._array_depth is not None:
+            raise ValueError("JSON document ended inside the streamed array")
+        self.done = True
+        return b"[]"
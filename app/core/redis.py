@@ -1,5 +1,7 @@
 import aioredis
 import logging
+import os
+import socket
 from typing import Optional
 
 from app.core.config import settings
@@ -35,3 +37,33 @@ async def close_redis_pool():
         await _redis_pool.close()
         _redis_pool = None
         logger.info("Redis connection closed")
+
+# Leases: a key holding its owner's id, extended or dropped only by that owner
+LEASE_OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+_RENEW_LEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_LEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+async def acquire_lease(redis: aioredis.Redis, key: str, ttl_ms: int, owner: str = LEASE_OWNER) -> bool:
+    """Take the lease if nobody holds it."""
+    return bool(await redis.set(key, owner, nx=True, px=ttl_ms))
+
+async def renew_lease(redis: aioredis.Redis, key: str, ttl_ms: int, owner: str = LEASE_OWNER) -> bool:
+    """Extend the lease; False means it expired or belongs to someone else."""
+    script = redis.register_script(_RENEW_LEASE)
+    return bool(await script(keys=[key], args=[owner, ttl_ms]))
+
+async def release_lease(redis: aioredis.Redis, key: str, owner: str = LEASE_OWNER) -> bool:
+    """Drop the lease if we still hold it."""
+    script = redis.register_script(_RELEASE_LEASE)
+    return bool(await script(keys=[key], args=[owner]))
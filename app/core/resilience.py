@@ -0,0 +1,300 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+from app.core.config import settings
+from app.core.exceptions import UpstreamUnavailable
+from app.core.http_client import tasks_request
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class RetryableStatus(Exception):
+    """An upstream reply whose status code is worth another attempt."""
+
+    def __init__(self, response: httpx.Response):
+        self.response = response
+        super().__init__(f"upstream returned {response.status_code}")
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed: calls flow; failure_threshold consecutive failures open the circuit.
+    open: calls fail fast until recovery_timeout has elapsed.
+    half_open: up to half_open_max_calls probes are let through; a success
+    closes the circuit, a failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._half_open_round = 0
+        self.transitions = 0
+        self.rejected = 0
+        self.failures = 0
+        self.successes = 0
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            logger.warning(f"Circuit breaker {self.name}: {self.state} -> {state}")
+            self.state = state
+            self.transitions += 1
+
+    def before_call(self) -> Optional[int]:
+        """
+        Raise CircuitOpenError if the call must not go upstream.
+
+        Returns the half-open round when the call is a probe. Hand it to
+        release_probe once the call is over, however it ended.
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.recovery_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(f"circuit {self.name} is open")
+            self._transition(self.HALF_OPEN)
+            self._half_open_calls = 0
+            self._half_open_round += 1
+
+        if self.state == self.HALF_OPEN:
+            if self._half_open_calls >= self.half_open_max_calls:
+                self.rejected += 1
+                raise CircuitOpenError(f"circuit {self.name} is half-open")
+            self._half_open_calls += 1
+            return self._half_open_round
+        return None
+
+    def release_probe(self, half_open_round: int) -> None:
+        """Free a probe slot; a no-op once the circuit has left that half-open round."""
+        if self.state == self.HALF_OPEN and half_open_round == self._half_open_round:
+            self._half_open_calls -= 1
+
+    def record_success(self) -> None:
+        self.successes += 1
+        self._consecutive_failures = 0
+        if self.state != self.CLOSED:
+            self._transition(self.CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._transition(self.OPEN)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "transitions": self.transitions,
+            "rejected": self.rejected,
+            "failures": self.failures,
+            "successes": self.successes,
+        }
+
+
+class LatencyTracker:
+    """Sliding sample of recent request latencies."""
+
+    def __init__(self, size: int = 512):
+        self._samples = deque(maxlen=size)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if len(self._samples) < 20:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class ResilientUpstream:
+    """
+    Circuit breaker, deadline-bounded retries and optional hedging around
+    one upstream service.
+    """
+
+    def __init__(self, name: str, send: Callable[..., Awaitable[httpx.Response]]):
+        self.name = name
+        self._send = send
+        self.breaker = CircuitBreaker(
+            name,
+            failure_threshold=settings.TASKS_BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout=settings.TASKS_BREAKER_RECOVERY_SECONDS,
+            half_open_max_calls=settings.TASKS_BREAKER_HALF_OPEN_MAX_CALLS,
+        )
+        self.latency = LatencyTracker()
+        self.requests = 0
+        self.attempts = 0
+        self.retries = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.deadline_exceeded = 0
+        self.short_circuited = 0
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        idempotent: bool = False,
+        hedge: bool = False,
+        deadline: Optional[float] = None,
+        **kwargs: Any
+    ) -> httpx.Response:
+        """
+        Send a request within a total time budget.
+
+        Idempotent requests are retried on transport errors and 502/503/504.
+        Other requests are only retried when the connection was never made.
+        Raises UpstreamUnavailable when the circuit is open, the deadline
+        runs out, or every attempt failed at the transport level.
+        """
+        self.requests += 1
+        budget = deadline if deadline is not None else settings.TASKS_REQUEST_DEADLINE_SECONDS
+        expires_at = time.monotonic() + budget
+
+        def should_retry(error: BaseException) -> bool:
+            if isinstance(error, (CircuitOpenError, DeadlineExceeded)):
+                return False
+            if isinstance(error, RetryableStatus):
+                return idempotent
+            if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+                return True
+            return idempotent and isinstance(error, httpx.TransportError)
+
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(settings.TASKS_RETRY_MAX_ATTEMPTS),
+            wait=wait_random_exponential(multiplier=0.05, max=0.5),
+            retry=retry_if_exception(should_retry),
+            reraise=True,
+        )
+
+        try:
+            async for attempt in retrying:
+                with attempt:
+                    if attempt.retry_state.attempt_number > 1:
+                        self.retries += 1
+                    return await self._attempt(method, path, expires_at, hedge and idempotent, **kwargs)
+        except RetryableStatus as e:
+            # Out of attempts: hand the last reply back to the caller
+            return e.response
+        except CircuitOpenError:
+            self.short_circuited += 1
+            raise UpstreamUnavailable(self.name, "circuit open")
+        except DeadlineExceeded:
+            self.deadline_exceeded += 1
+            raise UpstreamUnavailable(self.name, f"no reply within {budget:.1f}s")
+        except httpx.TransportError as e:
+            raise UpstreamUnavailable(self.name, str(e) or type(e).__name__)
+
+    async def _attempt(self, method: str, path: str, expires_at: float, hedge: bool, **kwargs: Any) -> httpx.Response:
+        remaining = expires_at - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded()
+        probe = self.breaker.before_call()
+
+        try:
+            if hedge:
+                coro = self._hedged(method, path, **kwargs)
+            else:
+                coro = self._send_once(method, path, **kwargs)
+            return await asyncio.wait_for(coro, timeout=remaining)
+        except asyncio.TimeoutError:
+            self.breaker.record_failure()
+            raise DeadlineExceeded()
+        finally:
+            # A cancelled probe records neither outcome; free its slot for the next one
+            if probe is not None:
+                self.breaker.release_probe(probe)
+
+    async def _send_once(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        self.attempts += 1
+        started = time.monotonic()
+        try:
+            response = await self._send(method, path, **kwargs)
+        except httpx.TransportError:
+            self.breaker.record_failure()
+            raise
+
+        self.latency.observe(time.monotonic() - started)
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            # Release a streamed reply's connection before trying again
+            await response.aread()
+            raise RetryableStatus(response)
+        return response
+
+    async def _hedged(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        p95 = self.latency.percentile(settings.TASKS_HEDGE_PERCENTILE)
+        if p95 is None:
+            return await self._send_once(method, path, **kwargs)
+
+        delay = max(p95, settings.TASKS_HEDGE_MIN_DELAY_MS / 1000)
+        primary = asyncio.ensure_future(self._send_once(method, path, **kwargs))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                self.hedges_sent += 1
+                pending.add(asyncio.ensure_future(self._send_once(method, path, **kwargs)))
+
+            first_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedges_won += 1
+                        return task.result()
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        p95 = self.latency.percentile(95)
+        return {
+            "breaker": self.breaker.stats(),
+            "requests": self.requests,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+            "deadline_exceeded": self.deadline_exceeded,
+            "short_circuited": self.short_circuited,
+            "latency_p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+        }
+
+
+tasks_service = ResilientUpstream("tasks-service", tasks_request)
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+import logging
+
+from jose import jwt, JWTError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_TYPE = "publisher_session"
+
+
+def create_access_token(publisher_id, is_active: bool, generation: int) -> Dict[str, Any]:
+    """
+    Create a signed session token for a publisher.
+
+    Returns:
+        Dict with the encoded token, its type and lifetime in seconds
+    """
+    expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    now = datetime.utcnow()
+    claims = {
+        "sub": str(publisher_id),
+        "act": bool(is_active),
+        "gen": int(generation),
+        "typ": TOKEN_TYPE,
+        "iat": now,
+        "exp": now + expires_delta,
+    }
+    token = jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return {
+        "access_token": token,
+        "token_type": "bearer",
+        "expires_in": int(expires_delta.total_seconds()),
+    }
+
+
+def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Verify a session token's signature, type and expiry.
+
+    Revocation is checked by the caller against the publisher's stored
+    token_generation.
+
+    Returns:
+        The token claims, or None if the token is invalid or expired
+    """
+    try:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError as e:
+        logger.warning(f"Rejected session token: {str(e)}")
+        return None
+
+    if claims.get("typ") != TOKEN_TYPE or "sub" not in claims:
+        logger.warning("Rejected session token with unexpected claims")
+        return None
+
+    return claims
@@ -0,0 +1,84 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one in-flight execution.
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it runs await the same task. A caller being cancelled (for
+    example a client disconnecting) never cancels the shared work. With a
+    positive result_ttl, successful results are also replayed to callers that
+    arrive shortly after the work finished.
+    """
+
+    def __init__(self, result_ttl: float = 0.0, max_results: int = 10000):
+        self.result_ttl = result_ttl
+        self.max_results = max_results
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._results: Dict[Hashable, Tuple[float, Any]] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.window_hits = 0
+        self.failures = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Return fn()'s result, sharing it with every concurrent caller for key."""
+        self.calls += 1
+
+        if self.result_ttl > 0:
+            cached = self._results.get(key)
+            if cached is not None:
+                expires_at, value = cached
+                if expires_at > time.monotonic():
+                    self.window_hits += 1
+                    return value
+                del self._results[key]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+        if task.cancelled():
+            self.failures += 1
+            return
+        if task.exception() is not None:
+            self.failures += 1
+            return
+
+        if self.result_ttl > 0:
+            now = time.monotonic()
+            if len(self._results) >= self.max_results:
+                self._results = {k: v for k, v in self._results.items() if v[0] > now}
+            if len(self._results) < self.max_results:
+                self._results[key] = (now + self.result_ttl, task.result())
+
+    def forget(self, key: Hashable) -> None:
+        """Drop any replayable result for key."""
+        self._results.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "upstream_calls": self.executions,
+            "coalesced": self.coalesced,
+            "window_hits": self.window_hits,
+            "upstream_calls_saved": self.coalesced + self.window_hits,
+            "failures": self.failures,
+            "in_flight": len(self._in_flight),
+            "result_window_ms": int(self.result_ttl * 1000),
+        }
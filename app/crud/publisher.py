@@ -1,18 +1,29 @@
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+import asyncio
+import base64
+import json
+import re
 import uuid
 import secrets
 import httpx
 from fastapi import HTTPException, status
 import logging
+from sqlalchemy import Column, Integer, MetaData, String, Table, and_, case, cast, func, literal, literal_column, or_, tuple_, update
+from sqlalchemy.types import UserDefinedType
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION, JSONB, UUID as PG_UUID, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.models.publisher import Publisher
 from app.schemas.publisher import PublisherCreate, PublisherUpdate, PublisherConfigurationUpdate
-from app.schemas.task import Task
-from app.core.exceptions import ResourceNotFound, DuplicateResource
+from app.schemas.task import Task, TaskStatusBatchItem
+from app.core.exceptions import ResourceNotFound, DuplicateResource, UpstreamUnavailable, VersionConflict
 from app.core.config import settings
+from app.core.resilience import tasks_service
+from app.core.singleflight import SingleFlight
+from app.core.auth import invalidate_publisher_credentials
 
 logger = logging.getLogger(__name__)
 
@@ -47,116 +58,590 @@ def get_publisher_by_email(db: Session, email: str) -> Optional[Publisher]:
 def get_publisher_by_api_key(db: Session, api_key: str) -> Optional[Publisher]:
     return db.query(Publisher).filter(Publisher.api_key == api_key).first()
 
-def get_publishers(db: Session, skip: int = 0, limit: int = 100) -> List[Publisher]:
-    return db.query(Publisher).offset(skip).limit(limit).all()
+def _encode_cursor(position: List[Any]) -> str:
+    raw = json.dumps(position)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
 
-def create_publisher(db: Session, publisher: PublisherCreate) -> Publisher:
+def _decode_cursor(cursor: str) -> List[Any]:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    return json.loads(raw)
+
+def encode_publisher_cursor(publisher: Publisher) -> str:
+    """Opaque keyset position just after `publisher` in listing order."""
+    return _encode_cursor([publisher.created_at.isoformat(), str(publisher.id)])
+
+def decode_publisher_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
     """
-    Create a new publisher using synchronous SQLAlchemy session.
-    Use this for synchronous route handlers.
+    Raises:
+        ValueError: If the cursor was not issued by encode_publisher_cursor
     """
-    # Check if publisher with same email exists
-    existing = db.query(Publisher).filter(Publisher.email == publisher.email).first()
-    if existing:
-        raise DuplicateResource(f"Publisher with email {publisher.email} already exists")
+    try:
+        created_at, publisher_id = _decode_cursor(cursor)
+        return datetime.fromisoformat(created_at), uuid.UUID(publisher_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def _like_prefix(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def _website_domain_filter(domain: str):
+    """
+    Publishers whose website is on `domain` (with or without "www.").
+    Prefix LIKEs are served by the website pattern index; the regex only
+    rechecks where the host ends.
+    """
+    domain = domain.strip().lower()
+    if domain.startswith("www."):
+        domain = domain[4:]
+    prefixes = [
+        f"{scheme}://{www}{domain}"
+        for scheme in ("http", "https")
+        for www in ("", "www.")
+    ]
+    return and_(
+        or_(*(Publisher.website.like(_like_prefix(prefix), escape="\\") for prefix in prefixes)),
+        Publisher.website.op("~*")(f"^https?://(www\\.)?{re.escape(domain)}([:/?#]|$)")
+    )
+
+def _list_publishers_query(
+    limit: int,
+    cursor: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    name_prefix: Optional[str] = None,
+    website_domain: Optional[str] = None
+):
+    """
+    Newest publishers first, keyset-paginated on (created_at, id) so every
+    page is an index range scan no matter how deep it is.
+    """
+    query = select(Publisher)
+    if cursor is not None:
+        created_at, publisher_id = decode_publisher_cursor(cursor)
+        query = query.where(tuple_(Publisher.created_at, Publisher.id) < tuple_(created_at, publisher_id))
+    if is_active is not None:
+        query = query.where(Publisher.is_active == is_active)
+    if name_prefix:
+        query = query.where(Publisher.name.like(_like_prefix(name_prefix), escape="\\"))
+    if website_domain:
+        query = query.where(_website_domain_filter(website_domain))
+    # One extra row tells whether there is a next page
+    return query.order_by(Publisher.created_at.desc(), Publisher.id.desc()).limit(limit + 1)
+
+def _publisher_page(rows: List[Publisher], limit: int) -> Tuple[List[Publisher], Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_publisher_cursor(rows[-1])
+
+def list_publishers(
+    db: Session,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    name_prefix: Optional[str] = None,
+    website_domain: Optional[str] = None
+) -> Tuple[List[Publisher], Optional[str]]:
+    """
+    One page of publishers and the cursor for the next (None on the last page).
     
-    # Generate API key
-    api_key = f"pk_live_{secrets.token_urlsafe(16)}"
+    Raises:
+        ValueError: If the cursor is invalid
+    """
+    query = _list_publishers_query(limit, cursor, is_active, name_prefix, website_domain)
+    return _publisher_page(db.execute(query).scalars().all(), limit)
+
+def _like_contains(value: str) -> str:
+    return "%" + _like_prefix(value)
+
+def _search_publishers_query(query: str, limit: int, cursor: Optional[str] = None):
+    """
+    Publishers matching `query` as words in name/description (tsvector) or,
+    from three characters, as a substring of name or website (trigram GIN).
+    Ranked by text rank plus trigram similarity, keyset-paginated on
+    (rank, id).
     
-    # Create new publisher
-    db_publisher = Publisher(
-        name=publisher.name,
-        website=str(publisher.website),
-        email=publisher.email,
-        description=publisher.description,
-        api_key=api_key
+    Only the first PUBLISHER_SEARCH_MAX_CANDIDATES matches the index scans
+    produce are ranked. Scoring every match of a broad term would fetch and
+    rank a large part of the table. The subquery has no ORDER BY on purpose:
+    with one, the planner may walk the primary key and filter every row.
+    A term matching more than the cap is therefore ranked over a sample.
+    """
+    tsquery = func.websearch_to_tsquery(literal_column("'simple'"), query)
+    matches = [Publisher.search_vector.op("@@")(tsquery)]
+    # Every term is coalesced: one NULL column would make the whole rank NULL,
+    # which sorts first under DESC and cannot be encoded in the cursor
+    rank = func.coalesce(func.ts_rank(Publisher.search_vector, tsquery), 0)
+    if len(query) >= 3:
+        pattern = _like_contains(query)
+        matches.append(Publisher.name.ilike(pattern, escape="\\"))
+        matches.append(Publisher.website.ilike(pattern, escape="\\"))
+        rank = (
+            rank
+            + func.coalesce(func.similarity(Publisher.name, query), 0)
+            + func.coalesce(func.similarity(Publisher.website, query), 0)
+        )
+
+    # float8 round-trips exactly through the cursor; float4 text output does not
+    rank = cast(rank, DOUBLE_PRECISION)
+
+    candidates = (
+        select(Publisher.id)
+        .where(or_(*matches))
+        .limit(settings.PUBLISHER_SEARCH_MAX_CANDIDATES)
+        .subquery()
     )
-    db.add(db_publisher)
+    statement = select(Publisher, rank.label("rank")).join(candidates, Publisher.id == candidates.c.id)
+    if cursor is not None:
+        after_rank, after_id = decode_search_cursor(cursor)
+        statement = statement.where(or_(rank < after_rank, and_(rank == after_rank, Publisher.id < after_id)))
+    return statement.order_by(rank.desc(), Publisher.id.desc()).limit(limit + 1)
+
+def decode_search_cursor(cursor: str) -> Tuple[float, uuid.UUID]:
+    """
+    Raises:
+        ValueError: If the cursor was not issued by a previous search page
+    """
+    try:
+        rank, publisher_id = _decode_cursor(cursor)
+        return float(rank), uuid.UUID(publisher_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def _search_page(rows: List[Any], limit: int) -> Tuple[List[Tuple[Publisher, float]], Optional[str]]:
+    results = [(publisher, rank) for publisher, rank in rows]
+    if len(results) <= limit:
+        return results, None
+    results = results[:limit]
+    last, rank = results[-1]
+    return results, _encode_cursor([rank, str(last.id)])
+
+def search_publishers(
+    db: Session,
+    query: str,
+    limit: int = 20,
+    cursor: Optional[str] = None
+) -> Tuple[List[Tuple[Publisher, float]], Optional[str]]:
+    """
+    One page of (publisher, rank) search results, best first, and the
+    cursor for the next page (None on the last page).
+    
+    Raises:
+        ValueError: If the cursor is invalid
+    """
+    statement = _search_publishers_query(query, limit, cursor)
+    return _search_page(db.execute(statement).all(), limit)
+
+class _JSONPath(UserDefinedType):
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return "JSONPATH"
+
+def _configuration_path(key: str) -> str:
+    # "appearance.theme" -> $."appearance"."theme"
+    parts = [part.replace("\\", "\\\\").replace('"', '\\"') for part in key.split(".")]
+    return "$" + "".join(f'."{part}"' for part in parts)
+
+def configuration_filter(contains: Optional[Dict[str, Any]] = None, keys: Optional[List[str]] = None):
+    """
+    WHERE clause matching publishers by configuration, served by the GIN index.
+    
+    Args:
+        contains: Nested values the configuration must contain (@>), e.g.
+            {"appearance": {"theme": "dark"}}
+        keys: Keys that must be present; dotted keys address nested
+            sections, e.g. "behavior.auto_assign"
+    """
+    clauses = []
+    if contains:
+        clauses.append(Publisher.configuration.contains(contains))
+    for key in keys or []:
+        if "." in key:
+            clauses.append(Publisher.configuration.op("@?")(cast(_configuration_path(key), _JSONPath())))
+        else:
+            clauses.append(Publisher.configuration.has_key(key))
+    return and_(*clauses)
+
+def find_publishers_by_configuration(
+    db: Session,
+    contains: Optional[Dict[str, Any]] = None,
+    keys: Optional[List[str]] = None,
+    limit: int = 100
+) -> List[Publisher]:
+    """Publishers whose configuration matches, see configuration_filter."""
+    return db.query(Publisher).filter(configuration_filter(contains, keys)).limit(limit).all()
+
+# Columns an export may include; credentials are never exported
+EXPORT_FIELDS = (
+    "id", "name", "email", "website", "description", "configuration",
+    "is_active", "version", "created_at", "updated_at",
+)
+
+def publisher_export_query(fields: List[str], is_active: Optional[bool] = None):
+    """Projection of the publishers table in listing order, for streaming export."""
+    query = select(*(Publisher.__table__.c[field] for field in fields))
+    if is_active is not None:
+        query = query.where(Publisher.is_active == is_active)
+    return query.order_by(Publisher.created_at, Publisher.id)
+
+def _new_api_key() -> str:
+    return f"pk_live_{secrets.token_urlsafe(16)}"
+
+def new_api_keys(count: int) -> List[str]:
+    """`count` keys in the _new_api_key format from a single entropy read."""
+    entropy = secrets.token_bytes(16 * count)
+    return [
+        "pk_live_" + base64.urlsafe_b64encode(entropy[i:i + 16]).rstrip(b"=").decode()
+        for i in range(0, 16 * count, 16)
+    ]
+
+# Per-transaction staging table for bulk imports; kept off Base.metadata so
+# migrations never see it
+import_staging = Table(
+    "publisher_import_staging",
+    MetaData(),
+    Column("row_no", Integer, nullable=False),
+    Column("id", PG_UUID(as_uuid=True), nullable=False),
+    Column("name", String),
+    Column("website", String),
+    Column("email", String),
+    Column("description", String),
+    Column("api_key", String),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+IMPORT_STAGING_COLUMNS = [column.name for column in import_staging.columns]
+
+def merge_staged_publishers():
+    """
+    INSERT ... SELECT the staged rows into publishers, returning the ids that
+    went in. The first row per email wins; rows whose email (or, in theory,
+    id or API key) is already taken are skipped.
+    """
+    staged = (
+        select(
+            import_staging.c.id,
+            import_staging.c.name,
+            import_staging.c.website,
+            import_staging.c.email,
+            import_staging.c.description,
+            import_staging.c.api_key,
+            literal({}, JSONB),
+            literal(True),
+        )
+        .distinct(import_staging.c.email)
+        .order_by(import_staging.c.email, import_staging.c.row_no)
+    )
+    return (
+        pg_insert(Publisher)
+        .from_select(
+            ["id", "name", "website", "email", "description", "api_key", "configuration", "is_active"],
+            staged
+        )
+        .on_conflict_do_nothing()
+        .returning(Publisher.id)
+    )
+
+def _returning(statement):
+    """Load the row written by an INSERT or UPDATE as a Publisher, in the same round trip."""
+    return select(Publisher).from_statement(
+        statement.returning(*Publisher.__table__.columns)
+    ).execution_options(populate_existing=True)
+
+def _insert_publisher(publisher: PublisherCreate):
+    # The unique email constraint does the duplicate check: a conflicting
+    # insert returns no row instead of raising
+    return _returning(
+        pg_insert(Publisher)
+        .values(
+            name=publisher.name,
+            website=str(publisher.website),
+            email=publisher.email,
+            description=publisher.description,
+            api_key=_new_api_key()
+        )
+        .on_conflict_do_nothing(index_elements=[Publisher.email])
+    )
+
+def _update_publisher(publisher_id, expected_versions: Optional[List[int]] = None, **values):
+    """
+    UPDATE ... RETURNING for one publisher. Every write bumps the row version;
+    with expected_versions the write only applies while the row is still at
+    one of them (compare-and-swap, no row lock held between read and write).
+    """
+    if isinstance(publisher_id, str):
+        publisher_id = uuid.UUID(publisher_id)
+    statement = update(Publisher).where(Publisher.id == publisher_id)
+    if expected_versions is not None:
+        statement = statement.where(Publisher.version.in_(expected_versions))
+    return _returning(statement.values(version=Publisher.version + 1, **values))
+
+def _current_version(publisher_id):
+    if isinstance(publisher_id, str):
+        publisher_id = uuid.UUID(publisher_id)
+    return select(Publisher.version).where(Publisher.id == publisher_id)
+
+def _update_values(publisher_update: PublisherUpdate) -> Dict[str, Any]:
+    # Fields without a column (preferred_task_types) are accepted and ignored
+    columns = Publisher.__table__.c
+    values = {
+        field: value for field, value in publisher_update.dict(exclude_unset=True).items()
+        if field in columns
+    }
+    if values.get("website") is not None:
+        values["website"] = str(values["website"])
+    return values
+
+def _configuration_merge(config_update: PublisherConfigurationUpdate):
+    """
+    SQL expression merging the sections present in config_update into the
+    stored configuration, key by key within each section:
+    configuration || jsonb_build_object(section, configuration->section || patch, ...)
+    
+    Postgres evaluates it against the row it is updating, so concurrent
+    updates to different keys no longer overwrite each other.
+    """
+    current = func.coalesce(Publisher.configuration, literal({}, JSONB))
+    sections = []
+    for section, section_data in config_update.dict(exclude_unset=True).items():
+        if section_data is None:
+            continue
+        stored = case(
+            (func.jsonb_typeof(current[section]) == "object", current[section]),
+            else_=literal({}, JSONB)
+        )
+        sections.extend([section, stored.op("||", return_type=JSONB)(literal(section_data, JSONB))])
+    
+    if not sections:
+        return Publisher.configuration
+    return current.op("||", return_type=JSONB)(func.jsonb_build_object(*sections))
+
+def _activation_values(is_active: bool) -> Dict[str, Any]:
+    values: Dict[str, Any] = {"is_active": is_active}
+    if not is_active:
+        # Outstanding session tokens still claim the account is active
+        values["token_generation"] = Publisher.token_generation + 1
+    return values
+
+def create_publisher(db: Session, publisher: PublisherCreate) -> Publisher:
+    """
+    Create a new publisher using synchronous SQLAlchemy session.
+    Use this for synchronous route handlers.
+    
+    Raises:
+        DuplicateResource: If a publisher with the same email exists
+    """
+    db_publisher = db.execute(_insert_publisher(publisher)).scalar_one_or_none()
     db.commit()
-    db.refresh(db_publisher)
+    if db_publisher is None:
+        raise DuplicateResource(f"Publisher with email {publisher.email} already exists")
     return db_publisher
 
-def update_publisher(db: Session, publisher_id: str, publisher_update: PublisherUpdate) -> Optional[Publisher]:
-    db_publisher = get_publisher(db, publisher_id)
-    if not db_publisher:
-        return None
-    
-    update_data = publisher_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_publisher, field, value)
+def _check_conflict(db: Session, publisher_id: str, expected_versions: Optional[List[int]]) -> None:
+    # Only reached when the conditional UPDATE matched nothing
+    if expected_versions is None:
+        return
+    current = db.execute(_current_version(publisher_id)).scalar_one_or_none()
+    if current is not None:
+        raise VersionConflict("Publisher", str(publisher_id), current)
+
+def update_publisher(
+    db: Session,
+    publisher_id: str,
+    publisher_update: PublisherUpdate,
+    expected_versions: Optional[List[int]] = None
+) -> Optional[Publisher]:
+    """
+    Update publisher details.
     
+    Raises:
+        VersionConflict: If expected_versions is given and the row has moved on
+    """
+    db_publisher = db.execute(
+        _update_publisher(publisher_id, expected_versions, **_update_values(publisher_update))
+    ).scalar_one_or_none()
     db.commit()
-    db.refresh(db_publisher)
+    if db_publisher is None:
+        _check_conflict(db, publisher_id, expected_versions)
+        return None
+    invalidate_publisher_credentials(db_publisher.id)
     return db_publisher
 
 def update_publisher_configuration(
     db: Session, 
     publisher_id: str, 
-    config_update: PublisherConfigurationUpdate
+    config_update: PublisherConfigurationUpdate,
+    expected_versions: Optional[List[int]] = None
 ) -> Optional[Publisher]:
-    db_publisher = get_publisher(db, publisher_id)
-    if not db_publisher:
-        return None
-    
-    # Get current configuration
-    current_config = db_publisher.configuration or {}
-    
-    # Update configuration with new values
-    config_update_dict = config_update.dict(exclude_unset=True)
-    for section, section_data in config_update_dict.items():
-        if section_data is not None:
-            if section not in current_config:
-                current_config[section] = {}
-            current_config[section].update(section_data)
+    """
+    Merge configuration sections into the stored configuration.
     
-    # Save updated configuration
-    db_publisher.configuration = current_config
+    Raises:
+        VersionConflict: If expected_versions is given and the row has moved on
+    """
+    db_publisher = db.execute(
+        _update_publisher(publisher_id, expected_versions, configuration=_configuration_merge(config_update))
+    ).scalar_one_or_none()
     db.commit()
-    db.refresh(db_publisher)
+    if db_publisher is None:
+        _check_conflict(db, publisher_id, expected_versions)
+        return None
+    invalidate_publisher_credentials(db_publisher.id)
+    return db_publisher
+
+def set_publisher_active(db: Session, publisher_id: str, is_active: bool) -> Optional[Publisher]:
+    """Activate or deactivate a publisher, revoking cached credentials."""
+    db_publisher = db.execute(
+        _update_publisher(publisher_id, **_activation_values(is_active))
+    ).scalar_one_or_none()
+    db.commit()
+    if db_publisher is not None:
+        invalidate_publisher_credentials(db_publisher.id)
     return db_publisher
 
 def regenerate_api_key(db: Session, publisher_id: str) -> Optional[str]:
-    db_publisher = get_publisher(db, publisher_id)
-    if not db_publisher:
+    db_publisher = db.execute(
+        _update_publisher(
+            publisher_id,
+            api_key=_new_api_key(),
+            token_generation=Publisher.token_generation + 1
+        )
+    ).scalar_one_or_none()
+    db.commit()
+    if db_publisher is None:
         return None
+    invalidate_publisher_credentials(db_publisher.id)
+    return db_publisher.api_key
+
+# Concurrent identical task fetches share one upstream request per worker
+available_tasks_flight = SingleFlight(result_ttl=settings.TASKS_COALESCE_WINDOW_MS / 1000)
+
+def _available_tasks_request(
+    publisher_id: str,
+    task_status: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    params = {"publisher_id": str(publisher_id)}
+    if task_status is not None:
+        params["status"] = task_status
+    if limit is not None:
+        params["limit"] = limit
+    if cursor is not None:
+        params["cursor"] = cursor
+    
+    headers = {
+        "X-Internal-Key": settings.SECRET_KEY,
+        "Content-Type": "application/json"
+    }
+    return {"params": params, "headers": headers}
+
+async def _fetch_available_tasks(
+    publisher_id: str,
+    task_status: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> List[Dict]:
+    # Idempotent read: retried within the deadline and hedged when enabled.
+    # Raises UpstreamUnavailable instead of quietly returning nothing.
+    response = await tasks_service.request(
+        "GET",
+        "/api/v1/tasks/available",
+        idempotent=True,
+        hedge=settings.TASKS_HEDGE_ENABLED,
+        **_available_tasks_request(publisher_id, task_status, limit, cursor)
+    )
     
-    # Generate new API key
-    new_api_key = f"pk_live_{secrets.token_urlsafe(16)}"
-    db_publisher.api_key = new_api_key
+    if response.status_code == 200:
+        data = response.json()
+        return data.get("items", [])
+    if response.status_code >= 500:
+        logger.error(f"Tasks service error: {response.status_code} - {response.text}")
+        raise UpstreamUnavailable(tasks_service.name, f"status {response.status_code}")
     
-    db.commit()
-    return new_api_key
+    logger.error(f"Failed to get available tasks: {response.text}")
+    return []
 
-async def get_available_tasks(publisher_id: str, db: AsyncSession) -> List[Dict]:
-    """Get available tasks for a publisher."""
-    try:
-        headers = {
-            "X-Internal-Key": settings.SECRET_KEY,
-            "Content-Type": "application/json"
-        }
+async def get_available_tasks(
+    publisher_id: str,
+    db: AsyncSession,
+    task_status: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> List[Dict]:
+    """
+    Get available tasks for a publisher.
+    
+    The filters are applied by the tasks service. Callers asking for the
+    same (publisher_id, task_status, limit, cursor) while a fetch is in
+    flight share its result, so the returned list must be treated as
+    read-only.
+    """
+    key = (str(publisher_id), task_status, limit, cursor)
+    return await available_tasks_flight.do(
+        key, lambda: _fetch_available_tasks(publisher_id, task_status, limit, cursor)
+    )
+
+async def open_available_tasks_stream(
+    publisher_id: str,
+    task_status: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Optional[httpx.Response]:
+    """
+    Start an available-tasks request without reading its body.
+    
+    Returns:
+        The upstream response with the body still unread (the caller must
+        aclose() it), or None when the tasks service rejected the request
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{settings.TASKS_SERVICE_URL}/api/v1/tasks/available",
-                params={"publisher_id": str(publisher_id)},
-                headers=headers
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("items", [])
-            else:
-                logger.error(f"Failed to get available tasks: {response.text}")
-                return []
-                
-    except Exception as e:
-        logger.error(f"Error getting available tasks: {str(e)}")
-        return []
+    Raises:
+        UpstreamUnavailable: If the tasks service cannot serve the request
+    """
+    # No hedging: a losing hedge would hold a streamed connection open
+    response = await tasks_service.request(
+        "GET",
+        "/api/v1/tasks/available",
+        idempotent=True,
+        stream=True,
+        **_available_tasks_request(publisher_id, task_status, limit, cursor)
+    )
+    if response.status_code == 200:
+        return response
+    
+    await response.aread()
+    await response.aclose()
+    if response.status_code >= 500:
+        logger.error(f"Tasks service error: {response.status_code} - {response.text}")
+        raise UpstreamUnavailable(tasks_service.name, f"status {response.status_code}")
+    
+    logger.error(f"Failed to get available tasks: {response.text}")
+    return None
 
-def update_task_status(
-    db: Session,
+def _status_payload(
+    task_status: str,
+    result: Optional[Dict[str, Any]],
+    quality_score: Optional[float],
+    rejection_reason: Optional[str]
+) -> Dict[str, Any]:
+    data = {
+        "status": task_status
+    }
+    
+    if result is not None:
+        data["result"] = result
+        
+    if quality_score is not None:
+        data["quality_score"] = quality_score
+        
+    if rejection_reason is not None:
+        data["rejection_reason"] = rejection_reason
+    
+    return data
+
+async def update_task_status(
     task_id: str,
-    status: str,
+    task_status: str,
     result: Optional[Dict[str, Any]] = None,
     quality_score: Optional[float] = None,
     rejection_reason: Optional[str] = None
@@ -165,9 +650,8 @@ def update_task_status(
     Update the status of a task using the tasks service.
     
     Args:
-        db: Database session
         task_id: ID of the task to update
-        status: New status for the task
+        task_status: New status for the task
         result: Optional result data to submit
         quality_score: Optional quality score for the task
         rejection_reason: Optional reason for rejection
@@ -179,32 +663,18 @@ def update_task_status(
         HTTPException: If the request to tasks service fails
     """
     try:
-        # Prepare request data
-        data = {
-            "status": status
-        }
+        data = _status_payload(task_status, result, quality_score, rejection_reason)
         
-        if result is not None:
-            data["result"] = result
-            
-        if quality_score is not None:
-            data["quality_score"] = quality_score
-            
-        if rejection_reason is not None:
-            data["rejection_reason"] = rejection_reason
-            
-        # Make request to tasks service (internal communication)
-        with httpx.Client() as client:
-            # Use the internal service URL for service-to-service communication
-            response = client.post(
-                f"{settings.TASKS_SERVICE_URL}/api/v1/tasks/{task_id}/status",
-                json=data,
-                headers={"X-Internal-Service": "true"},
-                timeout=10.0
-            )
+        # Not idempotent: only retried when the connection was never made
+        response = await tasks_service.request(
+            "POST",
+            f"/api/v1/tasks/{task_id}/status",
+            json=data,
+            headers={"X-Internal-Service": "true"}
+        )
         
         # Handle response
-        if response.status_code == status.HTTP_200_OK:
+        if response.status_code == httpx.codes.OK:
             return response.json()
         else:
             logger.error(f"Tasks service error: {response.status_code} - {response.text}")
@@ -213,24 +683,142 @@ def update_task_status(
                 detail=f"Error updating task status: {response.text}"
             )
             
+    except HTTPException:
+        raise
+    except UpstreamUnavailable as e:
+        logger.error(f"Tasks service unavailable: {e.message}")
+        raise HTTPException(
+            status_code=httpx.codes.SERVICE_UNAVAILABLE,
+            detail="Tasks service is unavailable"
+        )
     except httpx.RequestError as e:
         logger.error(f"Failed to connect to tasks service: {str(e)}")
         raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            status_code=httpx.codes.SERVICE_UNAVAILABLE,
             detail="Tasks service is unavailable"
         )
     except Exception as e:
         logger.error(f"Unexpected error updating task status: {str(e)}")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=httpx.codes.INTERNAL_SERVER_ERROR,
             detail="Internal server error while updating task status"
         )
 
+def _batch_result(task_id: str, item: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    One batch reply item in the same shape as a fanned-out update: task_id,
+    status_code and either the updated task or an error message.
+    """
+    if item is None:
+        return {"task_id": task_id, "status_code": httpx.codes.BAD_GATEWAY, "error": "Missing from tasks service reply"}
+    try:
+        status_code = int(item.get("status_code", httpx.codes.OK))
+    except (TypeError, ValueError):
+        return {"task_id": task_id, "status_code": httpx.codes.BAD_GATEWAY, "error": "Malformed tasks service reply"}
+    
+    if status_code == httpx.codes.OK and not item.get("error"):
+        task = item.get("task")
+        if not isinstance(task, dict):
+            # Items may also be the updated task itself
+            task = {key: value for key, value in item.items() if key != "status_code"}
+        return {"task_id": task_id, "status_code": status_code, "task": task}
+    
+    error = item.get("error") or item.get("detail") or f"Tasks service returned {status_code}"
+    if status_code == httpx.codes.OK:
+        status_code = httpx.codes.BAD_GATEWAY
+    return {"task_id": task_id, "status_code": status_code, "error": str(error)}
+
+# Flipped off after the tasks service rejects the batch route once
+_batch_status_supported = True
+
+async def update_task_statuses(updates: List[TaskStatusBatchItem]) -> List[Dict[str, Any]]:
+    """
+    Apply several task status updates and report the outcome of each.
+    
+    Uses the tasks service's batch route when TASKS_SERVICE_BATCH_STATUS is
+    set, otherwise fans the updates out concurrently, at most
+    TASK_STATUS_BATCH_CONCURRENCY at a time.
+    
+    Returns:
+        One dict per update, in request order, with task_id, status_code
+        and either the updated task or an error message
+    """
+    global _batch_status_supported
+    
+    if settings.TASKS_SERVICE_BATCH_STATUS and _batch_status_supported:
+        payload = {
+            "updates": [
+                {"task_id": update.task_id, **_status_payload(
+                    update.status, update.result, update.quality_score, update.rejection_reason
+                )}
+                for update in updates
+            ]
+        }
+        try:
+            response = await tasks_service.request(
+                "POST",
+                "/api/v1/tasks/status/batch",
+                json=payload,
+                headers={"X-Internal-Service": "true"}
+            )
+        except UpstreamUnavailable as e:
+            logger.error(f"Tasks service unavailable for batch status update: {e.message}")
+            return [
+                {"task_id": update.task_id, "status_code": httpx.codes.SERVICE_UNAVAILABLE, "error": "Tasks service is unavailable"}
+                for update in updates
+            ]
+        
+        if response.status_code == httpx.codes.OK:
+            try:
+                items = response.json().get("results", [])
+                by_task = {str(item["task_id"]): item for item in items if isinstance(item, dict) and "task_id" in item}
+            except (ValueError, AttributeError, TypeError):
+                logger.error(f"Malformed batch status reply: {response.text}")
+                by_task = {}
+            return [_batch_result(update.task_id, by_task.get(update.task_id)) for update in updates]
+        if response.status_code in (httpx.codes.NOT_FOUND, httpx.codes.METHOD_NOT_ALLOWED):
+            logger.warning("Tasks service has no batch status route, falling back to fan-out")
+            _batch_status_supported = False
+        else:
+            logger.error(f"Batch status update failed: {response.status_code} - {response.text}")
+            return [
+                {"task_id": update.task_id, "status_code": response.status_code, "error": response.text}
+                for update in updates
+            ]
+    
+    semaphore = asyncio.Semaphore(settings.TASK_STATUS_BATCH_CONCURRENCY)
+    
+    async def apply(update: TaskStatusBatchItem) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                task = await update_task_status(
+                    task_id=update.task_id,
+                    task_status=update.status,
+                    result=update.result,
+                    quality_score=update.quality_score,
+                    rejection_reason=update.rejection_reason
+                )
+                return {"task_id": update.task_id, "status_code": httpx.codes.OK, "task": task}
+            except HTTPException as e:
+                return {"task_id": update.task_id, "status_code": e.status_code, "error": str(e.detail)}
+    
+    return await asyncio.gather(*(apply(update) for update in updates))
+
 async def async_get_publisher(db: AsyncSession, publisher_id: str) -> Optional[Publisher]:
     """Get a publisher by ID - async version."""
+    if isinstance(publisher_id, str):
+        try:
+            publisher_id = uuid.UUID(publisher_id)
+        except ValueError:
+            return None
     result = await db.execute(select(Publisher).filter(Publisher.id == publisher_id))
     return result.scalar_one_or_none()
 
+async def async_get_publisher_by_email(db: AsyncSession, email: str) -> Optional[Publisher]:
+    """Get a publisher by email - async version."""
+    result = await db.execute(select(Publisher).filter(Publisher.email == email))
+    return result.scalar_one_or_none()
+
 async def async_get_publisher_by_api_key(db: AsyncSession, api_key: str) -> Optional[Publisher]:
     """Get a publisher by API key - async version."""
     result = await db.execute(select(Publisher).filter(Publisher.api_key == api_key))
@@ -240,31 +828,114 @@ async def async_create_publisher(db: AsyncSession, publisher: PublisherCreate) -
     """
     Create a new publisher using async SQLAlchemy session.
     Use this for asynchronous route handlers only.
-    """
-    # Generate API key
-    api_key = f"pk_live_{secrets.token_urlsafe(16)}"
     
-    db_publisher = Publisher(
-        name=publisher.name,
-        website=str(publisher.website),
-        email=publisher.email,
-        description=publisher.description,
-        api_key=api_key
-    )
-    db.add(db_publisher)
+    Raises:
+        DuplicateResource: If a publisher with the same email exists
+    """
+    result = await db.execute(_insert_publisher(publisher))
+    db_publisher = result.scalar_one_or_none()
     await db.commit()
-    await db.refresh(db_publisher)
+    if db_publisher is None:
+        raise DuplicateResource(f"Publisher with email {publisher.email} already exists")
     return db_publisher
 
+async def _async_check_conflict(db: AsyncSession, publisher_id: str, expected_versions: Optional[List[int]]) -> None:
+    if expected_versions is None:
+        return
+    current = (await db.execute(_current_version(publisher_id))).scalar_one_or_none()
+    if current is not None:
+        raise VersionConflict("Publisher", str(publisher_id), current)
+
 async def async_update_publisher(
     db: AsyncSession,
-    db_obj: Publisher,
-    obj_in: PublisherUpdate
-) -> Publisher:
+    publisher_id: str,
+    publisher_update: PublisherUpdate,
+    expected_versions: Optional[List[int]] = None
+) -> Optional[Publisher]:
     """Update a publisher - async version."""
-    update_data = obj_in.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_obj, field, value)
+    result = await db.execute(
+        _update_publisher(publisher_id, expected_versions, **_update_values(publisher_update))
+    )
+    db_publisher = result.scalar_one_or_none()
+    await db.commit()
+    if db_publisher is None:
+        await _async_check_conflict(db, publisher_id, expected_versions)
+        return None
+    invalidate_publisher_credentials(db_publisher.id)
+    return db_publisher
+
+async def async_update_publisher_configuration(
+    db: AsyncSession,
+    publisher_id: str,
+    config_update: PublisherConfigurationUpdate,
+    expected_versions: Optional[List[int]] = None
+) -> Optional[Publisher]:
+    """Update publisher configuration - async version."""
+    result = await db.execute(
+        _update_publisher(publisher_id, expected_versions, configuration=_configuration_merge(config_update))
+    )
+    db_publisher = result.scalar_one_or_none()
+    await db.commit()
+    if db_publisher is None:
+        await _async_check_conflict(db, publisher_id, expected_versions)
+        return None
+    invalidate_publisher_credentials(db_publisher.id)
+    return db_publisher
+
+async def async_set_publisher_active(db: AsyncSession, publisher_id: str, is_active: bool) -> Optional[Publisher]:
+    """Activate or deactivate a publisher - async version."""
+    result = await db.execute(_update_publisher(publisher_id, **_activation_values(is_active)))
+    db_publisher = result.scalar_one_or_none()
     await db.commit()
-    await db.refresh(db_obj)
-    return db_obj
+    if db_publisher is not None:
+        invalidate_publisher_credentials(db_publisher.id)
+    return db_publisher
+
+async def async_regenerate_api_key(db: AsyncSession, publisher_id: str) -> Optional[str]:
+    """Rotate a publisher's API key - async version."""
+    result = await db.execute(
+        _update_publisher(
+            publisher_id,
+            api_key=_new_api_key(),
+            token_generation=Publisher.token_generation + 1
+        )
+    )
+    db_publisher = result.scalar_one_or_none()
+    await db.commit()
+    if db_publisher is None:
+        return None
+    invalidate_publisher_credentials(db_publisher.id)
+    return db_publisher.api_key
+
+async def async_list_publishers(
+    db: AsyncSession,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    name_prefix: Optional[str] = None,
+    website_domain: Optional[str] = None
+) -> Tuple[List[Publisher], Optional[str]]:
+    """List publishers - async version."""
+    query = _list_publishers_query(limit, cursor, is_active, name_prefix, website_domain)
+    result = await db.execute(query)
+    return _publisher_page(result.scalars().all(), limit)
+
+async def async_search_publishers(
+    db: AsyncSession,
+    query: str,
+    limit: int = 20,
+    cursor: Optional[str] = None
+) -> Tuple[List[Tuple[Publisher, float]], Optional[str]]:
+    """Search publishers - async version."""
+    result = await db.execute(_search_publishers_query(query, limit, cursor))
+    return _search_page(result.all(), limit)
+
+async def async_find_publishers_by_configuration(
+    db: AsyncSession,
+    contains: Optional[Dict[str, Any]] = None,
+    keys: Optional[List[str]] = None,
+    limit: int = 100
+) -> List[Publisher]:
+    """Publishers whose configuration matches - async version."""
+    result = await db.execute(select(Publisher).filter(configuration_filter(contains, keys)).limit(limit))
+    return result.scalars().all()
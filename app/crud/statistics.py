@@ -0,0 +1,105 @@
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple
+import uuid
+
+from sqlalchemy import and_, delete, func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import Session
+
+from app.models.statistics import PublisherStatsRollup
+
+# (granularity, first bucket_start, end) with the end exclusive
+BucketRange = Tuple[str, datetime, datetime]
+
+_ADDITIVE = (
+    "tasks_served", "tasks_completed", "tasks_rejected",
+    "quality_count", "quality_sum", "completion_count", "completion_seconds_sum",
+)
+_HISTOGRAMS = ("quality_histogram", "completion_histogram")
+
+def _upsert_rollups(rows: List[Dict[str, Any]]):
+    """Add each row's deltas onto its bucket, creating the bucket if needed."""
+    statement = pg_insert(PublisherStatsRollup).values(rows)
+    table = PublisherStatsRollup.__table__
+    merged = {name: table.c[name] + statement.excluded[name] for name in _ADDITIVE}
+    merged.update({
+        name: func.stats_histogram_add(table.c[name], statement.excluded[name])
+        for name in _HISTOGRAMS
+    })
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.publisher_id, table.c.granularity, table.c.bucket_start],
+        set_=merged
+    )
+
+def _lock_order(row: Dict[str, Any]):
+    return row["publisher_id"], row["granularity"], row["bucket_start"]
+
+def _chunks(rows: List[Dict[str, Any]], size: int = 1000):
+    # Workers flushing overlapping buckets lock them in the same order, so
+    # concurrent upserts wait on each other instead of deadlocking
+    rows = sorted(rows, key=_lock_order)
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+def upsert_rollups(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Apply rollup deltas in a single transaction."""
+    for chunk in _chunks(rows):
+        db.execute(_upsert_rollups(chunk))
+    db.commit()
+
+async def async_upsert_rollups(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """Apply rollup deltas - async version."""
+    for chunk in _chunks(rows):
+        await db.execute(_upsert_rollups(chunk))
+    await db.commit()
+
+def _rollups_query(publisher_id: uuid.UUID, ranges: Sequence[BucketRange]):
+    # One primary-key range scan per (granularity, range)
+    return select(PublisherStatsRollup).where(
+        PublisherStatsRollup.publisher_id == publisher_id,
+        or_(*(
+            and_(
+                PublisherStatsRollup.granularity == granularity,
+                PublisherStatsRollup.bucket_start >= start,
+                PublisherStatsRollup.bucket_start < end
+            )
+            for granularity, start, end in ranges
+        ))
+    )
+
+def get_rollups(db: Session, publisher_id: uuid.UUID, ranges: Sequence[BucketRange]) -> List[PublisherStatsRollup]:
+    """Rollup rows for a publisher inside the given bucket ranges."""
+    if not ranges:
+        return []
+    return db.execute(_rollups_query(publisher_id, ranges)).scalars().all()
+
+async def async_get_rollups(
+    db: AsyncSession,
+    publisher_id: uuid.UUID,
+    ranges: Sequence[BucketRange]
+) -> List[PublisherStatsRollup]:
+    """Rollup rows for a publisher - async version."""
+    if not ranges:
+        return []
+    result = await db.execute(_rollups_query(publisher_id, ranges))
+    return result.scalars().all()
+
+def _expired_rollups(cutoffs: Dict[str, datetime]):
+    return delete(PublisherStatsRollup).where(or_(*(
+        and_(PublisherStatsRollup.granularity == granularity, PublisherStatsRollup.bucket_start < cutoff)
+        for granularity, cutoff in cutoffs.items()
+    )))
+
+def delete_expired_rollups(db: Session, cutoffs: Dict[str, datetime]) -> int:
+    """Drop buckets older than their granularity's cutoff."""
+    result = db.execute(_expired_rollups(cutoffs))
+    db.commit()
+    return result.rowcount
+
+async def async_delete_expired_rollups(db: AsyncSession, cutoffs: Dict[str, datetime]) -> int:
+    """Drop expired buckets - async version."""
+    result = await db.execute(_expired_rollups(cutoffs))
+    await db.commit()
+    return result.rowcount
@@ -6,7 +6,7 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.openapi.docs import get_swagger_ui_html, get_redoc_html
 from fastapi.openapi.utils import get_openapi
 
-from app.api.routes import publishers
+from app.api.routes import publishers, tasks
 from app.core.config import settings
 from app.core.exceptions import ServiceException
 
@@ -54,8 +54,53 @@ def health_check():
     return {"status": "healthy", "service": settings.SERVICE_NAME}
 
 # Include API routes
+app.include_router(tasks.router, prefix=settings.API_V1_STR)
 app.include_router(publishers.router, prefix=settings.API_V1_STR)
 
+@app.on_event("startup")
+async def startup_event():
+    from app.core.auth import start_credential_invalidation
+    from app.core.http_client import init_tasks_client
+    start_credential_invalidation()
+    await init_tasks_client()
+    if settings.TASK_PREFETCH_ENABLED:
+        from app.services.task_prefetch import start_prefetcher
+        start_prefetcher()
+    if settings.TASK_STATUS_WRITE_BEHIND:
+        from app.services.status_queue import start_workers
+        await start_workers()
+    if settings.STATISTICS_ENABLED:
+        from app.services.statistics import start_statistics
+        start_statistics()
+    from app.services.event_ingest import start_event_writer
+    start_event_writer()
+    if settings.STATISTICS_LIVE_ENABLED:
+        from app.services.live_statistics import start_live_statistics
+        start_live_statistics()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    from app.core.auth import stop_credential_invalidation
+    from app.core.database import dispose_engines
+    from app.core.http_client import close_tasks_client
+    from app.core.redis import close_redis_pool
+    from app.services.event_ingest import stop_event_writer
+    from app.services.live_statistics import stop_live_statistics
+    from app.services.statistics import stop_statistics
+    from app.services.status_queue import stop_workers
+    from app.services.task_notify import stop_notifier
+    from app.services.task_prefetch import stop_prefetcher
+    await stop_notifier()
+    await stop_workers()
+    await stop_event_writer()
+    await stop_statistics()
+    await stop_live_statistics()
+    await stop_prefetcher()
+    await close_tasks_client()
+    await stop_credential_invalidation()
+    await close_redis_pool()
+    await dispose_engines()
+
 # Exception handlers
 @app.exception_handler(ServiceException)
 async def service_exception_handler(request: Request, exc: ServiceException):
@@ -127,10 +172,15 @@ async def get_open_api_endpoint():
 @app.get("/ready", tags=["health"])
 async def ready_check():
     # Check database connection
-    from app.db.session import get_db
+    from sqlalchemy import text
+    from app.core.database import engine, async_engine
     try:
-        db = next(get_db())
-        db.execute("SELECT 1")
+        if async_engine is not None:
+            async with async_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        else:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
         db_status = "ok"
     except Exception as e:
         logger.error(f"Database connection failed: {str(e)}")
@@ -157,6 +207,42 @@ async def ready_check():
         }
     }
 
+# Internal metrics endpoint
+@app.get("/metrics", tags=["health"])
+async def metrics():
+    from app.core.auth import api_key_cache, credential_invalidation_stats
+    from app.core.http_client import tasks_client_stats
+    from app.core.resilience import tasks_service
+    from app.crud.publisher import available_tasks_flight
+    from app.services.event_ingest import event_ingest_stats
+    from app.services.task_notify import notifier_stats
+    metrics = {
+        "service": settings.SERVICE_NAME,
+        "api_key_cache": api_key_cache.stats(),
+        "credential_invalidation": credential_invalidation_stats(),
+        "tasks_client": tasks_client_stats(),
+        "tasks_resilience": tasks_service.stats(),
+        "available_tasks_coalescing": available_tasks_flight.stats(),
+        "task_events": notifier_stats(),
+        "widget_events": event_ingest_stats(),
+    }
+    if settings.TASK_PREFETCH_ENABLED:
+        from app.services.task_prefetch import prefetch_stats
+        metrics["task_prefetch"] = await prefetch_stats()
+    if settings.TASK_STATUS_WRITE_BEHIND:
+        from app.services.status_queue import queue_stats
+        metrics["task_status_queue"] = await queue_stats()
+    if settings.STATISTICS_ENABLED:
+        from app.services.statistics import statistics_stats
+        metrics["statistics"] = statistics_stats()
+    if settings.STATISTICS_QUALITY_ENABLED:
+        from app.services.quality_aggregates import quality_aggregates_stats
+        metrics["quality_aggregates"] = quality_aggregates_stats()
+    if settings.STATISTICS_LIVE_ENABLED:
+        from app.services.live_statistics import live_statistics_stats
+        metrics["live_statistics"] = live_statistics_stats()
+    return metrics
+
 # Root redirect to docs
 @app.get("/", include_in_schema=False)
 async def root_redirect():
@@ -0,0 +1,27 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class WidgetEvent(Base):
+    """
+    An impression or task interaction reported by a publisher's widget.
+    
+    Append-only and written in bulk by app.services.event_ingest; the only
+    index besides the key serves per-publisher time range reads.
+    """
+    __tablename__ = "widget_events"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    publisher_id = Column(UUID(as_uuid=True), nullable=False)
+    event_type = Column(String(32), nullable=False)
+    task_id = Column(String(64), nullable=True)
+    session_id = Column(String(64), nullable=True)
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+    received_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    event_metadata = Column("metadata", JSONB, nullable=True)
+
+    __table_args__ = (
+        Index("ix_widget_events_publisher_occurred_at", publisher_id, occurred_at),
+    )
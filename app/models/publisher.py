@@ -1,5 +1,6 @@
-from sqlalchemy import Boolean, Column, String, DateTime, JSON
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Boolean, Column, String, DateTime, Index, Integer
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 import secrets
 import uuid
@@ -17,11 +18,32 @@ class Publisher(Base):
     
     # API access
     api_key = Column(String, unique=True, index=True, default=lambda: f"pk_live_{secrets.token_urlsafe(16)}")
+    # Bumped on key rotation to revoke outstanding session tokens
+    token_generation = Column(Integer, nullable=False, default=0, server_default="0")
     
-    # Configuration
-    configuration = Column(JSON, default=dict)
+    # Incremented on every write; exposed as the ETag for conditional updates
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    
+    # Configuration (GIN-indexed for key and containment lookups)
+    configuration = Column(JSONB, default=dict)
+    
+    # Weighted name (A) and description (B) lexemes, maintained by a trigger
+    search_vector = deferred(Column(TSVECTOR))
     
     # Status
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_publishers_configuration", configuration, postgresql_using="gin"),
+        # Keyset pagination order for listings
+        Index("ix_publishers_created_at_id", created_at, id),
+        # Prefix LIKE needs pattern ops under a non-C collation
+        Index("ix_publishers_name_pattern", name, postgresql_ops={"name": "text_pattern_ops"}),
+        Index("ix_publishers_website_pattern", website, postgresql_ops={"website": "text_pattern_ops"}),
+        # Search: full text plus trigram substring matching (pg_trgm)
+        Index("ix_publishers_search_vector", search_vector, postgresql_using="gin"),
+        Index("ix_publishers_name_trgm", name, postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_publishers_website_trgm", website, postgresql_using="gin", postgresql_ops={"website": "gin_trgm_ops"}),
+    )
@@ -0,0 +1,34 @@
+from sqlalchemy import BigInteger, Column, DateTime, Float, Index, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+
+from app.core.database import Base
+
+class PublisherStatsRollup(Base):
+    """
+    Task activity for one publisher over one minute, hour or day bucket.
+    
+    Every column is additive, so buckets merge by summing: counts and sums
+    directly, histograms element-wise.
+    """
+    __tablename__ = "publisher_stats_rollups"
+
+    publisher_id = Column(UUID(as_uuid=True), primary_key=True)
+    granularity = Column(String(6), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    
+    tasks_served = Column(BigInteger, nullable=False, default=0)
+    tasks_completed = Column(BigInteger, nullable=False, default=0)
+    tasks_rejected = Column(BigInteger, nullable=False, default=0)
+    
+    # Fixed-bucket histograms make percentiles mergeable across buckets
+    quality_count = Column(BigInteger, nullable=False, default=0)
+    quality_sum = Column(Float, nullable=False, default=0.0)
+    quality_histogram = Column(ARRAY(Integer), nullable=False)
+    completion_count = Column(BigInteger, nullable=False, default=0)
+    completion_seconds_sum = Column(Float, nullable=False, default=0.0)
+    completion_histogram = Column(ARRAY(Integer), nullable=False)
+
+    __table_args__ = (
+        # Retention sweeps delete by granularity and age across publishers
+        Index("ix_publisher_stats_rollups_granularity_bucket", granularity, bucket_start),
+    )
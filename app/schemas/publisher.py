@@ -1,7 +1,55 @@
-from typing import List, Optional
-from pydantic import BaseModel, EmailStr, UUID4
+from typing import Any, List, Optional
+from pydantic import BaseModel, EmailStr, UUID4, validator
 from datetime import datetime
 
+# task_preferences keys that hold a value list or a {value: weight} mapping
+_WEIGHTED_PREFERENCES = ("task_types", "categories", "languages", "excluded_task_types", "excluded_categories")
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def check_task_preferences(prefs: Optional[dict]) -> Optional[dict]:
+    """Reject task_preferences values the task ranking cannot use."""
+    if not prefs:
+        return prefs
+    if not isinstance(prefs, dict):
+        raise ValueError("task_preferences must be an object")
+    for key in _WEIGHTED_PREFERENCES:
+        value = prefs.get(key)
+        if value is None or isinstance(value, str):
+            continue
+        if isinstance(value, dict):
+            if not all(_is_number(weight) for weight in value.values()):
+                raise ValueError(f"task_preferences.{key} weights must be numbers")
+        elif not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            raise ValueError(f"task_preferences.{key} must be a list of strings or a mapping of weights")
+
+    complexity = prefs.get("complexity_level")
+    if isinstance(complexity, dict):
+        if not all(complexity.get(bound) is None or _is_number(complexity[bound]) for bound in ("min", "max")):
+            raise ValueError("task_preferences.complexity_level min and max must be numbers")
+    elif complexity is not None and not _is_number(complexity):
+        raise ValueError("task_preferences.complexity_level must be a number or {\"min\": .., \"max\": ..}")
+
+    max_time = prefs.get("max_time_seconds")
+    if max_time is not None and not _is_number(max_time):
+        raise ValueError("task_preferences.max_time_seconds must be a number")
+    return prefs
+
+
+def check_behavior(behavior: Optional[dict]) -> Optional[dict]:
+    """Reject behavior values the task ranking cannot use."""
+    if not behavior:
+        return behavior
+    if not isinstance(behavior, dict):
+        raise ValueError("behavior must be an object")
+    max_tasks = behavior.get("max_tasks_per_user")
+    if max_tasks is not None and (not isinstance(max_tasks, int) or isinstance(max_tasks, bool) or max_tasks < 0):
+        raise ValueError("behavior.max_tasks_per_user must be a non-negative integer")
+    return behavior
+
 class PublisherBase(BaseModel):
     name: str
     email: EmailStr
@@ -20,11 +68,19 @@ class PublisherUpdate(BaseModel):
     configuration: Optional[dict] = None
     preferred_task_types: Optional[List[str]] = None
 
+    @validator("configuration")
+    def check_configuration(cls, configuration):
+        if configuration:
+            check_task_preferences(configuration.get("task_preferences"))
+            check_behavior(configuration.get("behavior"))
+        return configuration
+
 class PublisherInDB(PublisherBase):
     id: UUID4
     api_key: str
     configuration: dict = {}
     is_active: bool
+    version: int = 1
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -37,8 +93,42 @@ class Publisher(PublisherInDB):
 class PublisherResponse(PublisherInDB):
     pass
 
+class PublisherSummary(BaseModel):
+    """Listing entry; API keys are never included."""
+    id: UUID4
+    name: str
+    email: EmailStr
+    website: str
+    description: Optional[str] = None
+    is_active: bool
+    version: int = 1
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+class PublisherPage(BaseModel):
+    items: List[PublisherSummary]
+    next_cursor: Optional[str] = None
+
+class PublisherSearchResult(PublisherSummary):
+    rank: float
+
+class PublisherSearchPage(BaseModel):
+    items: List[PublisherSearchResult]
+    next_cursor: Optional[str] = None
+
 class PublisherConfigurationUpdate(BaseModel):
     appearance: dict | None = None
     behavior: dict | None = None
     task_preferences: dict | None = None
     rewards: dict | None = None
+
+    _check_task_preferences = validator("task_preferences", allow_reuse=True)(check_task_preferences)
+    _check_behavior = validator("behavior", allow_reuse=True)(check_behavior)
+
+class PublisherToken(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
@@ -1,8 +1,10 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, conlist, validator
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from uuid import UUID
 
+from app.core.config import settings
+
 class Task(BaseModel):
     id: UUID
     title: str
@@ -40,4 +42,27 @@ class TaskStatusUpdate(BaseModel):
     status: str
     result: Optional[Dict[str, Any]] = None
     quality_score: Optional[float] = None
-    rejection_reason: Optional[str] = None 
\ No newline at end of file
+    rejection_reason: Optional[str] = None 
+class TaskStatusBatchItem(TaskStatusUpdate):
+    task_id: str
+
+class TaskStatusBatchUpdate(BaseModel):
+    updates: conlist(TaskStatusBatchItem, min_items=1, max_items=settings.TASK_STATUS_BATCH_MAX_ITEMS)
+
+    @validator("updates")
+    def unique_task_ids(cls, updates):
+        task_ids = [update.task_id for update in updates]
+        if len(set(task_ids)) != len(task_ids):
+            raise ValueError("each task_id may appear only once per batch")
+        return updates
+
+class TaskStatusBatchResult(BaseModel):
+    task_id: str
+    status_code: int
+    task: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+class TaskStatusBatchResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[TaskStatusBatchResult]
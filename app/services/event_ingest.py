@@ -0,0 +1,319 @@
+import asyncio
+import csv
+import io
+import json
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core import database
+from app.core.config import settings
+from app.models.event import WidgetEvent
+from app.services import live_statistics, statistics
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = frozenset({"impression", "task_view", "task_complete", "task_skip"})
+
+# Event types shown on the live dashboard; completions come from status updates
+_LIVE_COUNTERS = {"impression": "impressions", "task_view": "task_views"}
+
+# Column order of the queued tuples and of the COPY
+EVENT_COLUMNS = ("publisher_id", "event_type", "task_id", "session_id", "occurred_at", "metadata")
+
+_ID_MAX_LENGTH = 64
+
+# json.dumps builds a new encoder per call when given separators
+_encode_metadata = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+# Exception class names (of SQLAlchemy, psycopg2 and asyncpg alike) that mean
+# the database could not be reached or used, rather than that it refused the rows
+_TRANSIENT_ERRORS = frozenset({
+    "OperationalError", "InterfaceError", "TimeoutError", "PostgresConnectionError", "OperatorInterventionError",
+})
+
+# Parsed events waiting to be written; bounded together with _in_flight
+_buffer: List[tuple] = []
+_in_flight = 0
+_wakeup: Optional[asyncio.Event] = None
+_writer: Optional[asyncio.Task] = None
+
+_stats = {
+    "accepted": 0,
+    "invalid": 0,
+    "throttled": 0,
+    "written": 0,
+    "flushes": 0,
+    "flush_errors": 0,
+    "dead_lettered": 0,
+}
+
+
+def _check_id(name: str, value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if not isinstance(value, str) or len(value) > _ID_MAX_LENGTH or "\x00" in value:
+        return f"{name} must be a string of at most {_ID_MAX_LENGTH} characters"
+    try:
+        # JSON can carry lone surrogates, which no database encoding accepts
+        value.encode()
+    except UnicodeEncodeError:
+        return f"{name} must be valid Unicode"
+    return None
+
+
+def _parse_event(
+    publisher_id: uuid.UUID,
+    raw: Any,
+    now: float,
+    earliest: float,
+    latest: float,
+    max_metadata: int
+) -> Union[tuple, str]:
+    """
+    Check one event by hand rather than through a pydantic model; this runs
+    for every event on the hot path.
+
+    Returns:
+        The row to queue, or an error message
+    """
+    if not isinstance(raw, dict):
+        return "Expected a JSON object"
+    event_type = raw.get("type")
+    if event_type not in EVENT_TYPES:
+        return f"type must be one of: {', '.join(sorted(EVENT_TYPES))}"
+
+    task_id = raw.get("task_id") or None
+    session_id = raw.get("session_id") or None
+    error = _check_id("task_id", task_id) or _check_id("session_id", session_id)
+    if error:
+        return error
+
+    # Epoch milliseconds, as the widget's Date.now() reports them
+    occurred_at = raw.get("occurred_at")
+    if occurred_at is None:
+        occurred_at = now
+    elif isinstance(occurred_at, (int, float)) and not isinstance(occurred_at, bool):
+        occurred_at = occurred_at / 1000
+        if not earliest <= occurred_at <= latest:
+            return "occurred_at is out of range"
+    else:
+        return "occurred_at must be epoch milliseconds"
+
+    metadata = raw.get("metadata")
+    if metadata is not None:
+        if not isinstance(metadata, dict):
+            return "metadata must be an object"
+        metadata = _encode_metadata(metadata)
+        try:
+            size = len(metadata.encode())
+        except UnicodeEncodeError:
+            return "metadata must be valid Unicode"
+        # Postgres cannot store NUL in text or jsonb
+        if size > max_metadata or "\\u0000" in metadata:
+            return f"metadata must encode to at most {max_metadata} bytes"
+
+    return (publisher_id, event_type, task_id, session_id, occurred_at, metadata)
+
+
+def parse_events(publisher_id: uuid.UUID, events: List[Any]) -> Tuple[List[tuple], List[Dict[str, Any]]]:
+    """Split a batch into rows to queue and per-index errors."""
+    now = time.time()
+    earliest = now - settings.EVENT_MAX_AGE_SECONDS
+    latest = now + settings.EVENT_MAX_CLOCK_SKEW_SECONDS
+    max_metadata = settings.EVENT_MAX_METADATA_BYTES
+    rows = []
+    rejected = []
+    for index, raw in enumerate(events):
+        parsed = _parse_event(publisher_id, raw, now, earliest, latest, max_metadata)
+        if isinstance(parsed, str):
+            rejected.append({"index": index, "error": parsed})
+        else:
+            rows.append(parsed)
+    _stats["invalid"] += len(rejected)
+    return rows, rejected
+
+
+def enqueue(rows: List[tuple]) -> bool:
+    """
+    Queue parsed events for the writer, all or nothing.
+
+    Returns:
+        False when the queue has no room for the whole batch
+    """
+    if len(_buffer) + _in_flight + len(rows) > settings.EVENT_QUEUE_MAX_EVENTS:
+        _stats["throttled"] += len(rows)
+        return False
+    _buffer.extend(rows)
+    _stats["accepted"] += len(rows)
+    _count_live(rows)
+    if len(_buffer) >= settings.EVENT_FLUSH_MAX_EVENTS and _wakeup is not None:
+        _wakeup.set()
+    return True
+
+
+def _count_live(rows: List[tuple]) -> None:
+    counts: Dict[uuid.UUID, Dict[str, int]] = {}
+    for row in rows:
+        counter = _LIVE_COUNTERS.get(row[1])
+        if counter is not None:
+            publisher_counts = counts.setdefault(row[0], {})
+            publisher_counts[counter] = publisher_counts.get(counter, 0) + 1
+    for publisher_id, publisher_counts in counts.items():
+        live_statistics.increment_many(publisher_id, publisher_counts)
+
+
+def _typed(row: tuple) -> tuple:
+    try:
+        occurred_at = datetime.fromtimestamp(row[4], timezone.utc)
+    except (OverflowError, OSError) as e:
+        # fromtimestamp reports some out-of-range values as OSError; keep
+        # them apart from the connection errors a flush retries
+        raise ValueError(f"occurred_at {row[4]!r} is out of range") from e
+    return row[:4] + (occurred_at,) + row[5:]
+
+
+def _write_batch(rows: List[tuple]) -> None:
+    """COPY a batch into widget_events in one transaction."""
+    buffer = io.StringIO()
+    # None becomes an unquoted empty field, which COPY reads as NULL
+    csv.writer(buffer).writerows(_typed(row) for row in rows)
+    buffer.seek(0)
+    with database.engine.begin() as conn:
+        cursor = conn.connection.cursor()
+        cursor.copy_expert(
+            f"COPY {WidgetEvent.__tablename__} ({', '.join(EVENT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+
+
+async def _async_write_batch(rows: List[tuple]) -> None:
+    """Write a batch - async version, using asyncpg's binary COPY."""
+    records = [_typed(row) for row in rows]
+    async with database.async_engine.begin() as conn:
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            WidgetEvent.__tablename__,
+            records=records,
+            columns=EVENT_COLUMNS
+        )
+
+
+def _unique_entries(rows: List[tuple]):
+    for publisher_id, event_type, _, session_id, occurred_at, _ in rows:
+        if session_id is not None:
+            yield str(publisher_id), (session_id, occurred_at, event_type == "task_complete")
+
+
+async def _write(batch: List[tuple]) -> None:
+    if settings.ASYNC_DATABASE:
+        await _async_write_batch(batch)
+    else:
+        await run_in_threadpool(_write_batch, batch)
+
+
+def _is_transient(error: BaseException) -> bool:
+    """A connection or availability problem, as opposed to rows the database refused."""
+    if isinstance(error, (OSError, asyncio.TimeoutError)):
+        return True
+    return any(cls.__name__ in _TRANSIENT_ERRORS for cls in type(error).__mro__)
+
+
+def _dead_letter(row: tuple, error: Exception) -> None:
+    _stats["dead_lettered"] += 1
+    logger.error(f"Dropping widget event the database refused ({str(error)}): {row!r}")
+
+
+async def flush() -> None:
+    """
+    Write everything queued so far in batches of EVENT_FLUSH_MAX_EVENTS.
+
+    When the database cannot be reached, the unwritten events go back to the
+    front of the queue, so an outage fills the queue and turns into 429s
+    rather than lost events. A batch the database refuses is split in
+    halves until the offending events are isolated; those are logged and
+    dropped so they cannot block the queue.
+    """
+    global _buffer, _in_flight
+    if not _buffer:
+        return
+    pending, _buffer = _buffer, []
+    _in_flight = len(pending)
+    size = settings.EVENT_FLUSH_MAX_EVENTS
+    # pending[:done] is written or dropped; ends stacks the halves still to try
+    done = 0
+    ends: List[int] = []
+    try:
+        while done < len(pending):
+            end = ends.pop() if ends else min(done + size, len(pending))
+            batch = pending[done:end]
+            # Shielded so a cancelled flush (shutdown) still learns whether
+            # the COPY committed before deciding what to requeue
+            write = asyncio.ensure_future(_write(batch))
+            try:
+                await asyncio.shield(write)
+            except asyncio.CancelledError:
+                await asyncio.wait({write})
+                if not write.cancelled() and write.exception() is None:
+                    done = end
+                raise
+            except Exception as e:
+                if _is_transient(e):
+                    _stats["flush_errors"] += 1
+                    logger.error(f"Failed to write {len(batch)} widget events: {str(e)}")
+                    return
+                if len(batch) > 1:
+                    ends.extend((end, done + len(batch) // 2))
+                    continue
+                _dead_letter(batch[0], e)
+                done = end
+                _in_flight -= 1
+                continue
+            done = end
+            _in_flight -= len(batch)
+            _stats["flushes"] += 1
+            _stats["written"] += len(batch)
+            await statistics.record_uniques(_unique_entries(batch))
+    finally:
+        # Whatever was not written goes back to the front of the queue
+        _buffer[:0] = pending[done:]
+        _in_flight = 0
+
+
+async def _run_writer() -> None:
+    interval = settings.EVENT_FLUSH_INTERVAL_MS / 1000
+    while True:
+        try:
+            await asyncio.wait_for(_wakeup.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+        await flush()
+
+
+def start_event_writer() -> None:
+    global _wakeup, _writer
+    if _writer is None:
+        _wakeup = asyncio.Event()
+        _writer = asyncio.ensure_future(_run_writer())
+        logger.info("Widget event writer started")
+
+
+async def stop_event_writer() -> None:
+    """Stop the writer and drain the queue."""
+    global _writer
+    if _writer is not None:
+        _writer.cancel()
+        await asyncio.gather(_writer, return_exceptions=True)
+        _writer = None
+    await flush()
+
+
+def event_ingest_stats() -> Dict[str, Any]:
+    stats: Dict[str, Any] = dict(_stats)
+    stats["queued"] = len(_buffer) + _in_flight
+    return stats
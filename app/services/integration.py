@@ -0,0 +1,40 @@
+from typing import Any, Dict
+
+from app.core.config import settings
+
+
+def build_integration_code(publisher_id: str, api_key: str) -> Dict[str, Any]:
+    """Build the snippets a publisher embeds to load the HotLabel widget."""
+    header_code = '<script src="https://cdn.hotlabel.io/sdk/v1/hotlabel.js"></script>'
+
+    publisher_url = f"{settings.PUBLIC_API_URL}{settings.API_V1_STR}/publishers/{publisher_id}"
+
+    # The widget swaps its API key for a session token, then waits for
+    # availability events instead of polling the tasks endpoint
+    body_code = f'''<div id="hotlabel-container"></div>
+<script>
+HotLabel.init({{
+    containerId: 'hotlabel-container',
+    publisherId: '{publisher_id}',
+    apiKey: '{api_key}',
+    tokenUrl: '{publisher_url}/token',
+    taskUpdates: {{
+        mode: 'sse',
+        eventsUrl: '{publisher_url}/tasks/events',
+        longPollUrl: '{publisher_url}/tasks/wait',
+        fallback: 'long-poll'
+    }}
+}});
+</script>'''
+
+    return {
+        "code_snippets": {
+            "header": header_code,
+            "body": body_code
+        },
+        "installation_steps": [
+            "Add the HotLabel script to your website's header",
+            "Add the container div and initialization code where you want the widget to appear",
+            "No polling setup is needed: the widget is notified when new tasks become available"
+        ]
+    }
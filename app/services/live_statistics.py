@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import time
+import uuid
+from array import array
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.redis import get_redis_pool
+
+logger = logging.getLogger(__name__)
+
+# Per-second counters behind GET /publishers/{id}/statistics/live.
+#
+# Every ring, local or in Redis, is a flat run of unsigned 32-bit words: one
+# slot per second holding [second, counter 0, counter 1, ...], where slot
+# = second % ring length. A slot whose stamp is not the second being asked
+# about is stale and reads as zeros, so nothing ever needs clearing.
+#
+# Workers keep rings of STATISTICS_LIVE_LOCAL_SECONDS for the publishers
+# active since the last push (about 0.5 KB each with its key, at most
+# STATISTICS_LIVE_MAX_PUBLISHERS of them) and hand them to Redis every
+# STATISTICS_LIVE_PUSH_SECONDS. Redis holds one BITFIELD ring per publisher
+# covering STATISTICS_LIVE_WINDOW_SECONDS (7.2 KB for five minutes), which
+# expires once the publisher has been quiet for a full window.
+
+LIVE_COUNTERS = ("tasks_served", "tasks_completed", "tasks_rejected", "impressions", "task_views")
+_WIDTH = len(LIVE_COUNTERS) + 1
+_INDEX = {name: index for index, name in enumerate(LIVE_COUNTERS, start=1)}
+
+# ARGV: ring seconds, counters, ttl, then groups of (second, one count per counter).
+# Counts for a second the ring has already moved past are dropped.
+_MERGE_RING = """
+local window = tonumber(ARGV[1])
+local counters = tonumber(ARGV[2])
+for i = 4, #ARGV, counters + 1 do
+    local second = tonumber(ARGV[i])
+    local slot = (second % window) * (counters + 1)
+    local stamp = redis.call('BITFIELD', KEYS[1], 'GET', 'u32', '#' .. slot)[1]
+    if stamp <= second then
+        local ops = {}
+        local op = 'INCRBY'
+        if stamp < second then
+            ops = {'SET', 'u32', '#' .. slot, second}
+            op = 'SET'
+        end
+        for c = 1, counters do
+            table.insert(ops, op)
+            table.insert(ops, 'u32')
+            table.insert(ops, '#' .. (slot + c))
+            table.insert(ops, ARGV[i + c])
+        end
+        redis.call('BITFIELD', KEYS[1], unpack(ops))
+    end
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+# ARGV: ring seconds, counters, last second, seconds to read.
+# Returns the counts second by second, oldest first, zeros for stale slots.
+_READ_RING = """
+local window = tonumber(ARGV[1])
+local counters = tonumber(ARGV[2])
+local last = tonumber(ARGV[3])
+local out = {}
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return out
+end
+for second = last - tonumber(ARGV[4]) + 1, last do
+    local slot = (second % window) * (counters + 1)
+    local ops = {}
+    for c = 0, counters do
+        table.insert(ops, 'GET')
+        table.insert(ops, 'u32')
+        table.insert(ops, '#' .. (slot + c))
+    end
+    local values = redis.call('BITFIELD', KEYS[1], unpack(ops))
+    for c = 1, counters do
+        if values[1] == second then
+            table.insert(out, values[c + 1])
+        else
+            table.insert(out, 0)
+        end
+    end
+end
+return out
+"""
+
+_rings: Dict[str, array] = {}
+_pusher: Optional[asyncio.Task] = None
+
+_stats = {
+    "pushes": 0,
+    "push_errors": 0,
+    "dropped": 0,
+}
+
+
+def _ring_key(publisher_id: str) -> str:
+    return f"stats:live:{publisher_id}"
+
+
+def _add(publisher_id: str, second: int, counts: Dict[int, int]) -> None:
+    ring = _rings.get(publisher_id)
+    if ring is None:
+        if len(_rings) >= settings.STATISTICS_LIVE_MAX_PUBLISHERS:
+            _stats["dropped"] += sum(counts.values())
+            return
+        ring = _rings[publisher_id] = array("I", bytes(4 * _WIDTH * settings.STATISTICS_LIVE_LOCAL_SECONDS))
+    slot = second % settings.STATISTICS_LIVE_LOCAL_SECONDS * _WIDTH
+    if ring[slot] != second:
+        if ring[slot] > second:
+            # Older than the local ring; only happens when re-adding after a failed push
+            _stats["dropped"] += sum(counts.values())
+            return
+        ring[slot:slot + _WIDTH] = array("I", [second] + [0] * (_WIDTH - 1))
+    for index, count in counts.items():
+        ring[slot + index] += count
+
+
+def increment(publisher_id: str, counter: str, count: int = 1) -> None:
+    """Count `count` occurrences of `counter` for the current second."""
+    if settings.STATISTICS_LIVE_ENABLED and count:
+        _add(str(publisher_id), int(time.time()), {_INDEX[counter]: count})
+
+
+def increment_many(publisher_id: str, counts: Dict[str, int]) -> None:
+    """Several counters at once for the current second."""
+    if settings.STATISTICS_LIVE_ENABLED and counts:
+        _add(str(publisher_id), int(time.time()), {_INDEX[name]: count for name, count in counts.items()})
+
+
+def _ring_args(ring: array) -> List[int]:
+    """The ring's occupied slots as (second, counts...) groups."""
+    args = []
+    for slot in range(0, len(ring), _WIDTH):
+        if ring[slot]:
+            args.extend(ring[slot:slot + _WIDTH])
+    return args
+
+
+async def push() -> None:
+    """Merge every worker-local ring into Redis and start afresh."""
+    global _rings
+    if not _rings:
+        return
+    rings, _rings = _rings, {}
+    window = settings.STATISTICS_LIVE_WINDOW_SECONDS
+    try:
+        redis = await get_redis_pool()
+        script = redis.register_script(_MERGE_RING)
+        pipe = redis.pipeline(transaction=False)
+        for publisher_id, ring in rings.items():
+            await script(
+                keys=[_ring_key(publisher_id)],
+                args=[window, len(LIVE_COUNTERS), window, *_ring_args(ring)],
+                client=pipe
+            )
+        await pipe.execute()
+    except Exception as e:
+        _stats["push_errors"] += 1
+        logger.error(f"Failed to push live counters for {len(rings)} publishers: {str(e)}")
+        # Keep what still fits in the local rings for the next push
+        for publisher_id, ring in rings.items():
+            for slot in range(0, len(ring), _WIDTH):
+                if ring[slot]:
+                    _add(publisher_id, ring[slot], {
+                        index: ring[slot + index] for index in range(1, _WIDTH) if ring[slot + index]
+                    })
+        return
+    _stats["pushes"] += 1
+
+
+async def read_live(publisher_id: uuid.UUID, window: int, series: bool = False) -> Dict[str, Any]:
+    """
+    Counts for the last `window` seconds, merged across workers.
+
+    Reads `window` slots from the publisher's Redis ring in one script call,
+    however busy the publisher is.
+    """
+    last = int(time.time())
+    redis = await get_redis_pool()
+    script = redis.register_script(_READ_RING)
+    values = await script(
+        keys=[_ring_key(str(publisher_id))],
+        args=[settings.STATISTICS_LIVE_WINDOW_SECONDS, len(LIVE_COUNTERS), last, window]
+    )
+    counters = len(LIVE_COUNTERS)
+    per_second = {
+        name: [int(value) for value in values[index::counters]] or [0] * window
+        for index, name in enumerate(LIVE_COUNTERS)
+    }
+    live = {
+        "publisher_id": str(publisher_id),
+        "window_seconds": window,
+        "end": last + 1,
+        "totals": {name: sum(counts) for name, counts in per_second.items()},
+        "per_second_rate": {name: sum(counts) / window for name, counts in per_second.items()},
+    }
+    if series:
+        live["series"] = per_second
+    return live
+
+
+async def _run_pusher() -> None:
+    while True:
+        await asyncio.sleep(settings.STATISTICS_LIVE_PUSH_SECONDS)
+        await push()
+
+
+def start_live_statistics() -> None:
+    global _pusher
+    if _pusher is None:
+        _pusher = asyncio.ensure_future(_run_pusher())
+        logger.info("Live statistics pusher started")
+
+
+async def stop_live_statistics() -> None:
+    """Stop the pusher and hand the last counts to Redis."""
+    global _pusher
+    if _pusher is not None:
+        _pusher.cancel()
+        await asyncio.gather(_pusher, return_exceptions=True)
+        _pusher = None
+    await push()
+
+
+def live_statistics_stats() -> Dict[str, Any]:
+    stats: Dict[str, Any] = dict(_stats)
+    stats["active_publishers"] = len(_rings)
+    return stats
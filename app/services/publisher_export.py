@@ -0,0 +1,142 @@
+import csv
+import io
+import json
+import logging
+import uuid
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterator, List, Optional, Sequence
+
+from app.core import database
+from app.core.config import settings
+from app.crud import publisher as publisher_crud
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def resolve_fields(fields: Optional[str]) -> List[str]:
+    """
+    Columns to export from a comma-separated projection, in the order given.
+
+    Raises:
+        ValueError: If a field is unknown or not exportable
+    """
+    if not fields:
+        return list(publisher_crud.EXPORT_FIELDS)
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in publisher_crud.EXPORT_FIELDS]
+    if unknown or not selected:
+        raise ValueError(
+            f"Unknown export fields: {', '.join(unknown) or fields}. "
+            f"Available: {', '.join(publisher_crud.EXPORT_FIELDS)}"
+        )
+    return list(dict.fromkeys(selected))
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=_json_default)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class _Encoder:
+    """Turns row chunks into response body chunks, optionally gzipped."""
+
+    def __init__(self, export_format: str, fields: Sequence[str], compress: bool):
+        self.format = export_format
+        self.fields = fields
+        self._gzip = zlib.compressobj(settings.PUBLISHER_EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31) if compress else None
+
+    def _emit(self, data: bytes) -> bytes:
+        return self._gzip.compress(data) if self._gzip else data
+
+    def header(self) -> bytes:
+        if self.format != "csv":
+            return b""
+        return self.rows([self.fields])
+
+    def rows(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        if self.format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerows([_csv_value(value) for value in row] for row in rows)
+            data = buffer.getvalue()
+        else:
+            data = "".join(
+                json.dumps(dict(zip(self.fields, row)), default=_json_default) + "\n"
+                for row in rows
+            )
+        return self._emit(data.encode())
+
+    def finish(self) -> bytes:
+        return self._gzip.flush() if self._gzip else b""
+
+
+def export_publishers(
+    export_format: str,
+    fields: Sequence[str],
+    compress: bool = False,
+    is_active: Optional[bool] = None
+) -> Iterator[bytes]:
+    """
+    Stream the publishers table from a server-side cursor, one chunk of
+    PUBLISHER_EXPORT_CHUNK_ROWS rows at a time, so memory stays flat however
+    many rows there are.
+    """
+    encoder = _Encoder(export_format, fields, compress)
+    query = publisher_crud.publisher_export_query(fields, is_active)
+    exported = 0
+    with database.engine.connect() as conn:
+        # yield_per only implies stream_results from SQLAlchemy 1.4.40; ask for the
+        # server-side cursor explicitly so older releases do not buffer the table
+        result = conn.execution_options(
+            stream_results=True,
+            max_row_buffer=settings.PUBLISHER_EXPORT_CHUNK_ROWS
+        ).execute(query)
+        yield encoder.header()
+        for rows in result.partitions(settings.PUBLISHER_EXPORT_CHUNK_ROWS):
+            exported += len(rows)
+            chunk = encoder.rows(rows)
+            if chunk:
+                yield chunk
+    yield encoder.finish()
+    logger.info(f"Exported {exported} publishers as {export_format}")
+
+
+async def async_export_publishers(
+    export_format: str,
+    fields: Sequence[str],
+    compress: bool = False,
+    is_active: Optional[bool] = None
+) -> AsyncIterator[bytes]:
+    """Stream the publishers table - async version."""
+    encoder = _Encoder(export_format, fields, compress)
+    query = publisher_crud.publisher_export_query(fields, is_active)
+    exported = 0
+    async with database.async_engine.connect() as conn:
+        result = await conn.stream(query)
+        yield encoder.header()
+        async for rows in result.partitions(settings.PUBLISHER_EXPORT_CHUNK_ROWS):
+            exported += len(rows)
+            chunk = encoder.rows(rows)
+            if chunk:
+                yield chunk
+    yield encoder.finish()
+    logger.info(f"Exported {exported} publishers as {export_format}")
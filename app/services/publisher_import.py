@@ -0,0 +1,238 @@
+import codecs
+import csv
+import io
+import json
+import logging
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy.schema import CreateTable
+
+from app.core import database
+from app.core.config import settings
+from app.crud import publisher as publisher_crud
+from app.schemas.publisher import PublisherCreate
+
+logger = logging.getLogger(__name__)
+
+# (row number, record) where the record is a field mapping or a parse error
+Record = Tuple[int, Any]
+
+
+class _RecordReader:
+    """Splits an NDJSON or CSV byte stream into records as chunks arrive."""
+
+    def __init__(self, import_format: str):
+        self.format = import_format
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._pending = ""
+        self._csv_record = ""
+        self._header: Optional[List[str]] = None
+        self._row = 0
+
+    def feed(self, chunk: bytes) -> List[Record]:
+        lines = (self._pending + self._decoder.decode(chunk)).split("\n")
+        self._pending = lines.pop()
+        return self._parse(lines)
+
+    def close(self) -> List[Record]:
+        tail = self._pending + self._decoder.decode(b"", final=True)
+        self._pending = ""
+        records = self._parse([tail] if tail else [])
+        if self._csv_record:
+            self._row += 1
+            records.append((self._row, "Unterminated quoted field"))
+            self._csv_record = ""
+        return records
+
+    def _parse(self, lines: List[str]) -> List[Record]:
+        if self.format == "csv":
+            return self._parse_csv(lines)
+        records = []
+        for line in lines:
+            if not line.strip():
+                continue
+            self._row += 1
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                records.append((self._row, f"Invalid JSON: {str(e)}"))
+                continue
+            if not isinstance(record, dict):
+                record = "Expected a JSON object"
+            records.append((self._row, record))
+        return records
+
+    def _parse_csv(self, lines: List[str]) -> List[Record]:
+        records = []
+        for line in lines:
+            self._csv_record += line + "\n"
+            # A quoted field may span lines; wait until the quotes balance
+            if self._csv_record.count('"') % 2:
+                continue
+            text, self._csv_record = self._csv_record.rstrip("\r\n"), ""
+            if not text.strip():
+                continue
+            values = next(csv.reader([text]))
+            if self._header is None:
+                self._header = [name.strip() for name in values]
+                continue
+            self._row += 1
+            if len(values) != len(self._header):
+                records.append((self._row, f"Expected {len(self._header)} columns, got {len(values)}"))
+                continue
+            records.append((self._row, dict(zip(self._header, values))))
+        return records
+
+
+class ImportReport:
+    """Per-row outcome of an import plus throughput."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.received = 0
+        self.created: List[Dict[str, Any]] = []
+        self.conflicts: List[Dict[str, Any]] = []
+        self.invalid: List[Dict[str, Any]] = []
+        self.conflict_count = 0
+        self.invalid_count = 0
+        self._created_rows: Dict[str, int] = {}
+
+    def reject(self, row: int, error: str) -> None:
+        self.invalid_count += 1
+        if len(self.invalid) < settings.PUBLISHER_IMPORT_MAX_REPORTED_ERRORS:
+            self.invalid.append({"row": row, "error": error})
+
+    def conflict(self, row: int, email: str) -> None:
+        self.conflict_count += 1
+        if len(self.conflicts) < settings.PUBLISHER_IMPORT_MAX_REPORTED_ERRORS:
+            first = self._created_rows.get(email)
+            reason = f"Duplicate of row {first}" if first is not None else "Publisher with this email already exists"
+            self.conflicts.append({"row": row, "email": email, "error": reason})
+
+    def create(self, row: int, publisher_id: uuid.UUID, email: str, api_key: str) -> None:
+        self._created_rows[email] = row
+        self.created.append({"row": row, "id": str(publisher_id), "email": email, "api_key": api_key})
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started
+        return {
+            "received": self.received,
+            "created": len(self.created),
+            "conflicts": self.conflict_count,
+            "invalid": self.invalid_count,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.received / elapsed, 1) if elapsed > 0 else None,
+            "publishers": self.created,
+            "conflict_rows": self.conflicts,
+            "invalid_rows": self.invalid,
+        }
+
+
+def _validate(row: int, record: Any, report: ImportReport) -> Optional[PublisherCreate]:
+    if isinstance(record, str):
+        report.reject(row, record)
+        return None
+    try:
+        return PublisherCreate(**record)
+    except ValidationError as e:
+        report.reject(row, "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+        ))
+        return None
+
+
+def _staging_rows(batch: List[Tuple[int, PublisherCreate]]) -> List[tuple]:
+    # Columns in publisher_crud.IMPORT_STAGING_COLUMNS order
+    api_keys = publisher_crud.new_api_keys(len(batch))
+    return [
+        (row, uuid.uuid4(), publisher.name, str(publisher.website), publisher.email, publisher.description, api_key)
+        for (row, publisher), api_key in zip(batch, api_keys)
+    ]
+
+
+def _load_batch(rows: List[tuple]) -> Set[uuid.UUID]:
+    """COPY one batch into the staging table and merge it, in one transaction."""
+    buffer = io.StringIO()
+    # Quoting everything keeps empty strings distinct from NULL
+    csv.writer(buffer, quoting=csv.QUOTE_ALL).writerows(rows)
+    buffer.seek(0)
+    columns = ", ".join(publisher_crud.IMPORT_STAGING_COLUMNS)
+    with database.engine.begin() as conn:
+        conn.execute(CreateTable(publisher_crud.import_staging))
+        cursor = conn.connection.cursor()
+        cursor.copy_expert(
+            f"COPY {publisher_crud.import_staging.name} ({columns}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+        return set(conn.execute(publisher_crud.merge_staged_publishers()).scalars())
+
+
+async def _async_load_batch(rows: List[tuple]) -> Set[uuid.UUID]:
+    """Load one batch - async version, using asyncpg's binary COPY."""
+    async with database.async_engine.begin() as conn:
+        await conn.execute(CreateTable(publisher_crud.import_staging))
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            publisher_crud.import_staging.name,
+            records=rows,
+            columns=publisher_crud.IMPORT_STAGING_COLUMNS
+        )
+        result = await conn.execute(publisher_crud.merge_staged_publishers())
+        return set(result.scalars())
+
+
+async def _flush(batch: List[Tuple[int, PublisherCreate]], report: ImportReport) -> None:
+    rows = _staging_rows(batch)
+    if settings.ASYNC_DATABASE:
+        inserted = await _async_load_batch(rows)
+    else:
+        inserted = await run_in_threadpool(_load_batch, rows)
+    # Staged rows are in input order, so duplicates point at the earlier row
+    for row, publisher_id, _, _, email, _, api_key in rows:
+        if publisher_id in inserted:
+            report.create(row, publisher_id, email, api_key)
+        else:
+            report.conflict(row, email)
+
+
+async def import_publishers(chunks: AsyncIterator[bytes], import_format: str) -> ImportReport:
+    """
+    Register publishers from an NDJSON or CSV stream.
+
+    Rows are validated against PublisherCreate as they arrive and loaded in
+    batches of PUBLISHER_IMPORT_BATCH_ROWS: COPY into a staging table, then
+    a single INSERT ... SELECT ... ON CONFLICT DO NOTHING. Every row ends up
+    created, conflicting or invalid in the report.
+    """
+    report = ImportReport()
+    reader = _RecordReader(import_format)
+    batch: List[Tuple[int, PublisherCreate]] = []
+    batch_size = settings.PUBLISHER_IMPORT_BATCH_ROWS
+
+    async def consume(records: List[Record]) -> None:
+        for row, record in records:
+            report.received += 1
+            publisher = _validate(row, record, report)
+            if publisher is not None:
+                batch.append((row, publisher))
+        while len(batch) >= batch_size:
+            await _flush(batch[:batch_size], report)
+            del batch[:batch_size]
+
+    async for chunk in chunks:
+        await consume(reader.feed(chunk))
+    await consume(reader.close())
+    if batch:
+        await _flush(batch, report)
+
+    summary = report.as_dict()
+    logger.info(
+        f"Imported {summary['created']} of {summary['received']} publishers "
+        f"({summary['conflicts']} conflicts, {summary['invalid']} invalid) "
+        f"at {summary['rows_per_second']} rows/s"
+    )
+    return report
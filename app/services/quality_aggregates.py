@@ -0,0 +1,187 @@
+import logging
+import math
+import uuid
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.redis import get_redis_pool
+from app.services.statistics import QUALITY_BINS, REJECTED_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# All-time quality aggregates per publisher, updated in O(1) by every
+# accepted task status update. stats:quality:{id} is a hash holding the
+# scored update count, Welford's running mean and M2 (sum of squared
+# deviations, so variance = M2 / (count - 1)), an EWMA of the score, one
+# field per histogram bin (h0, h1, ...) and the rejection total;
+# stats:quality:{id}:rejections counts rejections by reason. Each update
+# is a single script call, so concurrent workers never interleave a
+# read-modify-write.
+
+_MAX_REASON_LENGTH = 64
+_OTHER_REASON = "other"
+_UNSPECIFIED_REASON = "unspecified"
+
+# KEYS: aggregates hash, rejection reasons hash
+# ARGV: score or '', bins, score max, EWMA alpha, reason or '', max distinct
+# reasons, the reason that counts everything past that cap
+_RECORD_QUALITY = """
+local score = tonumber(ARGV[1])
+if score then
+    local current = redis.call('HMGET', KEYS[1], 'count', 'mean', 'm2', 'ewma')
+    local count = (tonumber(current[1]) or 0) + 1
+    local mean = tonumber(current[2]) or 0
+    local m2 = tonumber(current[3]) or 0
+    local ewma = tonumber(current[4])
+    local alpha = tonumber(ARGV[4])
+
+    local delta = score - mean
+    mean = mean + delta / count
+    m2 = m2 + delta * (score - mean)
+    if ewma then
+        ewma = ewma + alpha * (score - ewma)
+    else
+        ewma = score
+    end
+
+    local bins = tonumber(ARGV[2])
+    local bin = math.floor(score / tonumber(ARGV[3]) * bins)
+    bin = math.max(0, math.min(bins - 1, bin))
+
+    redis.call('HSET', KEYS[1],
+        'count', count,
+        'mean', string.format('%.17g', mean),
+        'm2', string.format('%.17g', m2),
+        'ewma', string.format('%.17g', ewma))
+    redis.call('HINCRBY', KEYS[1], 'h' .. bin, 1)
+end
+local reason = ARGV[5]
+if reason ~= '' then
+    redis.call('HINCRBY', KEYS[1], 'rejections', 1)
+    if redis.call('HEXISTS', KEYS[2], reason) == 0
+        and redis.call('HLEN', KEYS[2]) >= tonumber(ARGV[6]) then
+        reason = ARGV[7]
+    end
+    redis.call('HINCRBY', KEYS[2], reason, 1)
+end
+return 1
+"""
+
+_stats = {
+    "recorded": 0,
+    "errors": 0,
+}
+
+
+def _keys(publisher_id: str) -> List[str]:
+    return [f"stats:quality:{publisher_id}", f"stats:quality:{publisher_id}:rejections"]
+
+
+def _score(update: Dict[str, Any]) -> Optional[float]:
+    score = update.get("quality_score")
+    if isinstance(score, (int, float)) and not isinstance(score, bool) and math.isfinite(score):
+        return float(score)
+    return None
+
+
+def _reason(update: Dict[str, Any]) -> Optional[str]:
+    """Normalized rejection reason, or None when the update is not a rejection."""
+    if update.get("status") not in REJECTED_STATUSES:
+        return None
+    reason = update.get("rejection_reason")
+    if isinstance(reason, str) and reason.strip():
+        return reason.strip().lower()[:_MAX_REASON_LENGTH]
+    return _UNSPECIFIED_REASON
+
+
+async def record_task_statuses(publisher_id: str, updates: List[Dict[str, Any]]) -> None:
+    """
+    Fold accepted status updates into the publisher's quality aggregates.
+
+    One pipelined round trip whatever the number of updates. Failures are
+    logged and counted, never raised: the status update itself already
+    succeeded.
+    """
+    if not settings.STATISTICS_QUALITY_ENABLED:
+        return
+    calls = []
+    for update in updates:
+        score = _score(update)
+        reason = _reason(update)
+        if score is not None or reason is not None:
+            calls.append((score, reason))
+    if not calls:
+        return
+
+    keys = _keys(str(publisher_id))
+    try:
+        redis = await get_redis_pool()
+        script = redis.register_script(_RECORD_QUALITY)
+        pipe = redis.pipeline(transaction=False)
+        for score, reason in calls:
+            await script(
+                keys=keys,
+                args=[
+                    "" if score is None else repr(score),
+                    QUALITY_BINS,
+                    settings.STATISTICS_QUALITY_SCORE_MAX,
+                    settings.STATISTICS_QUALITY_EWMA_ALPHA,
+                    reason or "",
+                    settings.STATISTICS_QUALITY_MAX_REJECTION_REASONS,
+                    _OTHER_REASON,
+                ],
+                client=pipe
+            )
+        await pipe.execute()
+    except Exception as e:
+        _stats["errors"] += 1
+        logger.error(f"Failed to record quality aggregates for publisher {publisher_id}: {str(e)}")
+        return
+    _stats["recorded"] += len(calls)
+
+
+async def record_task_status(publisher_id: str, update: Dict[str, Any]) -> None:
+    """Single-update form of record_task_statuses."""
+    await record_task_statuses(publisher_id, [update])
+
+
+async def read_quality(publisher_id: uuid.UUID) -> Dict[str, Any]:
+    """The publisher's precomputed quality aggregates."""
+    aggregates_key, rejections_key = _keys(str(publisher_id))
+    redis = await get_redis_pool()
+    pipe = redis.pipeline(transaction=True)
+    pipe.hgetall(aggregates_key)
+    pipe.hgetall(rejections_key)
+    aggregates, reasons = await pipe.execute()
+
+    count = int(aggregates.get("count", 0))
+    m2 = float(aggregates.get("m2", 0))
+    variance = m2 / (count - 1) if count > 1 else None
+    width = settings.STATISTICS_QUALITY_SCORE_MAX / QUALITY_BINS
+    return {
+        "publisher_id": str(publisher_id),
+        "quality_score": {
+            "count": count,
+            "mean": float(aggregates["mean"]) if count else None,
+            "variance": variance,
+            "stddev": math.sqrt(variance) if variance is not None else None,
+            "ewma": float(aggregates["ewma"]) if count else None,
+            "ewma_alpha": settings.STATISTICS_QUALITY_EWMA_ALPHA,
+            "histogram": [
+                {"lower": bin * width, "upper": (bin + 1) * width, "count": int(aggregates.get(f"h{bin}", 0))}
+                for bin in range(QUALITY_BINS)
+            ],
+        },
+        "rejections": {
+            "total": int(aggregates.get("rejections", 0)),
+            "reasons": dict(sorted(
+                ((reason, int(count)) for reason, count in reasons.items()),
+                key=lambda item: item[1],
+                reverse=True
+            )),
+        },
+    }
+
+
+def quality_aggregates_stats() -> Dict[str, Any]:
+    return dict(_stats)
@@ -0,0 +1,476 @@
+import asyncio
+import bisect
+import logging
+import math
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core import database
+from app.core.config import settings
+from app.core.redis import get_redis_pool
+from app.crud import statistics as statistics_crud
+from app.services import live_statistics
+
+logger = logging.getLogger(__name__)
+
+COMPLETED_STATUSES = frozenset({"completed"})
+REJECTED_STATUSES = frozenset({"rejected"})
+
+# Histogram bins. Quality scores are split evenly over
+# [0, STATISTICS_QUALITY_SCORE_MAX]; completion times use the upper bounds
+# below (seconds) plus one overflow bin.
+QUALITY_BINS = 20
+COMPLETION_BOUNDS = (1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300, 600, 1200, 1800, 3600)
+
+# Coarsest first; a range is answered with as few buckets as possible
+GRANULARITIES = (("day", 86400), ("hour", 3600), ("minute", 60))
+
+PERCENTILES = (50, 90, 99)
+
+
+class Rollup:
+    """
+    Additive task activity counters. Rollups merge by summing, so minute
+    deltas fold into hour and day buckets and any set of buckets folds into
+    one answer. Attribute names match PublisherStatsRollup columns.
+    """
+
+    __slots__ = (
+        "tasks_served", "tasks_completed", "tasks_rejected",
+        "quality_count", "quality_sum", "quality_histogram",
+        "completion_count", "completion_seconds_sum", "completion_histogram",
+    )
+
+    def __init__(self):
+        self.tasks_served = 0
+        self.tasks_completed = 0
+        self.tasks_rejected = 0
+        self.quality_count = 0
+        self.quality_sum = 0.0
+        self.quality_histogram = [0] * QUALITY_BINS
+        self.completion_count = 0
+        self.completion_seconds_sum = 0.0
+        self.completion_histogram = [0] * (len(COMPLETION_BOUNDS) + 1)
+
+    def add_quality(self, score: float) -> None:
+        scaled = score / settings.STATISTICS_QUALITY_SCORE_MAX * QUALITY_BINS
+        self.quality_count += 1
+        self.quality_sum += score
+        self.quality_histogram[min(max(int(scaled), 0), QUALITY_BINS - 1)] += 1
+
+    def add_completion(self, seconds: float) -> None:
+        self.completion_count += 1
+        self.completion_seconds_sum += seconds
+        self.completion_histogram[bisect.bisect_right(COMPLETION_BOUNDS, seconds)] += 1
+
+    def merge(self, other) -> "Rollup":
+        """Fold in another Rollup or a PublisherStatsRollup row."""
+        self.tasks_served += other.tasks_served
+        self.tasks_completed += other.tasks_completed
+        self.tasks_rejected += other.tasks_rejected
+        self.quality_count += other.quality_count
+        self.quality_sum += other.quality_sum
+        self.completion_count += other.completion_count
+        self.completion_seconds_sum += other.completion_seconds_sum
+        for i, count in enumerate(other.quality_histogram):
+            self.quality_histogram[i] += count
+        for i, count in enumerate(other.completion_histogram):
+            self.completion_histogram[i] += count
+        return self
+
+    def as_row(self, publisher_id: uuid.UUID, granularity: str, bucket_start: datetime) -> Dict[str, Any]:
+        row = {name: getattr(self, name) for name in self.__slots__}
+        row.update(publisher_id=publisher_id, granularity=granularity, bucket_start=bucket_start)
+        return row
+
+    def summary(self) -> Dict[str, Any]:
+        quality_edges = [
+            settings.STATISTICS_QUALITY_SCORE_MAX * i / QUALITY_BINS for i in range(QUALITY_BINS + 1)
+        ]
+        completion_edges = [0.0, *COMPLETION_BOUNDS, math.inf]
+        return {
+            "tasks_served": self.tasks_served,
+            "tasks_completed": self.tasks_completed,
+            "tasks_rejected": self.tasks_rejected,
+            "quality_score": _distribution(
+                self.quality_count, self.quality_sum, self.quality_histogram, quality_edges
+            ),
+            "completion_time_seconds": _distribution(
+                self.completion_count, self.completion_seconds_sum, self.completion_histogram, completion_edges
+            ),
+        }
+
+
+def _percentile(histogram: Sequence[int], edges: Sequence[float], pct: float) -> float:
+    """Percentile from bin counts, interpolating linearly inside the bin."""
+    target = sum(histogram) * pct / 100
+    seen = 0
+    for i, count in enumerate(histogram):
+        if count and seen + count >= target:
+            low, high = edges[i], edges[i + 1]
+            if math.isinf(high):
+                return low
+            return low + (high - low) * (target - seen) / count
+        seen += count
+    return edges[-2]
+
+
+def _distribution(count: int, total: float, histogram: Sequence[int], edges: Sequence[float]) -> Dict[str, Any]:
+    if not count:
+        return {"count": 0, "mean": None, **{f"p{pct}": None for pct in PERCENTILES}}
+    return {
+        "count": count,
+        "mean": total / count,
+        **{f"p{pct}": _percentile(histogram, edges, pct) for pct in PERCENTILES},
+    }
+
+
+# --- Recording -------------------------------------------------------------
+
+# Unflushed deltas keyed by (publisher_id, minute since the epoch)
+_pending: Dict[Tuple[str, int], Rollup] = {}
+_flusher: Optional[asyncio.Task] = None
+
+_stats = {
+    "flushes": 0,
+    "rows_written": 0,
+    "flush_errors": 0,
+    "expired_rows": 0,
+    "uniques_errors": 0,
+}
+
+
+def _current(publisher_id: str) -> Rollup:
+    key = (str(publisher_id), int(time.time() // 60))
+    rollup = _pending.get(key)
+    if rollup is None:
+        rollup = _pending[key] = Rollup()
+    return rollup
+
+
+def record_served(publisher_id: str, count: int) -> None:
+    """Count tasks handed to a publisher's widget."""
+    live_statistics.increment(publisher_id, "tasks_served", count)
+    if settings.STATISTICS_ENABLED and count:
+        _current(publisher_id).tasks_served += count
+
+
+def record_task_status(publisher_id: str, update: Dict[str, Any]) -> None:
+    """
+    Fold an accepted task status update into the publisher's statistics.
+
+    `update` has the TaskStatusUpdate fields. The completion time is read
+    from result["duration_ms"] when the widget reports it.
+    """
+    status = update.get("status")
+    completed = status in COMPLETED_STATUSES
+    rejected = status in REJECTED_STATUSES
+    if completed or rejected:
+        live_statistics.increment(publisher_id, "tasks_completed" if completed else "tasks_rejected")
+    if not settings.STATISTICS_ENABLED:
+        return
+    rollup = _current(publisher_id)
+    if completed:
+        rollup.tasks_completed += 1
+        result = update.get("result") or {}
+        duration_ms = result.get("duration_ms") if isinstance(result, dict) else None
+        if isinstance(duration_ms, (int, float)) and duration_ms >= 0:
+            rollup.add_completion(duration_ms / 1000)
+    elif rejected:
+        rollup.tasks_rejected += 1
+    quality_score = update.get("quality_score")
+    if isinstance(quality_score, (int, float)) and math.isfinite(quality_score):
+        rollup.add_quality(float(quality_score))
+
+
+def _rollup_rows(pending: Dict[Tuple[str, int], Rollup]) -> List[Dict[str, Any]]:
+    """Fold minute deltas into their minute, hour and day buckets."""
+    buckets: Dict[Tuple[str, str, int], Rollup] = {}
+    for (publisher_id, minute), rollup in pending.items():
+        for granularity, seconds in GRANULARITIES:
+            start = minute * 60 // seconds * seconds
+            key = (publisher_id, granularity, start)
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = Rollup()
+            bucket.merge(rollup)
+    return [
+        rollup.as_row(uuid.UUID(publisher_id), granularity, datetime.fromtimestamp(start, timezone.utc))
+        for (publisher_id, granularity, start), rollup in buckets.items()
+    ]
+
+
+def _sync_write(rows: List[Dict[str, Any]]) -> None:
+    db = database.SessionLocal()
+    try:
+        statistics_crud.upsert_rollups(db, rows)
+    finally:
+        db.close()
+
+
+async def _write(rows: List[Dict[str, Any]]) -> None:
+    if settings.ASYNC_DATABASE:
+        async with database.AsyncSessionLocal() as db:
+            await statistics_crud.async_upsert_rollups(db, rows)
+    else:
+        await run_in_threadpool(_sync_write, rows)
+
+
+def _requeue(pending: Dict[Tuple[str, int], Rollup]) -> None:
+    for key, rollup in pending.items():
+        current = _pending.get(key)
+        _pending[key] = rollup if current is None else rollup.merge(current)
+
+
+async def flush() -> None:
+    """Write pending deltas. On failure they are kept for the next flush."""
+    global _pending
+    pending, _pending = _pending, {}
+    if not pending:
+        return
+    rows = _rollup_rows(pending)
+    # Shielded so a cancelled flush (shutdown) still learns whether the one
+    # transaction committed: deltas are then neither lost nor applied twice
+    write = asyncio.ensure_future(_write(rows))
+    try:
+        await asyncio.shield(write)
+    except asyncio.CancelledError:
+        await asyncio.wait({write})
+        if write.cancelled() or write.exception() is not None:
+            _requeue(pending)
+        raise
+    except Exception as e:
+        _stats["flush_errors"] += 1
+        logger.error(f"Failed to write {len(rows)} statistics rollups: {str(e)}")
+        # The write is one transaction, so nothing was applied
+        _requeue(pending)
+        return
+    _stats["flushes"] += 1
+    _stats["rows_written"] += len(rows)
+
+
+def _retention_cutoffs(now: float) -> Dict[str, datetime]:
+    return {
+        "minute": datetime.fromtimestamp(now - settings.STATISTICS_MINUTE_RETENTION_HOURS * 3600, timezone.utc),
+        "hour": datetime.fromtimestamp(now - settings.STATISTICS_HOUR_RETENTION_DAYS * 86400, timezone.utc),
+    }
+
+
+def _sync_expire(cutoffs: Dict[str, datetime]) -> int:
+    db = database.SessionLocal()
+    try:
+        return statistics_crud.delete_expired_rollups(db, cutoffs)
+    finally:
+        db.close()
+
+
+async def expire() -> None:
+    """Delete minute and hour buckets past their retention; day buckets are kept."""
+    cutoffs = _retention_cutoffs(time.time())
+    if settings.ASYNC_DATABASE:
+        async with database.AsyncSessionLocal() as db:
+            deleted = await statistics_crud.async_delete_expired_rollups(db, cutoffs)
+    else:
+        deleted = await run_in_threadpool(_sync_expire, cutoffs)
+    _stats["expired_rows"] += deleted
+
+
+async def _run_flusher() -> None:
+    next_sweep = time.monotonic()
+    while True:
+        await asyncio.sleep(settings.STATISTICS_FLUSH_INTERVAL_SECONDS)
+        await flush()
+        if time.monotonic() >= next_sweep:
+            next_sweep = time.monotonic() + settings.STATISTICS_RETENTION_SWEEP_SECONDS
+            try:
+                await expire()
+            except Exception as e:
+                logger.error(f"Statistics retention sweep failed: {str(e)}")
+
+
+def start_statistics() -> None:
+    global _flusher
+    if _flusher is None:
+        _flusher = asyncio.ensure_future(_run_flusher())
+        logger.info("Statistics rollup flusher started")
+
+
+async def stop_statistics() -> None:
+    """Stop the flusher and write whatever is still pending."""
+    global _flusher
+    if _flusher is not None:
+        _flusher.cancel()
+        await asyncio.gather(_flusher, return_exceptions=True)
+        _flusher = None
+    await flush()
+
+
+def statistics_stats() -> Dict[str, Any]:
+    stats: Dict[str, Any] = dict(_stats)
+    stats["pending_buckets"] = len(_pending)
+    return stats
+
+
+# --- Unique visitors -------------------------------------------------------
+#
+# One Redis HyperLogLog per publisher, kind and UTC day, fed with widget
+# session ids: every session counts as a visitor, sessions that complete a
+# task as labellers. A HyperLogLog takes at most 12 KB however many ids are
+# added (Redis keeps small ones sparse, well under that), and PFCOUNT over
+# several keys estimates the size of their union, so any range of days is
+# answered without storing ids. The estimate has a standard error of 0.81%.
+
+UNIQUES_STANDARD_ERROR = 0.0081
+
+# Session id, UTC timestamp, completed a task
+UniqueEntry = Tuple[str, float, bool]
+
+
+def _uniques_key(publisher_id: str, kind: str, day: date) -> str:
+    return f"stats:uniques:{publisher_id}:{kind}:{day:%Y%m%d}"
+
+
+async def record_uniques(publisher_entries: Iterable[Tuple[str, UniqueEntry]]) -> None:
+    """Add (publisher_id, (session_id, timestamp, completed)) entries to the day HyperLogLogs."""
+    if not settings.STATISTICS_ENABLED:
+        return
+    members: Dict[str, set] = {}
+    for publisher_id, (session_id, timestamp, completed) in publisher_entries:
+        day = datetime.fromtimestamp(timestamp, timezone.utc).date()
+        members.setdefault(_uniques_key(publisher_id, "visitors", day), set()).add(session_id)
+        if completed:
+            members.setdefault(_uniques_key(publisher_id, "labellers", day), set()).add(session_id)
+    if not members:
+        return
+
+    ttl = settings.STATISTICS_UNIQUES_RETENTION_DAYS * 86400
+    try:
+        redis = await get_redis_pool()
+        pipe = redis.pipeline(transaction=False)
+        for key, sessions in members.items():
+            pipe.pfadd(key, *sessions)
+            pipe.expire(key, ttl)
+        await pipe.execute()
+    except Exception as e:
+        _stats["uniques_errors"] += 1
+        logger.error(f"Failed to record unique visitors: {str(e)}")
+
+
+async def count_uniques(publisher_id: uuid.UUID, start: datetime, end: datetime) -> Optional[Dict[str, Any]]:
+    """
+    Estimated distinct visitors and labellers between start and end.
+
+    Counts whole UTC days, clipped to STATISTICS_UNIQUES_RETENTION_DAYS;
+    the days actually counted are returned with the estimates. None when
+    Redis is unavailable.
+    """
+    last = (end - timedelta(microseconds=1)).astimezone(timezone.utc).date()
+    oldest = datetime.now(timezone.utc).date() - timedelta(days=settings.STATISTICS_UNIQUES_RETENTION_DAYS - 1)
+    first = max(start.astimezone(timezone.utc).date(), oldest)
+    if first > last:
+        return None
+    days = [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+    try:
+        redis = await get_redis_pool()
+        pipe = redis.pipeline(transaction=False)
+        for kind in ("visitors", "labellers"):
+            pipe.pfcount(*(_uniques_key(str(publisher_id), kind, day) for day in days))
+        visitors, labellers = await pipe.execute()
+    except Exception as e:
+        _stats["uniques_errors"] += 1
+        logger.error(f"Failed to count unique visitors for publisher {publisher_id}: {str(e)}")
+        return None
+
+    return {
+        "visitors": visitors,
+        "labellers": labellers,
+        "start_date": first.isoformat(),
+        "end_date": last.isoformat(),
+        "standard_error": UNIQUES_STANDARD_ERROR,
+    }
+
+
+# --- Querying --------------------------------------------------------------
+
+def _floor(timestamp: int, size: int) -> int:
+    return timestamp // size * size
+
+
+def _ceil(timestamp: int, size: int) -> int:
+    return -(-timestamp // size) * size
+
+
+def _finest_retained(timestamp: int, now: float) -> int:
+    """Bucket size still kept at `timestamp`: older edges snap to coarser buckets."""
+    if timestamp < now - settings.STATISTICS_HOUR_RETENTION_DAYS * 86400:
+        return 86400
+    if timestamp < now - settings.STATISTICS_MINUTE_RETENTION_HOURS * 3600:
+        return 3600
+    return 60
+
+
+def _cover(start: int, end: int, level: int = 0) -> List[Tuple[str, int, int]]:
+    """Fewest buckets tiling [start, end): the coarsest that fit, finer ones at the edges."""
+    if start >= end:
+        return []
+    granularity, size = GRANULARITIES[level]
+    if level == len(GRANULARITIES) - 1:
+        return [(granularity, start, end)]
+    inner_start, inner_end = _ceil(start, size), _floor(end, size)
+    if inner_start >= inner_end:
+        return _cover(start, end, level + 1)
+    return (
+        _cover(start, inner_start, level + 1)
+        + [(granularity, inner_start, inner_end)]
+        + _cover(inner_end, end, level + 1)
+    )
+
+
+def _as_timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class StatisticsQuery:
+    """
+    A date range widened to bucket boundaries and the buckets covering it.
+
+    Edges are rounded out to the minute, or to the hour or day once minute
+    or hour buckets at that age have expired; `start` and `end` report the
+    range actually answered.
+    """
+
+    def __init__(self, start: Optional[datetime], end: Optional[datetime]):
+        now = time.time()
+        end_ts = _as_timestamp(end) if end else now
+        start_ts = _as_timestamp(start) if start else end_ts - settings.STATISTICS_DEFAULT_RANGE_DAYS * 86400
+        if start_ts >= end_ts:
+            raise ValueError("start_date must be before end_date")
+
+        start_ts = _floor(int(start_ts), _finest_retained(int(start_ts), now))
+        end_ts = _ceil(math.ceil(end_ts), _finest_retained(math.ceil(end_ts), now))
+        self.start = datetime.fromtimestamp(start_ts, timezone.utc)
+        self.end = datetime.fromtimestamp(end_ts, timezone.utc)
+        self.ranges = [
+            (granularity, datetime.fromtimestamp(low, timezone.utc), datetime.fromtimestamp(high, timezone.utc))
+            for granularity, low, high in _cover(start_ts, end_ts)
+        ]
+
+    def summarize(self, publisher_id: uuid.UUID, rows, uniques: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        total = Rollup()
+        for row in rows:
+            total.merge(row)
+        return {
+            "publisher_id": str(publisher_id),
+            "start_date": self.start.isoformat(),
+            "end_date": self.end.isoformat(),
+            **total.summary(),
+            "uniques": uniques,
+            "buckets_read": len(rows),
+        }
@@ -0,0 +1,240 @@
+import asyncio
+import json
+import logging
+import random
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.redis import acquire_lease, get_redis_pool, release_lease, renew_lease
+from app.core.resilience import LatencyTracker
+from app.crud import publisher as publisher_crud
+from app.services import quality_aggregates, statistics
+
+logger = logging.getLogger(__name__)
+
+GROUP = "publishers-status"
+DEAD_LETTER_STREAM = "tasks:status:dead"
+
+_workers: List[asyncio.Task] = []
+_latency = LatencyTracker(size=2048)
+_stats = {
+    "enqueued": 0,
+    "delivered": 0,
+    "retries": 0,
+    "dead_lettered": 0,
+}
+
+
+def _stream_key(shard: int) -> str:
+    return f"tasks:status:{shard}"
+
+
+def _lease_key(shard: int) -> str:
+    return f"tasks:status:{shard}:lease"
+
+
+def _shard_for(task_id: str) -> int:
+    # Every update for a task lands on the same shard, and a shard has a
+    # single consumer at a time, which keeps per-task ordering
+    return zlib.crc32(task_id.encode()) % settings.TASK_STATUS_STREAM_SHARDS
+
+
+def _entry_age_ms(message_id: str) -> int:
+    return int(time.time() * 1000) - int(message_id.split("-", 1)[0])
+
+
+async def enqueue(publisher_id: str, task_id: str, update: Dict[str, Any]) -> str:
+    """
+    Append a status update to the task's shard stream.
+
+    Returns:
+        The Redis stream entry id
+    """
+    redis = await get_redis_pool()
+    message_id = await redis.xadd(
+        _stream_key(_shard_for(task_id)),
+        {
+            "publisher_id": str(publisher_id),
+            "task_id": task_id,
+            "update": json.dumps(update),
+        },
+    )
+    _stats["enqueued"] += 1
+    return message_id
+
+
+async def ensure_groups() -> None:
+    redis = await get_redis_pool()
+    for shard in range(settings.TASK_STATUS_STREAM_SHARDS):
+        try:
+            await redis.xgroup_create(_stream_key(shard), GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+
+async def _deliver(fields: Dict[str, str], keep_alive: Callable[[], Awaitable[Any]]) -> Optional[str]:
+    """
+    Deliver one update upstream with exponential backoff.
+
+    keep_alive is awaited between attempts so a long retry sequence does not
+    let the shard lease lapse.
+
+    Returns:
+        None on success, otherwise the reason the update was given up on
+    """
+    update = json.loads(fields["update"])
+    delay = settings.TASK_STATUS_RETRY_BASE_SECONDS
+    for attempt in range(1, settings.TASK_STATUS_MAX_ATTEMPTS + 1):
+        try:
+            await publisher_crud.update_task_status(
+                task_id=fields["task_id"],
+                task_status=update["status"],
+                result=update.get("result"),
+                quality_score=update.get("quality_score"),
+                rejection_reason=update.get("rejection_reason")
+            )
+            statistics.record_task_status(fields["publisher_id"], update)
+            await quality_aggregates.record_task_status(fields["publisher_id"], update)
+            return None
+        except HTTPException as e:
+            # A 4xx will not get better by retrying
+            if e.status_code < 500:
+                return f"{e.status_code}: {e.detail}"
+            reason = f"{e.status_code}: {e.detail}"
+
+        if attempt < settings.TASK_STATUS_MAX_ATTEMPTS:
+            _stats["retries"] += 1
+            await asyncio.sleep(delay * (0.5 + random.random()))
+            await keep_alive()
+            delay = min(delay * 2, settings.TASK_STATUS_RETRY_MAX_SECONDS)
+    return f"gave up after {settings.TASK_STATUS_MAX_ATTEMPTS} attempts ({reason})"
+
+
+async def _drain_shard(redis, shard: int) -> None:
+    """Consume a shard in order for as long as it has work and we hold its lease."""
+    stream = _stream_key(shard)
+    consumer = f"shard-{shard}"
+    lease_ms = int(settings.TASK_STATUS_SHARD_LEASE_SECONDS * 1000)
+
+    async def renew() -> bool:
+        return await renew_lease(redis, _lease_key(shard), lease_ms)
+
+    # Entries a previous lease holder read but never acknowledged come first
+    next_id = "0"
+    while True:
+        if not await renew():
+            return
+
+        reply = await redis.xreadgroup(
+            GROUP, consumer, {stream: next_id},
+            count=settings.TASK_STATUS_READ_BATCH,
+            block=None if next_id == "0" else 1000,
+        )
+        entries = reply[0][1] if reply else []
+        if not entries:
+            if next_id == "0":
+                next_id = ">"
+                continue
+            return
+
+        for message_id, fields in entries:
+            if not await renew():
+                # Another worker owns the shard now and will re-read our pending entries
+                return
+            if not fields:
+                # Deleted while pending; nothing to deliver
+                await redis.xack(stream, GROUP, message_id)
+                continue
+
+            failure = await _deliver(fields, renew)
+            pipe = redis.pipeline(transaction=True)
+            if failure is None:
+                _stats["delivered"] += 1
+                _latency.observe(_entry_age_ms(message_id) / 1000)
+            else:
+                _stats["dead_lettered"] += 1
+                logger.error(f"Dead-lettering status update for task {fields.get('task_id')}: {failure}")
+                pipe.xadd(DEAD_LETTER_STREAM, {**fields, "source_id": message_id, "error": failure})
+            pipe.xack(stream, GROUP, message_id)
+            pipe.xdel(stream, message_id)
+            await pipe.execute()
+
+
+async def _worker(index: int) -> None:
+    shards = list(range(settings.TASK_STATUS_STREAM_SHARDS))
+    while True:
+        try:
+            redis = await get_redis_pool()
+            lease_ms = int(settings.TASK_STATUS_SHARD_LEASE_SECONDS * 1000)
+            random.shuffle(shards)
+            worked = False
+            for shard in shards:
+                if not await acquire_lease(redis, _lease_key(shard), lease_ms):
+                    continue
+                worked = True
+                try:
+                    await _drain_shard(redis, shard)
+                finally:
+                    await release_lease(redis, _lease_key(shard))
+            if not worked:
+                await asyncio.sleep(1.0)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Status queue worker {index} failed: {str(e)}")
+            await asyncio.sleep(1.0)
+
+
+async def start_workers() -> None:
+    """Create consumer groups and start this process's delivery workers."""
+    await ensure_groups()
+    for index in range(settings.TASK_STATUS_WORKERS):
+        _workers.append(asyncio.ensure_future(_worker(index)))
+    logger.info(f"Started {settings.TASK_STATUS_WORKERS} task status delivery workers")
+
+
+async def stop_workers() -> None:
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+
+async def queue_stats() -> Dict[str, Any]:
+    """Backlog depth and age per shard plus local delivery counters."""
+    stats: Dict[str, Any] = dict(_stats)
+    p95 = _latency.percentile(95)
+    stats["delivery_latency_p95_ms"] = round(p95 * 1000, 1) if p95 is not None else None
+    stats["delivery_latency_p50_ms"] = (
+        round(_latency.percentile(50) * 1000, 1) if p95 is not None else None
+    )
+    stats["workers"] = len(_workers)
+    try:
+        redis = await get_redis_pool()
+        pipe = redis.pipeline(transaction=False)
+        for shard in range(settings.TASK_STATUS_STREAM_SHARDS):
+            pipe.xlen(_stream_key(shard))
+            pipe.xrange(_stream_key(shard), "-", "+", count=1)
+        pipe.xlen(DEAD_LETTER_STREAM)
+        replies = await pipe.execute()
+
+        shards = []
+        for shard in range(settings.TASK_STATUS_STREAM_SHARDS):
+            depth, oldest = replies[2 * shard], replies[2 * shard + 1]
+            shards.append({
+                "shard": shard,
+                "depth": depth,
+                "lag_seconds": round(_entry_age_ms(oldest[0][0]) / 1000, 3) if oldest else 0.0,
+            })
+        stats["depth"] = sum(shard["depth"] for shard in shards)
+        stats["max_lag_seconds"] = max((shard["lag_seconds"] for shard in shards), default=0.0)
+        stats["dead_letter_depth"] = replies[-1]
+        stats["shards"] = shards
+    except Exception as e:
+        stats["error"] = str(e)
+    return stats
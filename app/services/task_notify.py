@@ -0,0 +1,308 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+
+from app.core.config import settings
+from app.core.redis import acquire_lease, get_redis_pool, release_lease, renew_lease
+from app.crud import publisher as publisher_crud
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "tasks:notify:"
+
+# Local fan-out: one queue per open widget connection in this worker
+_subscribers: Dict[str, Set[asyncio.Queue]] = {}
+_watchers: Dict[str, asyncio.Task] = {}
+_background: Set[asyncio.Task] = set()
+_pubsub = None
+_listener: Optional[asyncio.Task] = None
+_subscribe_lock: Optional[asyncio.Lock] = None
+
+_stats = {
+    "upstream_polls": 0,
+    "events_published": 0,
+    "events_delivered": 0,
+    "events_dropped": 0,
+    "watch_errors": 0,
+}
+
+
+def _channel(publisher_id: str) -> str:
+    return f"{CHANNEL_PREFIX}{publisher_id}"
+
+
+def _lease_key(publisher_id: str) -> str:
+    return f"tasks:watch:{publisher_id}:lease"
+
+
+def _state_key(publisher_id: str) -> str:
+    return f"tasks:watch:{publisher_id}:state"
+
+
+def _ids_key(publisher_id: str) -> str:
+    return f"tasks:watch:{publisher_id}:ids"
+
+
+def _parse_event(state: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    if not state or "version" not in state:
+        return None
+    return {
+        "version": int(state["version"]),
+        "available": int(state.get("available", 0)),
+        "new_task_ids": json.loads(state.get("new_task_ids", "[]")),
+        "updated_at": float(state.get("updated_at", 0)),
+    }
+
+
+async def current_event(publisher_id: str) -> Optional[Dict[str, Any]]:
+    """The most recent availability event for a publisher, if any."""
+    redis = await get_redis_pool()
+    return _parse_event(await redis.hgetall(_state_key(publisher_id)))
+
+
+async def _poll(redis, publisher_id: str, known: Optional[Set[str]]) -> Set[str]:
+    """Fetch available tasks once and publish an event if new ones appeared."""
+    if known is None:
+        # Taking over from another watcher: start from what it last saw
+        raw = await redis.get(_ids_key(publisher_id))
+        known = set(json.loads(raw)) if raw else None
+
+    tasks = await publisher_crud.get_available_tasks(publisher_id=publisher_id, db=None)
+    _stats["upstream_polls"] += 1
+    task_ids = {str(task.get("id")) for task in tasks}
+    new_ids = task_ids - known if known is not None else task_ids
+    if known is not None and task_ids == known:
+        return known
+
+    ttl = settings.TASK_EVENTS_STATE_TTL_SECONDS
+    pipe = redis.pipeline(transaction=True)
+    pipe.set(_ids_key(publisher_id), json.dumps(sorted(task_ids)), ex=ttl)
+    if new_ids:
+        pipe.hincrby(_state_key(publisher_id), "version", 1)
+        pipe.hset(_state_key(publisher_id), mapping={
+            "available": len(task_ids),
+            "new_task_ids": json.dumps(sorted(new_ids)[:settings.TASK_EVENTS_MAX_IDS]),
+            "updated_at": time.time(),
+        })
+    else:
+        pipe.hset(_state_key(publisher_id), "available", len(task_ids))
+    pipe.expire(_state_key(publisher_id), ttl)
+    await pipe.execute()
+
+    if new_ids:
+        event = _parse_event(await redis.hgetall(_state_key(publisher_id)))
+        await redis.publish(_channel(publisher_id), json.dumps(event))
+        _stats["events_published"] += 1
+    return task_ids
+
+
+async def _watch(publisher_id: str) -> None:
+    """
+    Poll the tasks service for one publisher while this worker has widgets
+    connected for it. A Redis lease makes sure only one worker in the fleet
+    polls at a time; the others wait to take over.
+    """
+    lease_ms = int(settings.TASK_EVENTS_WATCH_LEASE_SECONDS * 1000)
+    known: Optional[Set[str]] = None
+    try:
+        while True:
+            try:
+                redis = await get_redis_pool()
+                lease = _lease_key(publisher_id)
+                if await renew_lease(redis, lease, lease_ms) or await acquire_lease(redis, lease, lease_ms):
+                    known = await _poll(redis, publisher_id, known)
+                else:
+                    known = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                _stats["watch_errors"] += 1
+                logger.error(f"Task watcher for publisher {publisher_id} failed: {str(e)}")
+            await asyncio.sleep(settings.TASK_EVENTS_POLL_INTERVAL_SECONDS)
+    finally:
+        try:
+            redis = await get_redis_pool()
+            await release_lease(redis, _lease_key(publisher_id))
+        except Exception:
+            pass
+
+
+def _dispatch(publisher_id: str, event: Dict[str, Any]) -> None:
+    for queue in list(_subscribers.get(publisher_id, ())):
+        if queue.full():
+            # A slow reader only needs the latest event
+            queue.get_nowait()
+            _stats["events_dropped"] += 1
+        queue.put_nowait(event)
+        _stats["events_delivered"] += 1
+
+
+async def _listen() -> None:
+    while True:
+        try:
+            message = await _pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            if message is None or message.get("type") != "message":
+                if message is None and not _pubsub.subscribed:
+                    await asyncio.sleep(0.1)
+                continue
+            publisher_id = message["channel"][len(CHANNEL_PREFIX):]
+            _dispatch(publisher_id, json.loads(message["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Task notification listener failed: {str(e)}")
+            await asyncio.sleep(1.0)
+
+
+async def subscribe(publisher_id: str) -> asyncio.Queue:
+    """Register a local listener for the publisher's availability events."""
+    global _pubsub, _listener, _subscribe_lock
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=8)
+    if _subscribe_lock is None:
+        _subscribe_lock = asyncio.Lock()
+
+    async with _subscribe_lock:
+        first = publisher_id not in _subscribers
+        _subscribers.setdefault(publisher_id, set()).add(queue)
+        if first:
+            if _pubsub is None:
+                redis = await get_redis_pool()
+                _pubsub = redis.pubsub()
+            await _pubsub.subscribe(_channel(publisher_id))
+            _watchers[publisher_id] = asyncio.ensure_future(_watch(publisher_id))
+            if _listener is None:
+                _listener = asyncio.ensure_future(_listen())
+    return queue
+
+
+def unsubscribe(publisher_id: str, queue: asyncio.Queue) -> None:
+    """
+    Drop a local listener. The last listener for a publisher stops its
+    watcher and channel subscription in the background, so this is safe to
+    call while the caller is being cancelled.
+    """
+    queues = _subscribers.get(publisher_id)
+    if queues is None:
+        return
+    queues.discard(queue)
+    if queues:
+        return
+
+    del _subscribers[publisher_id]
+    watcher = _watchers.pop(publisher_id, None)
+    if watcher is not None:
+        watcher.cancel()
+
+    async def _close_channel():
+        # A new listener may have arrived in the meantime
+        async with _subscribe_lock:
+            if publisher_id not in _subscribers and _pubsub is not None:
+                await _pubsub.unsubscribe(_channel(publisher_id))
+
+    task = asyncio.ensure_future(_close_channel())
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+def _format_sse(event: Dict[str, Any]) -> str:
+    return f"id: {event['version']}\nevent: tasks\ndata: {json.dumps(event)}\n\n"
+
+
+async def event_stream(
+    publisher_id: str,
+    since: int,
+    is_disconnected: Callable[[], Awaitable[bool]]
+) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for one widget connection.
+
+    Sends the latest event straight away when it is newer than `since`,
+    then each new one as it is published. Comment lines keep the connection
+    alive, and the stream ends after TASK_EVENTS_MAX_STREAM_SECONDS so the
+    browser reconnects (with Last-Event-ID) to a fresh worker.
+    """
+    queue = await subscribe(publisher_id)
+    try:
+        yield f"retry: {int(settings.TASK_EVENTS_RETRY_MS)}\n\n"
+        try:
+            event = await current_event(publisher_id)
+        except Exception as e:
+            logger.error(f"Could not read task availability for publisher {publisher_id}: {str(e)}")
+            event = None
+        if event is not None and event["version"] > since:
+            since = event["version"]
+            yield _format_sse(event)
+
+        ends_at = time.monotonic() + settings.TASK_EVENTS_MAX_STREAM_SECONDS
+        while time.monotonic() < ends_at:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.TASK_EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            if event["version"] > since:
+                since = event["version"]
+                yield _format_sse(event)
+    finally:
+        unsubscribe(publisher_id, queue)
+
+
+async def wait_for_event(publisher_id: str, since: int, timeout: float) -> Optional[Dict[str, Any]]:
+    """
+    Long-poll: return the latest event once it is newer than `since`, or
+    None if nothing new arrived within the timeout.
+    """
+    queue = await subscribe(publisher_id)
+    try:
+        event = await current_event(publisher_id)
+        if event is not None and event["version"] > since:
+            return event
+
+        ends_at = time.monotonic() + timeout
+        while True:
+            remaining = ends_at - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return None
+            if event["version"] > since:
+                return event
+    finally:
+        unsubscribe(publisher_id, queue)
+
+
+async def stop_notifier() -> None:
+    """Stop watchers and the pub/sub listener for this worker."""
+    global _pubsub, _listener
+
+    pending = list(_watchers.values()) + list(_background)
+    if _listener is not None:
+        pending.append(_listener)
+        _listener = None
+    _watchers.clear()
+    _subscribers.clear()
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    if _pubsub is not None:
+        try:
+            await _pubsub.close()
+        except Exception as e:
+            logger.error(f"Failed to close task notification subscription: {str(e)}")
+        _pubsub = None
+
+
+def notifier_stats() -> Dict[str, Any]:
+    stats: Dict[str, Any] = dict(_stats)
+    stats["publishers"] = len(_subscribers)
+    stats["connections"] = sum(len(queues) for queues in _subscribers.values())
+    stats["watchers"] = len(_watchers)
+    return stats
@@ -0,0 +1,229 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.core.redis import acquire_lease, get_redis_pool, release_lease
+from app.crud import publisher as publisher_crud
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_KEY = "tasks:prefetch:active"
+
+# Local refill bookkeeping; the Redis lock stops other workers piling on
+_refilling: Set[str] = set()
+_background: Set[asyncio.Task] = set()
+_sweeper: Optional[asyncio.Task] = None
+
+_stats = {
+    "hits": 0,
+    "partial_hits": 0,
+    "misses": 0,
+    "redis_errors": 0,
+    "refills": 0,
+    "refill_failures": 0,
+    "tasks_buffered": 0,
+    "evictions": 0,
+}
+
+
+def _buffer_key(publisher_id: str) -> str:
+    return f"tasks:prefetch:{publisher_id}:buffer"
+
+
+def _seen_key(publisher_id: str) -> str:
+    return f"tasks:prefetch:{publisher_id}:seen"
+
+
+def _lock_key(publisher_id: str) -> str:
+    return f"tasks:prefetch:{publisher_id}:refill"
+
+
+async def get_tasks(publisher_id: str, limit: int) -> List[Dict[str, Any]]:
+    """
+    Serve available tasks from the publisher's prefetch buffer.
+
+    The buffer pop, the depth check and the activity stamp share one Redis
+    round trip. When the buffer runs short the remainder is fetched directly
+    from the tasks service and a background refill is scheduled.
+    """
+    publisher_id = str(publisher_id)
+    try:
+        redis = await get_redis_pool()
+        pipe = redis.pipeline(transaction=True)
+        pipe.lrange(_buffer_key(publisher_id), 0, limit - 1)
+        pipe.ltrim(_buffer_key(publisher_id), limit, -1)
+        pipe.llen(_buffer_key(publisher_id))
+        pipe.zadd(ACTIVE_KEY, {publisher_id: time.time()})
+        raw_items, _, depth, _ = await pipe.execute()
+    except Exception as e:
+        logger.error(f"Prefetch buffer unavailable for publisher {publisher_id}: {str(e)}")
+        _stats["redis_errors"] += 1
+        return await _fetch_direct(publisher_id, limit)
+
+    if depth < settings.TASK_PREFETCH_LOW_WATER:
+        schedule_refill(publisher_id)
+
+    tasks = [json.loads(item) for item in raw_items]
+    if len(tasks) >= limit:
+        _stats["hits"] += 1
+        return tasks
+
+    if tasks:
+        _stats["partial_hits"] += 1
+    else:
+        _stats["misses"] += 1
+
+    served = {task.get("id") for task in tasks}
+    for task in await _fetch_direct(publisher_id, limit):
+        if len(tasks) >= limit:
+            break
+        if task.get("id") not in served:
+            tasks.append(task)
+    return tasks
+
+
+async def _fetch_direct(publisher_id: str, limit: int) -> List[Dict[str, Any]]:
+    tasks = await publisher_crud.get_available_tasks(publisher_id=publisher_id, db=None, limit=limit)
+    return list(tasks[:limit])
+
+
+def schedule_refill(publisher_id: str) -> None:
+    """Refill the publisher's buffer in the background unless a refill is already running here."""
+    if publisher_id in _refilling:
+        return
+    _refilling.add(publisher_id)
+    task = asyncio.ensure_future(_refill(publisher_id))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def _refill(publisher_id: str) -> None:
+    try:
+        redis = await get_redis_pool()
+        lock_ttl_ms = int(settings.TASK_PREFETCH_REFILL_LOCK_SECONDS * 1000)
+        if not await acquire_lease(redis, _lock_key(publisher_id), lock_ttl_ms):
+            return
+
+        try:
+            depth = await redis.llen(_buffer_key(publisher_id))
+            room = settings.TASK_PREFETCH_DEPTH - depth
+            if room <= 0:
+                return
+
+            candidates = await publisher_crud.get_available_tasks(publisher_id=publisher_id, db=None)
+            if not candidates:
+                return
+
+            # Skip tasks this buffer already handed out recently
+            now = time.time()
+            seen_key = _seen_key(publisher_id)
+            pipe = redis.pipeline(transaction=False)
+            pipe.zremrangebyscore(seen_key, "-inf", now - settings.TASK_PREFETCH_SEEN_TTL_SECONDS)
+            for task in candidates:
+                pipe.zscore(seen_key, str(task.get("id")))
+            seen_scores = (await pipe.execute())[1:]
+
+            fresh = [task for task, score in zip(candidates, seen_scores) if score is None][:room]
+            if not fresh:
+                return
+
+            pipe = redis.pipeline(transaction=True)
+            pipe.rpush(_buffer_key(publisher_id), *[json.dumps(task) for task in fresh])
+            pipe.ltrim(_buffer_key(publisher_id), 0, settings.TASK_PREFETCH_DEPTH - 1)
+            pipe.zadd(seen_key, {str(task.get("id")): now for task in fresh})
+            pipe.expire(_buffer_key(publisher_id), settings.TASK_PREFETCH_IDLE_SECONDS)
+            pipe.expire(seen_key, int(settings.TASK_PREFETCH_SEEN_TTL_SECONDS))
+            await pipe.execute()
+
+            _stats["refills"] += 1
+            _stats["tasks_buffered"] += len(fresh)
+            logger.debug(f"Buffered {len(fresh)} tasks for publisher {publisher_id}")
+        finally:
+            # The lock may have expired and been taken by another worker
+            await release_lease(redis, _lock_key(publisher_id))
+    except Exception as e:
+        _stats["refill_failures"] += 1
+        logger.error(f"Failed to refill task buffer for publisher {publisher_id}: {str(e)}")
+    finally:
+        _refilling.discard(publisher_id)
+
+
+async def sweep() -> None:
+    """Evict idle publishers' buffers and top up the rest."""
+    redis = await get_redis_pool()
+    now = time.time()
+
+    idle = await redis.zrangebyscore(ACTIVE_KEY, "-inf", now - settings.TASK_PREFETCH_IDLE_SECONDS)
+    if idle:
+        pipe = redis.pipeline(transaction=False)
+        for publisher_id in idle:
+            pipe.delete(_buffer_key(publisher_id), _seen_key(publisher_id))
+        pipe.zrem(ACTIVE_KEY, *idle)
+        await pipe.execute()
+        _stats["evictions"] += len(idle)
+        logger.info(f"Evicted task buffers for {len(idle)} idle publishers")
+
+    active = await redis.zrangebyscore(ACTIVE_KEY, now - settings.TASK_PREFETCH_IDLE_SECONDS, "+inf")
+    if not active:
+        return
+
+    pipe = redis.pipeline(transaction=False)
+    for publisher_id in active:
+        pipe.llen(_buffer_key(publisher_id))
+    for publisher_id, depth in zip(active, await pipe.execute()):
+        if depth < settings.TASK_PREFETCH_LOW_WATER:
+            schedule_refill(publisher_id)
+
+
+async def _sweep_forever() -> None:
+    while True:
+        try:
+            await sweep()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Task prefetch sweep failed: {str(e)}")
+        await asyncio.sleep(settings.TASK_PREFETCH_SWEEP_INTERVAL_SECONDS)
+
+
+def start_prefetcher() -> None:
+    """Start the background sweeper for this worker."""
+    global _sweeper
+
+    if _sweeper is None:
+        logger.info("Starting task prefetch sweeper")
+        _sweeper = asyncio.ensure_future(_sweep_forever())
+
+
+async def stop_prefetcher() -> None:
+    """Stop the sweeper and any refills still running."""
+    global _sweeper
+
+    pending = list(_background)
+    if _sweeper is not None:
+        pending.append(_sweeper)
+        _sweeper = None
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def prefetch_stats(max_publishers: int = 100) -> Dict[str, Any]:
+    """Local counters plus buffer depth for the most recently active publishers."""
+    stats: Dict[str, Any] = dict(_stats)
+    stats["refills_in_flight"] = len(_refilling)
+    try:
+        redis = await get_redis_pool()
+        publishers = await redis.zrevrange(ACTIVE_KEY, 0, max_publishers - 1)
+        pipe = redis.pipeline(transaction=False)
+        for publisher_id in publishers:
+            pipe.llen(_buffer_key(publisher_id))
+        depths = await pipe.execute() if publishers else []
+        stats["active_publishers"] = await redis.zcard(ACTIVE_KEY)
+        stats["buffer_depths"] = dict(zip(publishers, depths))
+    except Exception as e:
+        stats["error"] = str(e)
+    return stats
@@ -0,0 +1,243 @@
+import logging
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core import database
+from app.core.auth import AuthenticatedPublisher
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.crud import publisher as publisher_crud
+
+logger = logging.getLogger(__name__)
+
+COMPLEXITY_PENALTY = 0.25
+SHORT_TASK_PENALTY = 0.5
+
+
+def _number(value: Any) -> Optional[float]:
+    """value as a float, or None when it is missing or not a number."""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if np.isnan(number) else number
+
+
+def _label(value: Any) -> Optional[str]:
+    """Categorical values compare as strings; anything else is unknown."""
+    if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+        return str(value)
+    return None
+
+
+def _numbers(values: Sequence[Any]) -> np.ndarray:
+    """Float column with NaN for missing or malformed values."""
+    column = [_number(value) for value in values]
+    return np.array([np.nan if value is None else value for value in column], dtype=np.float32)
+
+
+class _Column:
+    """Categorical column: one int code per task plus the value vocabulary."""
+
+    __slots__ = ("codes", "vocabulary")
+
+    def __init__(self, values: Sequence[Any]):
+        index: Dict[Optional[str], int] = {}
+        self.codes = np.fromiter(
+            (index.setdefault(_label(value), len(index)) for value in values),
+            dtype=np.int32,
+            count=len(values),
+        )
+        self.vocabulary: List[Optional[str]] = list(index)
+
+    def lookup(self, weights: Dict[str, float], default: float = 0.0) -> np.ndarray:
+        """Per-task weight: one dict lookup per distinct value, then a gather."""
+        table = np.array([weights.get(value, default) for value in self.vocabulary], dtype=np.float32)
+        return table[self.codes]
+
+
+class CandidatePool:
+    """Candidate tasks with the fields used for ranking laid out as arrays."""
+
+    def __init__(self, tasks: List[Dict[str, Any]]):
+        self.tasks = tasks
+        self.size = len(tasks)
+        self.task_type = _Column([task.get("task_type") for task in tasks])
+        self.category = _Column([task.get("category") for task in tasks])
+        self.language = _Column([task.get("language") for task in tasks])
+        # Malformed numbers are treated as unknown, like missing ones
+        self.complexity = _numbers([task.get("complexity_level") for task in tasks])
+        self.time_estimate = _numbers([task.get("time_estimate_seconds") for task in tasks])
+        known_times = self.time_estimate[~np.isnan(self.time_estimate)]
+        self.median_time = float(np.median(known_times)) if known_times.size else 0.0
+
+
+def _weights(preference: Any) -> Dict[str, float]:
+    if isinstance(preference, dict):
+        weights = {str(key): _number(value) for key, value in preference.items()}
+        return {key: weight for key, weight in weights.items() if weight is not None}
+    if isinstance(preference, (list, tuple, set)):
+        return {label: 1.0 for label in map(_label, preference) if label is not None}
+    if isinstance(preference, str):
+        return {preference: 1.0}
+    return {}
+
+
+class RankingProfile:
+    """
+    A publisher's preferences, normalised once per stored publisher version.
+    Values of the wrong type are skipped rather than failing the request.
+
+    Recognised configuration keys:
+
+    task_preferences:
+        task_types, categories, languages: a list of preferred values or a
+            {value: weight} mapping. Listed values add 1 (or their weight).
+        excluded_task_types, excluded_categories: never served.
+        complexity_level: an int (distance from it is penalised) or
+            {"min": .., "max": ..} (levels outside are never served).
+        max_time_seconds: longer time estimates are never served.
+
+    behavior:
+        prefer_short_tasks: penalise time estimates above the pool median.
+        max_tasks_per_user: cap on tasks returned per request.
+    """
+
+    def __init__(self, task_preferences: Optional[Dict[str, Any]], behavior: Optional[Dict[str, Any]]):
+        prefs = task_preferences if isinstance(task_preferences, dict) else {}
+        behavior = behavior if isinstance(behavior, dict) else {}
+        # Exclusions fold into the weight tables as -inf
+        self.task_types = _weights(prefs.get("task_types"))
+        self.task_types.update(dict.fromkeys(_weights(prefs.get("excluded_task_types")), -np.inf))
+        self.categories = _weights(prefs.get("categories"))
+        self.categories.update(dict.fromkeys(_weights(prefs.get("excluded_categories")), -np.inf))
+        self.languages = _weights(prefs.get("languages"))
+
+        complexity = prefs.get("complexity_level")
+        self.preferred_complexity: Optional[float] = None
+        self.min_complexity: Optional[float] = None
+        self.max_complexity: Optional[float] = None
+        if isinstance(complexity, dict):
+            self.min_complexity = _number(complexity.get("min"))
+            self.max_complexity = _number(complexity.get("max"))
+        else:
+            self.preferred_complexity = _number(complexity)
+
+        self.max_time_seconds = _number(prefs.get("max_time_seconds"))
+        self.prefer_short_tasks = bool(behavior.get("prefer_short_tasks"))
+        max_tasks = _number(behavior.get("max_tasks_per_user"))
+        self.max_tasks_per_user = int(max_tasks) if max_tasks is not None and 0 <= max_tasks < np.inf else None
+
+    def score(self, pool: CandidatePool) -> np.ndarray:
+        """Score every candidate; -inf marks tasks that must not be served."""
+        scores = np.zeros(pool.size, dtype=np.float32)
+        if pool.size == 0:
+            return scores
+
+        if self.task_types:
+            scores += pool.task_type.lookup(self.task_types)
+        if self.categories:
+            scores += pool.category.lookup(self.categories)
+        if self.languages:
+            scores += pool.language.lookup(self.languages)
+
+        # Unknown complexity or time estimates are neither rewarded nor excluded
+        if self.preferred_complexity is not None:
+            distance = np.abs(pool.complexity - self.preferred_complexity)
+            scores -= COMPLEXITY_PENALTY * np.nan_to_num(distance, nan=0.0)
+        if self.min_complexity is not None:
+            scores[pool.complexity < self.min_complexity] = -np.inf
+        if self.max_complexity is not None:
+            scores[pool.complexity > self.max_complexity] = -np.inf
+        if self.max_time_seconds is not None:
+            scores[pool.time_estimate > self.max_time_seconds] = -np.inf
+        if self.prefer_short_tasks and pool.median_time > 0:
+            relative = np.nan_to_num(pool.time_estimate / pool.median_time, nan=1.0)
+            scores -= SHORT_TASK_PENALTY * relative
+
+        return scores
+
+    def top_k(self, pool: CandidatePool, k: int) -> List[Dict[str, Any]]:
+        """The k best-scoring candidates, best first."""
+        if self.max_tasks_per_user:
+            k = min(k, int(self.max_tasks_per_user))
+        if k <= 0 or pool.size == 0:
+            return []
+
+        scores = self.score(pool)
+        if k < pool.size:
+            # O(n) selection of the k-th best score; ties at the cut go to the
+            # earliest candidates so the upstream order still decides them
+            threshold = -np.partition(-scores, k - 1)[k - 1]
+            above = np.flatnonzero(scores > threshold)
+            ties = np.flatnonzero(scores == threshold)[:k - above.size]
+            candidates = np.concatenate((above, ties))
+        else:
+            candidates = np.arange(pool.size)
+        # Best score first; equal scores keep the upstream order
+        order = candidates[np.lexsort((candidates, -scores[candidates]))]
+        order = order[np.isfinite(scores[order])]
+        return [pool.tasks[i] for i in order.tolist()]
+
+
+# Profiles are keyed by the publisher's stored row version, which every write
+# bumps, so a config change is picked up as soon as the publisher record is
+# re-read; configuration updates evict this worker's record at once
+_profiles = TTLCache(
+    max_size=settings.API_KEY_CACHE_MAX_SIZE,
+    ttl_seconds=settings.API_KEY_CACHE_TTL_SECONDS,
+)
+# Encoding is shared by every request that arrives within the pool TTL
+candidate_pool_flight = SingleFlight(result_ttl=settings.TASK_RANKING_POOL_TTL_SECONDS)
+
+
+def _sync_load_configuration(publisher_id: str) -> Optional[Dict[str, Any]]:
+    db = database.SessionLocal()
+    try:
+        publisher = publisher_crud.get_publisher(db, publisher_id)
+        return publisher.configuration if publisher else None
+    finally:
+        db.close()
+
+
+async def _load_profile(publisher: AuthenticatedPublisher) -> RankingProfile:
+    if settings.ASYNC_DATABASE:
+        async with database.AsyncSessionLocal() as db:
+            record = await publisher_crud.async_get_publisher(db, str(publisher.id))
+            configuration = record.configuration if record else None
+    else:
+        configuration = await run_in_threadpool(_sync_load_configuration, str(publisher.id))
+    configuration = configuration or {}
+    return RankingProfile(configuration.get("task_preferences"), configuration.get("behavior"))
+
+
+async def get_profile(publisher: AuthenticatedPublisher) -> RankingProfile:
+    key: Tuple[Hashable, ...] = (publisher.id, publisher.version)
+    profile = _profiles.get(key)
+    if profile is None:
+        profile = await _load_profile(publisher)
+        _profiles.set(key, profile)
+    return profile
+
+
+async def _fetch_pool(publisher_id: str) -> CandidatePool:
+    tasks = await publisher_crud.get_available_tasks(
+        publisher_id=publisher_id,
+        db=None,
+        limit=settings.TASK_RANKING_POOL_SIZE
+    )
+    return CandidatePool(list(tasks))
+
+
+async def ranked_tasks(publisher: AuthenticatedPublisher, limit: int) -> List[Dict[str, Any]]:
+    """The publisher's top `limit` available tasks by preference score."""
+    publisher_id = str(publisher.id)
+    profile = await get_profile(publisher)
+    pool = await candidate_pool_flight.do(publisher_id, lambda: _fetch_pool(publisher_id))
+    return profile.top_k(pool, limit)
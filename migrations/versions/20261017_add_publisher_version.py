@@ -0,0 +1,22 @@
+"""add publisher row version
+
+Revision ID: add_publisher_version
+Revises: configuration_jsonb
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_publisher_version'
+down_revision = 'configuration_jsonb'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Served as the ETag; conditional updates compare-and-swap on it
+    op.add_column('publishers', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+def downgrade():
+    op.drop_column('publishers', 'version')
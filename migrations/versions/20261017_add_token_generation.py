@@ -0,0 +1,22 @@
+"""add publisher token generation
+
+Revision ID: add_token_generation
+Revises: convert_publisher_id_to_uuid
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_token_generation'
+down_revision = 'convert_publisher_id_to_uuid'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Session tokens embed this number; bumping it revokes older tokens
+    op.add_column('publishers', sa.Column('token_generation', sa.Integer(), nullable=False, server_default='0'))
+
+def downgrade():
+    op.drop_column('publishers', 'token_generation')
@@ -0,0 +1,40 @@
+"""store publisher configuration as jsonb
+
+Revision ID: configuration_jsonb
+Revises: add_token_generation
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'configuration_jsonb'
+down_revision = 'add_token_generation'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.alter_column(
+        'publishers',
+        'configuration',
+        type_=postgresql.JSONB(),
+        postgresql_using='configuration::jsonb'
+    )
+    # Default jsonb_ops supports key existence (?, ?&, ?|) as well as @> and @?
+    op.create_index(
+        'ix_publishers_configuration',
+        'publishers',
+        ['configuration'],
+        postgresql_using='gin'
+    )
+
+def downgrade():
+    op.drop_index('ix_publishers_configuration', table_name='publishers')
+    op.alter_column(
+        'publishers',
+        'configuration',
+        type_=sa.JSON(),
+        postgresql_using='configuration::json'
+    )
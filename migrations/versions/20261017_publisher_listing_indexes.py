@@ -0,0 +1,36 @@
+"""indexes for keyset-paginated publisher listing
+
+Revision ID: publisher_listing_indexes
+Revises: add_publisher_version
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'publisher_listing_indexes'
+down_revision = 'add_publisher_version'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_publishers_created_at_id', 'publishers', ['created_at', 'id'])
+    # The plain name/website indexes follow the database collation, which
+    # LIKE 'prefix%' can only use when it is C
+    op.create_index(
+        'ix_publishers_name_pattern',
+        'publishers',
+        ['name'],
+        postgresql_ops={'name': 'text_pattern_ops'}
+    )
+    op.create_index(
+        'ix_publishers_website_pattern',
+        'publishers',
+        ['website'],
+        postgresql_ops={'website': 'text_pattern_ops'}
+    )
+
+def downgrade():
+    op.drop_index('ix_publishers_website_pattern', table_name='publishers')
+    op.drop_index('ix_publishers_name_pattern', table_name='publishers')
+    op.drop_index('ix_publishers_created_at_id', table_name='publishers')
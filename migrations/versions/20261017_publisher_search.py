@@ -0,0 +1,67 @@
+"""publisher search: trigram indexes and a trigger-maintained tsvector
+
+Revision ID: publisher_search
+Revises: publisher_listing_indexes
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'publisher_search'
+down_revision = 'publisher_listing_indexes'
+branch_labels = None
+depends_on = None
+
+# 'simple' keeps brand names and non-English words intact (no stemming or stop words)
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce({row}name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce({row}description, '')), 'B')"
+)
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.add_column('publishers', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute(f"""
+        CREATE FUNCTION publishers_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR.format(row='NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER publishers_search_vector_update
+        BEFORE INSERT OR UPDATE OF name, description ON publishers
+        FOR EACH ROW EXECUTE FUNCTION publishers_search_vector_update()
+    """)
+    op.execute(f"UPDATE publishers SET search_vector = {SEARCH_VECTOR.format(row='')}")
+
+    op.create_index('ix_publishers_search_vector', 'publishers', ['search_vector'], postgresql_using='gin')
+    # Trigram GIN indexes serve ILIKE '%...%' for three or more characters
+    op.create_index(
+        'ix_publishers_name_trgm',
+        'publishers',
+        ['name'],
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+    op.create_index(
+        'ix_publishers_website_trgm',
+        'publishers',
+        ['website'],
+        postgresql_using='gin',
+        postgresql_ops={'website': 'gin_trgm_ops'}
+    )
+
+def downgrade():
+    op.drop_index('ix_publishers_website_trgm', table_name='publishers')
+    op.drop_index('ix_publishers_name_trgm', table_name='publishers')
+    op.drop_index('ix_publishers_search_vector', table_name='publishers')
+    op.execute("DROP TRIGGER publishers_search_vector_update ON publishers")
+    op.execute("DROP FUNCTION publishers_search_vector_update()")
+    op.drop_column('publishers', 'search_vector')
+    # pg_trgm is left installed; other schemas may depend on it
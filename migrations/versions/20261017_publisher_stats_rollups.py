@@ -0,0 +1,51 @@
+"""publisher statistics rollups
+
+Revision ID: publisher_stats_rollups
+Revises: publisher_search
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'publisher_stats_rollups'
+down_revision = 'publisher_search'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'publisher_stats_rollups',
+        sa.Column('publisher_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('granularity', sa.String(length=6), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('tasks_served', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('tasks_completed', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('tasks_rejected', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('quality_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('quality_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('quality_histogram', postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column('completion_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('completion_seconds_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('completion_histogram', postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.PrimaryKeyConstraint('publisher_id', 'granularity', 'bucket_start')
+    )
+    op.create_index(
+        'ix_publisher_stats_rollups_granularity_bucket',
+        'publisher_stats_rollups',
+        ['granularity', 'bucket_start']
+    )
+    # Element-wise sum for merging histogram columns in upserts
+    op.execute("""
+        CREATE FUNCTION stats_histogram_add(a integer[], b integer[]) RETURNS integer[] AS $$
+            SELECT array_agg(coalesce(x, 0) + coalesce(y, 0) ORDER BY i)
+            FROM unnest(a, b) WITH ORDINALITY AS t(x, y, i)
+        $$ LANGUAGE sql IMMUTABLE
+    """)
+
+def downgrade():
+    op.execute("DROP FUNCTION stats_histogram_add(integer[], integer[])")
+    op.drop_index('ix_publisher_stats_rollups_granularity_bucket', table_name='publisher_stats_rollups')
+    op.drop_table('publisher_stats_rollups')
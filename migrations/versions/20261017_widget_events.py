@@ -0,0 +1,39 @@
+"""widget events
+
+Revision ID: widget_events
+Revises: publisher_stats_rollups
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'widget_events'
+down_revision = 'publisher_stats_rollups'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'widget_events',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('publisher_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('event_type', sa.String(length=32), nullable=False),
+        sa.Column('task_id', sa.String(length=64), nullable=True),
+        sa.Column('session_id', sa.String(length=64), nullable=True),
+        sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('metadata', postgresql.JSONB(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_widget_events_publisher_occurred_at',
+        'widget_events',
+        ['publisher_id', 'occurred_at']
+    )
+
+def downgrade():
+    op.drop_index('ix_widget_events_publisher_occurred_at', table_name='widget_events')
+    op.drop_table('widget_events')
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Bulk-register publishers from an NDJSON or CSV file, straight into the
+database configured for the service (DATABASE_URL / DATABASE_MODE).
+
+Created publishers, with their API keys, are written as NDJSON to --output
+(stdout by default); the summary, conflicts and invalid rows go to stderr.
+
+Usage:
+    python scripts/import_publishers.py partners.csv --output created.ndjson
+    cat partners.ndjson | python scripts/import_publishers.py - --format ndjson
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHUNK_SIZE = 1 << 16
+
+
+async def read_chunks(stream):
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(None, stream.read, CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="NDJSON or CSV file, or - for stdin")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="Default: from the file extension")
+    parser.add_argument("--output", help="Where to write created publishers (default stdout)")
+    args = parser.parse_args()
+
+    import_format = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+
+    from app.core.database import dispose_engines
+    from app.services.publisher_import import import_publishers
+
+    async def run():
+        try:
+            if args.path == "-":
+                return await import_publishers(read_chunks(sys.stdin.buffer), import_format)
+            with open(args.path, "rb") as stream:
+                return await import_publishers(read_chunks(stream), import_format)
+        finally:
+            await dispose_engines()
+
+    summary = asyncio.run(run()).as_dict()
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for publisher in summary["publishers"]:
+            output.write(json.dumps(publisher) + "\n")
+    finally:
+        if args.output:
+            output.close()
+
+    for entry in summary["conflict_rows"]:
+        print(f"row {entry['row']}: conflict: {entry['email']}: {entry['error']}", file=sys.stderr)
+    for entry in summary["invalid_rows"]:
+        print(f"row {entry['row']}: invalid: {entry['error']}", file=sys.stderr)
+    print(
+        f"received {summary['received']}, created {summary['created']}, "
+        f"conflicts {summary['conflicts']}, invalid {summary['invalid']} "
+        f"in {summary['elapsed_seconds']:.2f}s ({summary['rows_per_second']} rows/s)",
+        file=sys.stderr
+    )
+    sys.exit(0 if summary["conflicts"] == 0 and summary["invalid"] == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import requests
 import uuid
 from typing import Dict, Any
 import json
+import os
 from datetime import datetime, timedelta
 
 # Configuration
@@ -80,7 +81,7 @@ def test_get_publisher_tasks(publisher_id: str, api_key: str):
     """Test getting publisher tasks"""
     headers = {
         "X-API-Key": api_key,
-        "X-Internal-Service": "true"
+        "X-Internal-Service": os.getenv("INTERNAL_SERVICE_SECRET", "")
     }
     response = requests.get(f"{BASE_URL}/{publisher_id}/tasks", headers=headers)
     print_response(response, "Get Publisher Tasks")
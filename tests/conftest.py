@@ -0,0 +1,62 @@
+import os
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+
+# Settings are read at import time; tests never need a real signing secret
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from app.core import database  # noqa: E402
+from app.models.publisher import Publisher  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """The application's engine, pointed at a migrated Postgres by DATABASE_URL."""
+    try:
+        with database.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except OperationalError as e:
+        pytest.skip(f"Postgres is not reachable at DATABASE_URL: {e}")
+    return database.engine
+
+
+@pytest.fixture
+def db(db_engine):
+    session = database.SessionLocal()
+    created: List[uuid.UUID] = []
+    session.info["created_publishers"] = created
+    try:
+        # Check a connection out now so pool setup does not show up in counts
+        session.execute(text("SELECT 1"))
+        yield session
+    finally:
+        session.rollback()
+        if created:
+            session.query(Publisher).filter(Publisher.id.in_(created)).delete(synchronize_session=False)
+            session.commit()
+        session.close()
+
+
+@pytest.fixture
+def count_statements(db_engine):
+    """Context manager collecting the SQL statements sent while it is open."""
+
+    @contextmanager
+    def counter() -> Iterator[List[str]]:
+        statements: List[str] = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db_engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db_engine, "before_cursor_execute", before_cursor_execute)
+
+    return counter
@@ -0,0 +1,259 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core import auth
+from app.core.auth import AuthenticatedPublisher
+from app.core.security import create_access_token
+
+pytestmark = [pytest.mark.unit, pytest.mark.auth]
+
+
+@pytest.fixture(autouse=True)
+def clean_caches(monkeypatch):
+    auth.api_key_cache.clear()
+    auth.session_publisher_cache.clear()
+    monkeypatch.setattr(auth, "_loop", None)
+    monkeypatch.setattr(auth, "_invalidations_subscribed", True)
+    yield
+    auth.api_key_cache.clear()
+    auth.session_publisher_cache.clear()
+
+
+def _record(publisher_id=None, **fields) -> AuthenticatedPublisher:
+    values = {"id": publisher_id or uuid.uuid4(), "is_active": True, "version": 1, "token_generation": 0}
+    values.update(fields)
+    return AuthenticatedPublisher(**values)
+
+
+def test_invalidate_evicts_every_entry_for_the_publisher():
+    record = _record()
+    other = _record()
+    auth.api_key_cache.set("key-1", record)
+    auth.api_key_cache.set("key-2", record)
+    auth.api_key_cache.set("key-3", other)
+    auth.session_publisher_cache.set(str(record.id), record)
+
+    assert auth.invalidate_publisher_credentials(record.id) == 2
+    assert auth.api_key_cache.get("key-1") is None
+    assert auth.api_key_cache.get("key-2") is None
+    assert auth.api_key_cache.get("key-3") == other
+    assert auth.session_publisher_cache.get(str(record.id)) is None
+
+
+def test_caches_are_not_trusted_without_the_invalidation_subscription(monkeypatch):
+    record = _record()
+    auth.api_key_cache.set("key", record)
+    auth.session_publisher_cache.set(str(record.id), record)
+    assert auth._cached_api_key("key") == record
+
+    monkeypatch.setattr(auth, "_invalidations_subscribed", False)
+    assert auth._cached_api_key("key") is None
+    assert auth._cached_session_publisher(record.id) is None
+
+
+class FakePubSub:
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.subscribed_to = []
+        self.closed = False
+
+    async def subscribe(self, channel):
+        self.subscribed_to.append(channel)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=None):
+        if self.messages:
+            return self.messages.pop(0)
+        await asyncio.sleep(0.01)
+        return None
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeRedis:
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+        self.published = []
+
+    def pubsub(self):
+        return self._pubsub
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+@pytest.mark.asyncio
+async def test_listener_evicts_on_broadcast_and_clears_on_subscribe(monkeypatch):
+    record = _record()
+    stale = _record()
+    auth.api_key_cache.set("stale", stale)
+    pubsub = FakePubSub([{"type": "message", "data": str(record.id)}])
+    redis = FakeRedis(pubsub)
+
+    async def get_redis_pool():
+        return redis
+
+    monkeypatch.setattr(auth, "get_redis_pool", get_redis_pool)
+    monkeypatch.setattr(auth, "_invalidations_subscribed", False)
+    monkeypatch.setattr(auth, "_invalidation_listener", None)
+    auth.start_credential_invalidation()
+    try:
+        for _ in range(100):
+            if auth._invalidations_subscribed:
+                break
+            await asyncio.sleep(0.01)
+        assert pubsub.subscribed_to == [auth.INVALIDATION_CHANNEL]
+        # Subscribing drops whatever might have been invalidated meanwhile
+        assert auth.api_key_cache.get("stale") is None
+
+        auth.api_key_cache.set("key", record)
+        pubsub.messages.append({"type": "message", "data": str(record.id)})
+        for _ in range(100):
+            if auth.api_key_cache.get("key") is None:
+                break
+            await asyncio.sleep(0.01)
+        assert auth.api_key_cache.get("key") is None
+
+        auth.invalidate_publisher_credentials(record.id)
+        await asyncio.sleep(0.05)
+        assert redis.published == [(auth.INVALIDATION_CHANNEL, str(record.id))]
+    finally:
+        await auth.stop_credential_invalidation()
+    assert pubsub.closed
+    assert auth._invalidations_subscribed is False
+
+
+def _token(record: AuthenticatedPublisher, generation=None) -> str:
+    return create_access_token(
+        publisher_id=record.id,
+        is_active=record.is_active,
+        generation=record.token_generation if generation is None else generation
+    )["access_token"]
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    """Publisher records as the database would return them, by id."""
+    records = {}
+    lookups = []
+
+    async def resolve_publisher(api_key=None, publisher_id=None):
+        lookups.append(publisher_id)
+        return records.get(publisher_id)
+
+    monkeypatch.setattr(auth, "_resolve_publisher", resolve_publisher)
+    return records, lookups
+
+
+@pytest.mark.asyncio
+async def test_session_token_at_current_generation_is_accepted(stored):
+    records, lookups = stored
+    record = _record(token_generation=3)
+    records[record.id] = record
+
+    assert await auth.resolve_session_token(_token(record)) == record
+    assert lookups == [record.id]
+
+
+@pytest.mark.asyncio
+async def test_session_token_from_older_generation_is_rejected(stored):
+    records, _ = stored
+    record = _record(token_generation=3)
+    records[record.id] = record
+
+    with pytest.raises(HTTPException) as error:
+        await auth.resolve_session_token(_token(record, generation=2))
+    assert error.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_session_token_for_inactive_publisher_is_forbidden(stored):
+    records, _ = stored
+    record = _record(is_active=False)
+    records[record.id] = record
+
+    with pytest.raises(HTTPException) as error:
+        await auth.resolve_session_token(_token(record._replace(is_active=True)))
+    assert error.value.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_session_token_for_unknown_publisher_is_rejected(stored):
+    with pytest.raises(HTTPException) as error:
+        await auth.resolve_session_token(_token(_record()))
+    assert error.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_tampered_session_token_is_rejected(stored):
+    _, lookups = stored
+    token = _token(_record())
+
+    with pytest.raises(HTTPException) as error:
+        await auth.resolve_session_token(token[:-2] + ("AA" if not token.endswith("AA") else "BB"))
+    assert error.value.status_code == 401
+    assert lookups == []
+
+
+@pytest.mark.asyncio
+async def test_cached_publisher_answers_without_a_lookup(stored):
+    _, lookups = stored
+    record = _record(token_generation=1)
+    auth.session_publisher_cache.set(str(record.id), record)
+
+    assert await auth.resolve_session_token(_token(record)) == record
+    assert lookups == []
+
+    # A rotation seen through the cache revokes older tokens too
+    auth.session_publisher_cache.set(str(record.id), record._replace(token_generation=2))
+    with pytest.raises(HTTPException) as error:
+        await auth.resolve_session_token(_token(record))
+    assert error.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_session_lookup_failure_is_service_unavailable(monkeypatch):
+    async def resolve_publisher(api_key=None, publisher_id=None):
+        raise ConnectionError("database is down")
+
+    monkeypatch.setattr(auth, "_resolve_publisher", resolve_publisher)
+    with pytest.raises(HTTPException) as error:
+        await auth.resolve_session_token(_token(_record()))
+    assert error.value.status_code == 503
+
+
+def _request(headers=None):
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+        "client": ("203.0.113.7", 1234),
+    }
+    return Request(scope)
+
+
+@pytest.mark.parametrize("secret,header,internal", [
+    ("shared-secret", "shared-secret", True),
+    ("shared-secret", "true", False),
+    ("shared-secret", "", False),
+    ("shared-secret", None, False),
+    (None, "true", False),
+    ("", "", False),
+])
+def test_internal_service_requires_the_shared_secret(monkeypatch, secret, header, internal):
+    monkeypatch.setattr(auth.settings, "INTERNAL_SERVICE_SECRET", secret)
+    headers = {} if header is None else {"X-Internal-Service": header}
+    request = _request(headers)
+
+    assert auth.is_internal_service(request) is internal
+    if internal:
+        auth.require_internal_service(request)
+    else:
+        with pytest.raises(HTTPException) as excinfo:
+            auth.require_internal_service(request)
+        assert excinfo.value.status_code == 403
@@ -0,0 +1,84 @@
+import pytest
+
+from app.core.cache import TTLCache
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_get_returns_value_until_ttl(clock):
+    cache = TTLCache(max_size=10, ttl_seconds=5, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(max_size=2, ttl_seconds=60, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_set_refreshes_ttl(clock):
+    cache = TTLCache(max_size=10, ttl_seconds=5, clock=clock)
+    cache.set("a", 1)
+    clock.now = 4
+    cache.set("a", 2)
+    clock.now = 8
+    assert cache.get("a") == 2
+
+
+def test_zero_size_cache_stores_nothing(clock):
+    cache = TTLCache(max_size=0, ttl_seconds=5, clock=clock)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_invalidate_and_invalidate_where(clock):
+    cache = TTLCache(max_size=10, ttl_seconds=60, clock=clock)
+    cache.set("a", {"owner": 1})
+    cache.set("b", {"owner": 1})
+    cache.set("c", {"owner": 2})
+
+    assert cache.invalidate("a") is True
+    assert cache.invalidate("a") is False
+    assert cache.invalidate_where(lambda value: value["owner"] == 1) == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == {"owner": 2}
+    assert cache.invalidations == 2
+
+
+def test_stats_report_hit_ratio(clock):
+    cache = TTLCache(max_size=10, ttl_seconds=60, clock=clock)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("missing")
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
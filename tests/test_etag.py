@@ -0,0 +1,40 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.etag import expected_versions, format_etag, parse_if_match, precondition_failed
+from app.core.exceptions import VersionConflict
+
+pytestmark = pytest.mark.unit
+
+
+def test_format_etag_round_trips():
+    assert format_etag(7) == '"v7"'
+    assert parse_if_match(format_etag(7)) == [7]
+
+
+@pytest.mark.parametrize("header", [None, "*", " * "])
+def test_absent_or_any_matches_every_version(header):
+    assert parse_if_match(header) is None
+
+
+def test_list_of_tags():
+    assert parse_if_match('"v1", "v2" ,"v10"') == [1, 2, 10]
+
+
+@pytest.mark.parametrize("header", ['W/"v2"', '"v1", W/"v2"', "v2", '"2"', '"v"', '"vx"', '""', ""])
+def test_unmatchable_tags_raise(header):
+    with pytest.raises(ValueError):
+        parse_if_match(header)
+
+
+def test_expected_versions_turns_bad_tags_into_412():
+    assert expected_versions('"v3"') == [3]
+    with pytest.raises(HTTPException) as excinfo:
+        expected_versions('W/"v3"')
+    assert excinfo.value.status_code == 412
+
+
+def test_precondition_failed_carries_current_etag():
+    error = precondition_failed(VersionConflict("Publisher", "abc", 5))
+    assert error.status_code == 412
+    assert error.headers == {"ETag": '"v5"'}
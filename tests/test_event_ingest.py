@@ -0,0 +1,181 @@
+import json
+import types
+import uuid
+
+import pytest
+from sqlalchemy.exc import DataError, OperationalError
+
+from app.core.config import settings
+from app.services import event_ingest, statistics
+
+pytestmark = pytest.mark.unit
+
+PUBLISHER_ID = uuid.UUID("00000000-0000-4000-8000-000000000001")
+NOW = 1_700_000_000.0
+
+
+@pytest.fixture(autouse=True)
+def fixed_time(monkeypatch):
+    monkeypatch.setattr(event_ingest, "time", types.SimpleNamespace(time=lambda: NOW))
+
+
+def _parse(*events):
+    return event_ingest.parse_events(PUBLISHER_ID, list(events))
+
+
+def test_valid_events_become_rows():
+    rows, rejected = _parse(
+        {"type": "impression"},
+        {"type": "task_view", "task_id": "t1", "session_id": "s1", "occurred_at": NOW * 1000 - 5000},
+        {"type": "task_complete", "metadata": {"label": "ça", "score": 1}},
+    )
+
+    assert rejected == []
+    assert rows == [
+        (PUBLISHER_ID, "impression", None, None, NOW, None),
+        (PUBLISHER_ID, "task_view", "t1", "s1", NOW - 5, None),
+        (PUBLISHER_ID, "task_complete", None, None, NOW, '{"label":"ça","score":1}'),
+    ]
+
+
+def test_empty_ids_are_stored_as_null():
+    rows, rejected = _parse({"type": "impression", "task_id": "", "session_id": ""})
+
+    assert rejected == []
+    assert rows[0][2:4] == (None, None)
+
+
+@pytest.mark.parametrize("event, error", [
+    ("impression", "Expected a JSON object"),
+    ({"type": "click"}, "type must be one of"),
+    ({}, "type must be one of"),
+    ({"type": "impression", "task_id": 7}, "task_id must be a string"),
+    ({"type": "impression", "task_id": "x" * 65}, "task_id must be a string"),
+    ({"type": "impression", "session_id": "a\x00b"}, "session_id must be a string"),
+    ({"type": "impression", "session_id": "\ud800"}, "session_id must be valid Unicode"),
+    ({"type": "impression", "task_id": "ok\udfff"}, "task_id must be valid Unicode"),
+    ({"type": "impression", "occurred_at": "yesterday"}, "occurred_at must be epoch milliseconds"),
+    ({"type": "impression", "occurred_at": True}, "occurred_at must be epoch milliseconds"),
+    ({"type": "impression", "metadata": ["a"]}, "metadata must be an object"),
+    ({"type": "impression", "metadata": {"a": "\ud800"}}, "metadata must be valid Unicode"),
+    ({"type": "impression", "metadata": {"\udc00": 1}}, "metadata must be valid Unicode"),
+    ({"type": "impression", "metadata": {"a": "b\x00"}}, "metadata must encode to at most"),
+])
+def test_invalid_events_are_rejected_by_index(event, error):
+    rows, rejected = _parse({"type": "impression"}, event)
+
+    assert len(rows) == 1
+    assert [item["index"] for item in rejected] == [1]
+    assert rejected[0]["error"].startswith(error)
+
+
+def test_surrogate_pairs_are_accepted():
+    # Valid pairs decode to one character; only lone halves are refused
+    raw = json.loads('{"type": "impression", "session_id": "\\ud83d\\ude00", "metadata": {"e": "\\ud83d\\ude00"}}')
+
+    rows, rejected = _parse(raw)
+
+    assert rejected == []
+    assert rows[0][3] == "\U0001F600"
+
+
+def test_occurred_at_window():
+    earliest = NOW - settings.EVENT_MAX_AGE_SECONDS
+    latest = NOW + settings.EVENT_MAX_CLOCK_SKEW_SECONDS
+
+    rows, rejected = _parse(
+        {"type": "impression", "occurred_at": earliest * 1000},
+        {"type": "impression", "occurred_at": latest * 1000},
+        {"type": "impression", "occurred_at": earliest * 1000 - 1},
+        {"type": "impression", "occurred_at": latest * 1000 + 1},
+    )
+
+    assert [row[4] for row in rows] == [earliest, latest]
+    assert rejected == [
+        {"index": 2, "error": "occurred_at is out of range"},
+        {"index": 3, "error": "occurred_at is out of range"},
+    ]
+
+
+def test_metadata_size_counts_utf8_bytes(monkeypatch):
+    monkeypatch.setattr(settings, "EVENT_MAX_METADATA_BYTES", 12)
+
+    # {"a":"éé"} is 10 characters but 12 bytes; {"a":"ééé"} is 14 bytes
+    rows, rejected = _parse(
+        {"type": "impression", "metadata": {"a": "éé"}},
+        {"type": "impression", "metadata": {"a": "ééé"}},
+    )
+
+    assert len(rows) == 1
+    assert [item["index"] for item in rejected] == [1]
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """Record each batch handed to the database; failures are set per row."""
+    attempts = []
+    failures = {}
+
+    async def write(batch):
+        attempts.append(list(batch))
+        for row in batch:
+            if row in failures:
+                raise failures[row]
+
+    async def record_uniques(entries):
+        pass
+
+    monkeypatch.setattr(event_ingest, "_write", write)
+    monkeypatch.setattr(statistics, "record_uniques", record_uniques)
+    monkeypatch.setattr(event_ingest, "_buffer", [])
+    monkeypatch.setattr(event_ingest, "_stats", dict.fromkeys(event_ingest._stats, 0))
+    return types.SimpleNamespace(attempts=attempts, failures=failures)
+
+
+def _rows(count):
+    return [(PUBLISHER_ID, "impression", f"t{i}", None, NOW, None) for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_flush_isolates_and_drops_refused_rows(writes, monkeypatch):
+    monkeypatch.setattr(settings, "EVENT_FLUSH_MAX_EVENTS", 8)
+    rows = _rows(10)
+    writes.failures[rows[3]] = DataError("COPY", None, Exception("invalid input"))
+    event_ingest._buffer.extend(rows)
+
+    await event_ingest.flush()
+
+    assert event_ingest._buffer == []
+    assert event_ingest._stats["written"] == 9
+    assert event_ingest._stats["dead_lettered"] == 1
+    assert event_ingest._stats["flush_errors"] == 0
+    # The first batch of 8 is bisected down to the bad row; the last 2 go as one
+    assert writes.attempts[-1] == rows[8:]
+    assert [rows[3]] in writes.attempts
+
+
+@pytest.mark.asyncio
+async def test_flush_requeues_on_connection_errors(writes, monkeypatch):
+    monkeypatch.setattr(settings, "EVENT_FLUSH_MAX_EVENTS", 4)
+    rows = _rows(10)
+    writes.failures[rows[5]] = OperationalError("COPY", None, Exception("server closed the connection"))
+    event_ingest._buffer.extend(rows)
+
+    await event_ingest.flush()
+
+    # The first batch is written; the failing batch and everything after it stay queued
+    assert event_ingest._buffer == rows[4:]
+    assert event_ingest._stats["written"] == 4
+    assert event_ingest._stats["flush_errors"] == 1
+    assert event_ingest._stats["dead_lettered"] == 0
+    assert len(writes.attempts) == 2
+
+
+@pytest.mark.parametrize("error, transient", [
+    (OperationalError("SELECT 1", None, Exception("gone")), True),
+    (ConnectionResetError(), True),
+    (DataError("COPY", None, Exception("bad")), False),
+    (UnicodeEncodeError("utf-8", "\ud800", 0, 1, "surrogates not allowed"), False),
+])
+def test_transient_errors(error, transient):
+    assert event_ingest._is_transient(error) is transient
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from app.core.json_stream import JSONArrayExtractor
+
+pytestmark = pytest.mark.unit
+
+ITEMS = [
+    {"id": 1, "text": "plain"},
+    {"id": 2, "text": "brackets ] } [ { and , : inside", "tags": ["a", "b"]},
+    {"id": 3, "text": "escaped \" quote and \\ backslash", "nested": {"items": [9, 9]}},
+    {"id": 4, "text": "unicode é中"},
+]
+
+
+def _extract(document: bytes, chunk_size: int, **kwargs) -> bytes:
+    extractor = JSONArrayExtractor(**kwargs)
+    out = []
+    for start in range(0, len(document), chunk_size):
+        out.append(extractor.feed(document[start:start + chunk_size]))
+        if extractor.done:
+            break
+    out.append(extractor.close())
+    return b"".join(out)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 100000])
+def test_copies_the_keyed_array_across_any_chunking(chunk_size):
+    document = json.dumps({
+        "total": 4,
+        "other": [{"items": "decoy"}],
+        "note": "\"items\": [0]",
+        "items": ITEMS,
+        "after": True,
+    }, ensure_ascii=False).encode()
+
+    assert json.loads(_extract(document, chunk_size)) == ITEMS
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 100000])
+def test_bare_array_document(chunk_size):
+    assert json.loads(_extract(json.dumps(ITEMS).encode(), chunk_size)) == ITEMS
+
+
+@pytest.mark.parametrize("limit", [0, 1, 2, 4, 10])
+def test_limit_cuts_after_that_many_elements(limit):
+    document = json.dumps({"items": ITEMS}).encode()
+    extractor = JSONArrayExtractor(limit=limit)
+    copied = extractor.feed(document) + extractor.close()
+
+    assert json.loads(copied) == ITEMS[:limit]
+    assert extractor.done
+    assert extractor.count == min(limit, len(ITEMS))
+
+
+def test_limit_stops_reading_early():
+    document = json.dumps({"items": list(range(1000))}).encode()
+    extractor = JSONArrayExtractor(limit=3)
+    fed = 0
+    out = []
+    while not extractor.done:
+        out.append(extractor.feed(document[fed:fed + 16]))
+        fed += 16
+
+    assert json.loads(b"".join(out)) == [0, 1, 2]
+    assert fed < 64
+
+
+@pytest.mark.parametrize("document", [b'{"items": []}', b"[]", b'{"items": [ ]}'])
+def test_empty_array(document):
+    extractor = JSONArrayExtractor()
+    assert json.loads(extractor.feed(document) + extractor.close()) == []
+    assert extractor.count == 0
+
+
+def test_missing_key_yields_empty_array():
+    extractor = JSONArrayExtractor(key="items")
+    assert extractor.feed(b'{"tasks": [1, 2], "nested": {"items": [3]}}') == b""
+    assert extractor.close() == b"[]"
+
+
+def test_other_key():
+    extractor = JSONArrayExtractor(key="tasks")
+    copied = extractor.feed(b'{"items": [1], "tasks": [2, 3]}') + extractor.close()
+    assert json.loads(copied) == [2, 3]
+
+
+def test_truncated_body_raises():
+    extractor = JSONArrayExtractor()
+    extractor.feed(b'{"items": [1, 2')
+    with pytest.raises(ValueError):
+        extractor.close()
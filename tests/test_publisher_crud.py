@@ -0,0 +1,118 @@
+import uuid
+
+import pytest
+
+from app.core.exceptions import DuplicateResource
+from app.crud import publisher as publisher_crud
+from app.schemas.publisher import PublisherConfigurationUpdate, PublisherCreate, PublisherUpdate
+
+pytestmark = [pytest.mark.crud, pytest.mark.db]
+
+
+@pytest.fixture
+def new_publisher(db):
+    def create():
+        publisher = publisher_crud.create_publisher(db, PublisherCreate(
+            name="Example",
+            website="https://example.com",
+            email=f"crud-{uuid.uuid4().hex[:12]}@example.com",
+            description="Publisher CRUD test",
+        ))
+        db.info["created_publishers"].append(publisher.id)
+        return publisher
+
+    return create
+
+
+def test_create_publisher_is_one_statement(db, new_publisher, count_statements):
+    with count_statements() as statements:
+        publisher = new_publisher()
+
+    assert len(statements) == 1
+    assert publisher.id is not None
+    assert publisher.api_key.startswith("pk_live_")
+    assert publisher.version == 1
+
+
+def test_create_duplicate_email_is_one_statement(db, new_publisher, count_statements):
+    publisher = new_publisher()
+
+    with count_statements() as statements:
+        with pytest.raises(DuplicateResource):
+            publisher_crud.create_publisher(db, PublisherCreate(
+                name="Other",
+                website="https://example.org",
+                email=publisher.email,
+                description="Same email",
+            ))
+
+    assert len(statements) == 1
+
+
+def test_update_publisher_is_one_statement(db, new_publisher, count_statements):
+    publisher = new_publisher()
+    version = publisher.version
+
+    with count_statements() as statements:
+        updated = publisher_crud.update_publisher(db, str(publisher.id), PublisherUpdate(name="Renamed"))
+
+    assert len(statements) == 1
+    assert updated.name == "Renamed"
+    assert updated.version == version + 1
+
+
+def test_update_ignores_fields_without_a_column(db, new_publisher, count_statements):
+    publisher = new_publisher()
+
+    with count_statements() as statements:
+        updated = publisher_crud.update_publisher(
+            db, str(publisher.id), PublisherUpdate(description="New", preferred_task_types=["image"])
+        )
+
+    assert len(statements) == 1
+    assert updated.description == "New"
+
+
+def test_update_missing_publisher_returns_none(db, count_statements):
+    with count_statements() as statements:
+        updated = publisher_crud.update_publisher(db, str(uuid.uuid4()), PublisherUpdate(name="Nobody"))
+
+    assert len(statements) == 1
+    assert updated is None
+
+
+def test_update_configuration_is_one_statement(db, new_publisher, count_statements):
+    publisher = new_publisher()
+
+    with count_statements() as statements:
+        updated = publisher_crud.update_publisher_configuration(
+            db, str(publisher.id), PublisherConfigurationUpdate(appearance={"theme": "dark"})
+        )
+
+    assert len(statements) == 1
+    assert updated.configuration["appearance"]["theme"] == "dark"
+
+
+@pytest.mark.parametrize("is_active", [False, True])
+def test_set_publisher_active_is_one_statement(db, new_publisher, count_statements, is_active):
+    publisher = new_publisher()
+    generation = publisher.token_generation
+
+    with count_statements() as statements:
+        updated = publisher_crud.set_publisher_active(db, str(publisher.id), is_active)
+
+    assert len(statements) == 1
+    assert updated.is_active is is_active
+    # Deactivation revokes outstanding session tokens
+    assert updated.token_generation == generation + (0 if is_active else 1)
+
+
+def test_regenerate_api_key_is_one_statement(db, new_publisher, count_statements):
+    publisher = new_publisher()
+    old_api_key = publisher.api_key
+
+    with count_statements() as statements:
+        api_key = publisher_crud.regenerate_api_key(db, str(publisher.id))
+
+    assert len(statements) == 1
+    assert api_key != old_api_key
@@ -0,0 +1,39 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.publisher import PublisherConfigurationUpdate, PublisherUpdate
+
+pytestmark = [pytest.mark.unit, pytest.mark.schemas]
+
+
+@pytest.mark.parametrize("update", [
+    {"task_preferences": {"task_types": {"image": "high"}}},
+    {"task_preferences": {"languages": ["en", 1]}},
+    {"task_preferences": {"complexity_level": {"min": "2"}}},
+    {"task_preferences": {"complexity_level": "hard"}},
+    {"task_preferences": {"max_time_seconds": "60"}},
+    {"behavior": {"max_tasks_per_user": "five"}},
+    {"behavior": {"max_tasks_per_user": -1}},
+    {"behavior": {"max_tasks_per_user": True}},
+])
+def test_configuration_update_rejects_unusable_ranking_preferences(update):
+    with pytest.raises(ValidationError):
+        PublisherConfigurationUpdate(**update)
+    with pytest.raises(ValidationError):
+        PublisherUpdate(configuration=update)
+
+
+def test_configuration_update_accepts_ranking_preferences():
+    update = PublisherConfigurationUpdate(
+        task_preferences={
+            "task_types": {"image": 2, "text": 0.5},
+            "categories": ["news"],
+            "excluded_task_types": "audio",
+            "complexity_level": {"min": 1, "max": 4.5},
+            "max_time_seconds": 120,
+            "unrelated": "kept",
+        },
+        behavior={"max_tasks_per_user": 5, "prefer_short_tasks": True},
+    )
+    assert update.task_preferences["unrelated"] == "kept"
+    assert PublisherConfigurationUpdate(task_preferences={"complexity_level": 3}).task_preferences == {"complexity_level": 3}
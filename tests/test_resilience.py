@@ -0,0 +1,148 @@
+import asyncio
+import types
+
+import httpx
+import pytest
+
+from app.core import resilience
+from app.core.exceptions import UpstreamUnavailable
+from app.core.resilience import CircuitBreaker, CircuitOpenError, ResilientUpstream
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    # Only the module's clock: the event loop keeps the real one
+    monkeypatch.setattr(resilience, "time", types.SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def _open_breaker(clock, half_open_max_calls=1) -> CircuitBreaker:
+    breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=10, half_open_max_calls=half_open_max_calls)
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=10)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.rejected == 1
+
+
+def test_closed_calls_are_not_probes(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=10)
+    assert breaker.before_call() is None
+
+
+def test_half_open_admits_limited_probes(clock):
+    breaker = _open_breaker(clock, half_open_max_calls=2)
+    clock.now = 9.9
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now = 10.0
+    first = breaker.before_call()
+    second = breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert first == second == 1
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_probe_success_closes_and_failure_reopens(clock):
+    breaker = _open_breaker(clock)
+    clock.now = 10.0
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 20.0
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_release_probe_frees_the_slot(clock):
+    breaker = _open_breaker(clock)
+    clock.now = 10.0
+    probe = breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.release_probe(probe)
+    assert breaker.before_call() == probe
+
+
+def test_release_probe_from_an_earlier_round_is_ignored(clock):
+    breaker = _open_breaker(clock)
+    clock.now = 10.0
+    stale = breaker.before_call()
+    breaker.record_failure()
+
+    clock.now = 20.0
+    current = breaker.before_call()
+    assert current == stale + 1
+    breaker.release_probe(stale)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_does_not_wedge_half_open(clock):
+    started = asyncio.Event()
+
+    async def send(method, path, **kwargs):
+        if not started.is_set():
+            started.set()
+            await asyncio.sleep(60)
+        return httpx.Response(200)
+
+    upstream = ResilientUpstream("test", send)
+    upstream.breaker = _open_breaker(clock)
+    clock.now = 10.0
+
+    probe = asyncio.ensure_future(upstream.request("GET", "/tasks", deadline=30))
+    await started.wait()
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    response = await upstream.request("GET", "/tasks", deadline=30)
+    assert response.status_code == 200
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_raises_upstream_unavailable(clock):
+    async def send(method, path, **kwargs):
+        raise AssertionError("an open circuit must not call upstream")
+
+    upstream = ResilientUpstream("test", send)
+    upstream.breaker = _open_breaker(clock)
+
+    with pytest.raises(UpstreamUnavailable):
+        await upstream.request("GET", "/tasks")
+    assert upstream.short_circuited == 1
@@ -0,0 +1,151 @@
+import asyncio
+import types
+
+import pytest
+
+from app.core import singleflight
+from app.core.singleflight import SingleFlight
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    # Only the module's clock: the event loop keeps the real one
+    monkeypatch.setattr(singleflight, "time", types.SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def _counting(result="value"):
+    calls = []
+    release = asyncio.Event()
+
+    async def fn():
+        calls.append(1)
+        await release.wait()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return fn, calls, release
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    fn, calls, release = _counting()
+
+    waiters = [asyncio.ensure_future(flight.do("key", fn)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == ["value"] * 5
+    assert len(calls) == 1
+    stats = flight.stats()
+    assert stats["upstream_calls"] == 1
+    assert stats["coalesced"] == 4
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_separately():
+    flight = SingleFlight()
+    fn, calls, release = _counting()
+
+    waiters = [asyncio.ensure_future(flight.do(key, fn)) for key in ("a", "b")]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*waiters)
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_work():
+    flight = SingleFlight()
+    fn, calls, release = _counting()
+
+    first = asyncio.ensure_future(flight.do("key", fn))
+    second = asyncio.ensure_future(flight.do("key", fn))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "value"
+    assert first.cancelled()
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_failure_reaches_every_caller_and_is_not_replayed(clock):
+    flight = SingleFlight(result_ttl=1.0)
+    fn, calls, release = _counting(RuntimeError("upstream down"))
+
+    waiters = [asyncio.ensure_future(flight.do("key", fn)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.failures == 1
+
+    # The next call tries again rather than replaying the error
+    with pytest.raises(RuntimeError):
+        await flight.do("key", fn)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_results_replayed_within_ttl(clock):
+    flight = SingleFlight(result_ttl=1.0)
+    fn, calls, release = _counting()
+    release.set()
+
+    assert await flight.do("key", fn) == "value"
+    clock.now = 0.9
+    assert await flight.do("key", fn) == "value"
+    assert len(calls) == 1
+    assert flight.window_hits == 1
+
+    clock.now = 1.0
+    assert await flight.do("key", fn) == "value"
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_forget_drops_replayable_result(clock):
+    flight = SingleFlight(result_ttl=1.0)
+    fn, calls, release = _counting()
+    release.set()
+
+    await flight.do("key", fn)
+    flight.forget("key")
+    await flight.do("key", fn)
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_results_bounded_by_max_results(clock):
+    flight = SingleFlight(result_ttl=1.0, max_results=2)
+    fn, calls, release = _counting()
+    release.set()
+
+    for key in ("a", "b", "c"):
+        await flight.do(key, fn)
+    assert len(flight._results) == 2
+
+    # Expired entries are swept to make room
+    clock.now = 2.0
+    await flight.do("d", fn)
+    assert list(flight._results) == ["d"]
@@ -0,0 +1,113 @@
+import random
+import types
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.services import statistics
+from app.services.statistics import StatisticsQuery, _cover
+
+pytestmark = pytest.mark.unit
+
+SIZES = dict(statistics.GRANULARITIES)
+DAY = 86400
+HOUR = 3600
+MINUTE = 60
+# A UTC midnight, so day buckets line up with the examples below
+MIDNIGHT = 1_700_006_400
+
+
+def _check_tiling(start, end, ranges):
+    assert ranges[0][1] == start
+    assert ranges[-1][2] == end
+    for (_, _, high), (_, low, _) in zip(ranges, ranges[1:]):
+        assert high == low
+    for granularity, low, high in ranges:
+        size = SIZES[granularity]
+        assert low < high
+        assert low % size == 0 and high % size == 0
+
+
+def test_cover_uses_the_coarsest_buckets_that_fit():
+    start = MIDNIGHT - 2 * HOUR - 5 * MINUTE
+    end = MIDNIGHT + 3 * DAY + HOUR + 10 * MINUTE
+
+    assert _cover(start, end) == [
+        ("minute", start, MIDNIGHT - 2 * HOUR),
+        ("hour", MIDNIGHT - 2 * HOUR, MIDNIGHT),
+        ("day", MIDNIGHT, MIDNIGHT + 3 * DAY),
+        ("hour", MIDNIGHT + 3 * DAY, MIDNIGHT + 3 * DAY + HOUR),
+        ("minute", MIDNIGHT + 3 * DAY + HOUR, end),
+    ]
+
+
+def test_cover_aligned_day_is_one_range():
+    assert _cover(MIDNIGHT, MIDNIGHT + DAY) == [("day", MIDNIGHT, MIDNIGHT + DAY)]
+
+
+def test_cover_short_range_stays_in_minutes():
+    start = MIDNIGHT + 5 * MINUTE
+    assert _cover(start, start + 20 * MINUTE) == [("minute", start, start + 20 * MINUTE)]
+
+
+def test_cover_empty_range():
+    assert _cover(MIDNIGHT, MIDNIGHT) == []
+
+
+def test_cover_tiles_random_ranges():
+    rng = random.Random(7)
+    for _ in range(500):
+        start = MIDNIGHT + rng.randrange(-30, 30) * DAY + rng.randrange(DAY // MINUTE) * MINUTE
+        end = start + rng.randrange(1, 40 * DAY // MINUTE) * MINUTE
+        ranges = _cover(start, end)
+        _check_tiling(start, end, ranges)
+        # At most one run of each finer granularity on either side of the coarsest
+        assert len(ranges) <= 2 * len(statistics.GRANULARITIES) - 1
+
+
+@pytest.fixture
+def now(monkeypatch):
+    now = MIDNIGHT + 400 * DAY + 12 * HOUR + 30 * MINUTE + 15
+    monkeypatch.setattr(statistics, "time", types.SimpleNamespace(time=lambda: now))
+    return now
+
+
+def _at(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def _query_start(timestamp):
+    return int(StatisticsQuery(_at(timestamp), None).start.timestamp())
+
+
+def test_query_rounds_recent_edges_out_to_the_minute(now):
+    query = StatisticsQuery(_at(now - HOUR - 30), _at(now - 10))
+
+    assert query.start == _at(now - HOUR - 30 - 15 - 30)
+    assert query.end == _at(now - 15 + MINUTE)
+    _check_tiling(query.start.timestamp(), query.end.timestamp(), [
+        (granularity, low.timestamp(), high.timestamp()) for granularity, low, high in query.ranges
+    ])
+
+
+def test_query_snaps_edges_older_than_retention_to_coarser_buckets(now):
+    old_hours = now - (settings.STATISTICS_MINUTE_RETENTION_HOURS + 5) * HOUR - 17 * MINUTE
+    old_days = now - (settings.STATISTICS_HOUR_RETENTION_DAYS + 5) * DAY - 3 * HOUR
+
+    assert _query_start(old_hours) % HOUR == 0
+    assert _query_start(old_days) % DAY == 0
+
+
+def test_query_defaults_and_naive_datetimes(now):
+    query = StatisticsQuery(None, None)
+    assert query.end == _at(now - 15 + MINUTE)
+    assert query.end - query.start >= timedelta(days=settings.STATISTICS_DEFAULT_RANGE_DAYS)
+
+    naive = StatisticsQuery(_at(now - HOUR).replace(tzinfo=None), _at(now).replace(tzinfo=None))
+    assert naive.start == _at(now - HOUR - 15)
+
+
+def test_query_rejects_backwards_range(now):
+    with pytest.raises(ValueError):
+        StatisticsQuery(_at(now), _at(now - HOUR))
@@ -0,0 +1,99 @@
+import pytest
+
+from app.services.task_ranking import CandidatePool, RankingProfile
+
+pytestmark = pytest.mark.unit
+
+
+def _task(task_id, **fields):
+    return {"id": task_id, **fields}
+
+
+def _ids(tasks):
+    return [task["id"] for task in tasks]
+
+
+POOL = [
+    _task(1, task_type="text", category="news", language="en", complexity_level=1, time_estimate_seconds=30),
+    _task(2, task_type="image", category="sport", language="de", complexity_level=3, time_estimate_seconds=120),
+    _task(3, task_type="image", category="news", language="en", complexity_level=2, time_estimate_seconds=60),
+    _task(4, task_type="audio", category="music", language="en", complexity_level=5, time_estimate_seconds=300),
+]
+
+
+def test_preferred_values_rank_first_and_ties_keep_upstream_order():
+    profile = RankingProfile({"task_types": ["image"]}, None)
+    assert _ids(profile.top_k(CandidatePool(POOL), 10)) == [2, 3, 1, 4]
+
+
+def test_weights_and_exclusions():
+    profile = RankingProfile({
+        "task_types": {"text": 2, "image": 1},
+        "excluded_categories": ["sport"],
+    }, None)
+    assert _ids(profile.top_k(CandidatePool(POOL), 10)) == [1, 3, 4]
+
+
+def test_complexity_bounds_and_max_time():
+    profile = RankingProfile({"complexity_level": {"min": 2, "max": 4}, "max_time_seconds": 90}, None)
+    assert _ids(profile.top_k(CandidatePool(POOL), 10)) == [3]
+
+
+def test_preferred_complexity_penalises_distance():
+    profile = RankingProfile({"complexity_level": 5}, None)
+    assert _ids(profile.top_k(CandidatePool(POOL), 10)) == [4, 2, 3, 1]
+
+
+def test_prefer_short_tasks():
+    profile = RankingProfile(None, {"prefer_short_tasks": True})
+    assert _ids(profile.top_k(CandidatePool(POOL), 10)) == [1, 3, 2, 4]
+
+
+def test_top_k_selects_the_best_k():
+    profile = RankingProfile({"languages": ["en"], "task_types": {"audio": 0.5}}, None)
+    assert _ids(profile.top_k(CandidatePool(POOL), 2)) == [4, 1]
+
+
+def test_max_tasks_per_user_caps_the_result():
+    profile = RankingProfile(None, {"max_tasks_per_user": 2})
+    assert _ids(profile.top_k(CandidatePool(POOL), 10)) == [1, 2]
+
+
+def test_empty_pool():
+    assert RankingProfile({"task_types": ["image"]}, None).top_k(CandidatePool([]), 5) == []
+
+
+@pytest.mark.parametrize("task_preferences,behavior", [
+    ({"task_types": {"image": "high", "text": None}}, None),
+    ({"complexity_level": {"min": "two"}}, None),
+    ({"complexity_level": "hard"}, None),
+    ({"complexity_level": [1, 2]}, None),
+    ({"max_time_seconds": "soon"}, None),
+    ({"categories": [["news"], {"a": 1}]}, None),
+    (None, {"max_tasks_per_user": "five"}),
+    (None, {"max_tasks_per_user": -1}),
+    (None, {"max_tasks_per_user": float("inf")}),
+    (["not", "a", "dict"], "nor this"),
+])
+def test_invalid_preferences_are_skipped(task_preferences, behavior):
+    profile = RankingProfile(task_preferences, behavior)
+    assert _ids(profile.top_k(CandidatePool(POOL), 10)) == [1, 2, 3, 4]
+
+
+def test_numeric_strings_are_coerced():
+    profile = RankingProfile({"complexity_level": {"min": "2"}, "max_time_seconds": "60"}, {"max_tasks_per_user": "5"})
+    assert _ids(profile.top_k(CandidatePool(POOL), 10)) == [3]
+
+
+def test_malformed_task_fields_are_neutral():
+    pool = CandidatePool([
+        _task(1, task_type=["image"], complexity_level="hard", time_estimate_seconds={"s": 1}),
+        _task(2, task_type="image", complexity_level=None, time_estimate_seconds="n/a"),
+        _task(3, task_type=7, complexity_level="4", time_estimate_seconds="90"),
+    ])
+    profile = RankingProfile(
+        {"task_types": ["image", "7"], "complexity_level": {"max": 3}, "max_time_seconds": 60},
+        {"prefer_short_tasks": True}
+    )
+    # Unknown values are neither rewarded nor excluded; "4" and "90" still count
+    assert _ids(profile.top_k(pool, 10)) == [2, 1]
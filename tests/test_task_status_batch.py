@@ -0,0 +1,62 @@
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.crud import publisher as publisher_crud
+from app.schemas.task import TaskStatusBatchItem, TaskStatusBatchResponse
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def batch_reply(monkeypatch):
+    """Answer the tasks service batch route with the JSON the test sets."""
+    reply = {"status_code": 200, "json": {"results": []}}
+
+    async def request(method, path, **kwargs):
+        assert path == "/api/v1/tasks/status/batch"
+        return httpx.Response(reply["status_code"], json=reply["json"])
+
+    monkeypatch.setattr(settings, "TASKS_SERVICE_BATCH_STATUS", True)
+    monkeypatch.setattr(publisher_crud, "_batch_status_supported", True)
+    monkeypatch.setattr(publisher_crud.tasks_service, "request", request)
+    return reply
+
+
+def _updates(*task_ids):
+    return [TaskStatusBatchItem(task_id=task_id, status="completed") for task_id in task_ids]
+
+
+@pytest.mark.asyncio
+async def test_batch_items_are_normalized(batch_reply):
+    batch_reply["json"] = {"results": [
+        {"task_id": "a", "status_code": 200, "task": {"id": "a", "status": "completed"}},
+        {"task_id": "b", "status": "completed"},
+        {"task_id": "c", "status_code": 404, "detail": "Task not found"},
+        {"task_id": "d", "error": "locked"},
+        {"task_id": "e", "status_code": "soon"},
+        {"status_code": 200},
+        "garbage",
+    ]}
+
+    results = await publisher_crud.update_task_statuses(_updates("a", "b", "c", "d", "e", "f"))
+
+    assert results == [
+        {"task_id": "a", "status_code": 200, "task": {"id": "a", "status": "completed"}},
+        {"task_id": "b", "status_code": 200, "task": {"task_id": "b", "status": "completed"}},
+        {"task_id": "c", "status_code": 404, "error": "Task not found"},
+        {"task_id": "d", "status_code": 502, "error": "locked"},
+        {"task_id": "e", "status_code": 502, "error": "Malformed tasks service reply"},
+        {"task_id": "f", "status_code": 502, "error": "Missing from tasks service reply"},
+    ]
+    TaskStatusBatchResponse(succeeded=2, failed=4, results=results)
+
+
+@pytest.mark.asyncio
+async def test_malformed_batch_reply_fails_each_item(batch_reply):
+    batch_reply["json"] = ["not", "an", "object"]
+
+    results = await publisher_crud.update_task_statuses(_updates("a", "b"))
+
+    assert [result["status_code"] for result in results] == [502, 502]
+    assert all("error" in result for result in results)